@@ -0,0 +1,2 @@
+from .match_generator import generate_matchs  # noqa
+from .rewind_benchmark import compare_benchmarks, run_benchmark  # noqa
@@ -0,0 +1,52 @@
+import argparse
+
+from .rewind_benchmark import (
+    compare_benchmarks,
+    default_sizes,
+    load_benchmark,
+    run_benchmark,
+    save_benchmark,
+)
+
+parser = argparse.ArgumentParser(
+    prog="python -m benchmark",
+    description="Benchmark da rewind com partidas sintéticas.",
+)
+parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--repeat", type=int, default=3)
+parser.add_argument("--execution-mode", choices=["serial", "thread", "process"])
+parser.add_argument("--max-workers", type=int)
+parser.add_argument("--output", default="benchmark.json")
+parser.add_argument("--compare", help="Benchmark de referência para comparação.")
+parser.add_argument("--threshold", type=float, default=1.2)
+
+args = parser.parse_args()
+
+options = {}
+if args.execution_mode:
+    options["execution_mode"] = args.execution_mode
+if args.max_workers:
+    options["max_workers"] = args.max_workers
+
+benchmark = run_benchmark(args.sizes, args.seed, args.repeat, **options)
+save_benchmark(benchmark, args.output)
+
+for size, result in benchmark["results"].items():
+    rewind = result["create_rewind"]
+    print(
+        f"{size} partidas: {rewind['time_median']:.3f}s, "
+        f"pico de memória {rewind['peak_memory'] / 2**20:.1f} MiB"
+    )
+
+if args.compare:
+    regressions = False
+    for size, ratios in compare_benchmarks(
+        load_benchmark(args.compare), benchmark
+    ).items():
+        for name, ratio in ratios.items():
+            if ratio > args.threshold:
+                regressions = True
+                print(f"Regressão em {size} partidas, {name}: {ratio:.2f}x")
+    if regressions:
+        raise SystemExit(1)
@@ -0,0 +1,275 @@
+import random
+
+from utils.functions_statistics import (
+    itens_keys,
+    player_challenges_keys,
+    player_infos_keys,
+    player_max_infos_keys,
+)
+
+game_modes = {
+    "CLASSIC": (420, 11),
+    "ARAM": (450, 12),
+    "URF": (900, 11),
+    "CHERRY": (1700, 30),
+    "NEXUSBLITZ": (1300, 21),
+}
+
+game_modes_weights = [50, 30, 8, 7, 5]
+
+positions = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+
+champions = {
+    1: "Annie",
+    11: "MasterYi",
+    22: "Ashe",
+    51: "Caitlyn",
+    64: "LeeSin",
+    81: "Ezreal",
+    86: "Garen",
+    103: "Ahri",
+    157: "Yasuo",
+    222: "Jinx",
+    236: "Lucian",
+    266: "Aatrox",
+    412: "Thresh",
+    555: "Pyke",
+    777: "Yone",
+    887: "Gwen",
+}
+
+items = [0, 1001, 1055, 3006, 3020, 3031, 3036, 3046, 3047, 3072, 3094, 3153, 6672]
+
+# Timestamp (ms) da versão 11.20, a partir da qual 'gameDuration' passou a ser
+# retornado em segundos e 'gameEndTimestamp' passou a existir.
+patch_11_20_timestamp = 1633392000000
+
+year_in_milliseconds = 365 * 24 * 60 * 60 * 1000
+
+
+def generate_participant(
+    rnd: random.Random,
+    puuid: str,
+    team_id: int,
+    position: str,
+    win: bool,
+    summoner_level: int,
+) -> dict:
+    """
+    Gera um participante no formato 'ParticipantDto' da Match-V5.
+
+    Parâmetros:
+    - rnd (random.Random): O gerador de números aleatórios.
+    - puuid (str): O puuid do participante.
+    - team_id (int): O time do participante (100 ou 200).
+    - position (str): A posição do participante ('' fora do modo CLASSIC).
+    - win (bool): Se o time do participante venceu a partida.
+    - summoner_level (int): O nível do participante.
+
+    Retorna:
+    - dict: O dicionário do participante.
+    """
+    champion_id = rnd.choice(list(champions))
+
+    participant = {
+        "puuid": puuid,
+        "summonerName": f"Summoner {puuid[-6:]}",
+        "teamId": team_id,
+        "championId": champion_id,
+        "championName": champions[champion_id],
+        "teamPosition": position,
+        "individualPosition": position or "Invalid",
+        "win": win,
+        "kills": rnd.randint(0, 20),
+        "deaths": rnd.randint(0, 15),
+        "assists": rnd.randint(0, 30),
+        "doubleKills": rnd.randint(0, 3),
+        "tripleKills": int(rnd.random() < 0.2),
+        "quadraKills": int(rnd.random() < 0.05),
+        "pentaKills": int(rnd.random() < 0.01),
+        "profileIcon": rnd.randint(1, 6000),
+        "summonerLevel": summoner_level,
+    }
+
+    for key in dict.fromkeys([*player_infos_keys, *player_max_infos_keys]):
+        participant[key] = rnd.randint(0, 30000)
+
+    participant["firstBloodKill"] = rnd.random() < 0.1
+    participant["firstTowerKill"] = rnd.random() < 0.1
+
+    for key in itens_keys:
+        participant[key] = rnd.choice(items)
+
+    # Partidas antigas e alguns modos não retornam os desafios.
+    if rnd.random() > 0.03:
+        participant["challenges"] = {
+            **{key: int(rnd.random() < 0.1) for key in player_challenges_keys},
+            "kda": round(rnd.random() * 8, 2),
+            "killParticipation": round(rnd.random(), 2),
+        }
+
+    return participant
+
+
+def generate_team(rnd: random.Random, team_id: int, win: bool) -> dict:
+    """
+    Gera um time no formato 'TeamDto' da Match-V5, com banimentos e objetivos.
+
+    Parâmetros:
+    - rnd (random.Random): O gerador de números aleatórios.
+    - team_id (int): O identificador do time (100 ou 200).
+    - win (bool): Se o time venceu a partida.
+
+    Retorna:
+    - dict: O dicionário do time.
+    """
+    first_pick_turn = 1 if team_id == 100 else 6
+    return {
+        "teamId": team_id,
+        "win": win,
+        "bans": [
+            {
+                "championId": rnd.choice([-1, *champions]),
+                "pickTurn": first_pick_turn + turn,
+            }
+            for turn in range(5)
+        ],
+        "objectives": {
+            objective: {"first": rnd.random() < 0.5, "kills": rnd.randint(0, kills)}
+            for objective, kills in [
+                ("baron", 3),
+                ("champion", 60),
+                ("dragon", 6),
+                ("inhibitor", 4),
+                ("riftHerald", 2),
+                ("tower", 11),
+            ]
+        },
+    }
+
+
+def generate_match(
+    rnd: random.Random,
+    puuid: str,
+    match_number: int,
+    game_creation: int,
+    co_players: list[str],
+    region: str = "BR1",
+) -> dict:
+    """
+    Gera uma partida no formato 'MatchDto' da Match-V5 com o jogador informado
+    entre os 10 participantes.
+
+    Partidas criadas antes da versão 11.20 não possuem 'gameEndTimestamp' e
+    possuem 'gameDuration' em milissegundos, como na API da Riot.
+
+    Parâmetros:
+    - rnd (random.Random): O gerador de números aleatórios.
+    - puuid (str): O puuid do jogador.
+    - match_number (int): O número da partida, usado no matchId.
+    - game_creation (int): O timestamp (ms) de criação da partida.
+    - co_players (list): Os puuids dos jogadores que podem participar da partida.
+    - region (str): A região da partida.
+
+    Retorna:
+    - dict: O dicionário da partida.
+    """
+    game_mode = rnd.choices(list(game_modes), weights=game_modes_weights)[0]
+    queue_id, map_id = game_modes[game_mode]
+
+    participants_puuids = [puuid, *rnd.sample(co_players, 9)]
+    rnd.shuffle(participants_puuids)
+
+    winner_team = rnd.choice([100, 200])
+    game_duration = rnd.randint(900, 2700)
+    game_start_timestamp = game_creation + rnd.randint(1000, 60000)
+    summoner_level = 30 + match_number // 10
+
+    participants = [
+        generate_participant(
+            rnd,
+            participant_puuid,
+            100 if index < 5 else 200,
+            positions[index % 5] if game_mode == "CLASSIC" else "",
+            (100 if index < 5 else 200) == winner_team,
+            summoner_level,
+        )
+        for index, participant_puuid in enumerate(participants_puuids)
+    ]
+
+    info = {
+        "gameCreation": game_creation,
+        "gameStartTimestamp": game_start_timestamp,
+        "gameId": match_number,
+        "gameMode": game_mode,
+        "gameType": "MATCHED_GAME",
+        "gameVersion": "13.24.551.6244",
+        "mapId": map_id,
+        "platformId": region,
+        "queueId": queue_id,
+        "participants": participants,
+        "teams": [
+            generate_team(rnd, team_id, team_id == winner_team)
+            for team_id in (100, 200)
+        ],
+    }
+
+    if game_creation < patch_11_20_timestamp:
+        info["gameDuration"] = game_duration * 1000
+    else:
+        info["gameDuration"] = game_duration
+        info["gameEndTimestamp"] = game_start_timestamp + game_duration * 1000
+
+    return {
+        "metadata": {
+            "dataVersion": "2",
+            "matchId": f"{region}_{match_number}",
+            "participants": participants_puuids,
+        },
+        "info": info,
+    }
+
+
+def generate_matchs(
+    puuid: str,
+    amount: int,
+    seed: int = 0,
+    end_timestamp: int = 1704067200000,
+    old_matchs_ratio: float = 0.05,
+    co_players_amount: int = 200,
+) -> list[dict]:
+    """
+    Gera um corpus sintético e determinístico de partidas de um jogador, no
+    formato retornado por 'find_matches_by_puuid'.
+
+    As partidas são distribuídas no ano anterior a 'end_timestamp', em sessões
+    de jogo com dias sem jogar entre elas, e uma fração delas é gerada antes da
+    versão 11.20 (sem 'gameEndTimestamp').
+
+    Parâmetros:
+    - puuid (str): O puuid do jogador.
+    - amount (int): A quantidade de partidas.
+    - seed (int): A semente do gerador de números aleatórios.
+    - end_timestamp (int): O timestamp (ms) da partida mais recente.
+    - old_matchs_ratio (float): A fração de partidas anteriores à versão 11.20.
+    - co_players_amount (int): A quantidade de jogadores diferentes que podem
+      participar das partidas com o jogador.
+
+    Retorna:
+    - list: Lista de documentos das partidas.
+    """
+    rnd = random.Random(seed)
+    co_players = [f"{seed}-co-player-{index:06d}" for index in range(co_players_amount)]
+
+    game_creations = sorted(
+        end_timestamp - int(rnd.betavariate(1, 2) * year_in_milliseconds)
+        for _ in range(amount)
+    )
+    old_matchs_amount = int(amount * old_matchs_ratio)
+    for index in range(old_matchs_amount):
+        game_creations[index] = patch_11_20_timestamp - (index + 1) * 3600000
+
+    return [
+        generate_match(rnd, puuid, match_number, game_creation, co_players)
+        for match_number, game_creation in enumerate(game_creations)
+    ]
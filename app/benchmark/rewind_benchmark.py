@@ -0,0 +1,226 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy
+import pandas
+from utils.functions_statistics import (
+    REWIND_EXECUTION_MODE,
+    REWIND_MAX_WORKERS,
+    create_rewind_from_matchs,
+    extract_match_frames,
+    extract_teams_frame,
+    get_rewind_section_inputs,
+    normalize_matchs,
+    rewind_sections,
+    run_rewind_section,
+)
+
+from .match_generator import generate_matchs
+
+benchmark_puuid = "benchmark-player"
+
+default_sizes = [100, 1000, 10000]
+
+
+def measure(function, *args, repeat: int = 3) -> dict:
+    """
+    Mede o tempo de execução, o pico de memória e as alocações de uma função.
+
+    O tempo é medido sem o 'tracemalloc' ativo, em 'repeat' execuções, e a
+    memória é medida em uma execução adicional com o 'tracemalloc' ativo.
+
+    Parâmetros:
+    - function (callable): A função medida.
+    - *args: Os argumentos da função.
+    - repeat (int): A quantidade de execuções cronometradas.
+
+    Retorna:
+    - dict: Um dicionário com os tempos (s) mínimo e mediano, o pico de memória
+      (bytes) e a quantidade e o tamanho (bytes) dos blocos alocados pela função
+      que continuam em uso ao seu término.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = function(*args)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocations = [
+        stat for stat in after.compare_to(before, "filename") if stat.count_diff > 0
+    ]
+    del result
+
+    return {
+        "time_min": min(times),
+        "time_median": statistics.median(times),
+        "peak_memory": peak_memory,
+        "allocated_blocks": sum(stat.count_diff for stat in allocations),
+        "allocated_size": sum(stat.size_diff for stat in allocations),
+    }
+
+
+def benchmark_matchs_amount(
+    matchs_amount: int,
+    seed: int = 0,
+    repeat: int = 3,
+    execution_mode: str = REWIND_EXECUTION_MODE,
+    max_workers: int = REWIND_MAX_WORKERS,
+) -> dict:
+    """
+    Executa o benchmark da rewind para um corpus sintético com a quantidade de
+    partidas informada.
+
+    Mede a rewind completa ('create_rewind_from_matchs'), a preparação dos
+    DataFrames e cada seção de 'rewind_sections' isoladamente.
+
+    Parâmetros:
+    - matchs_amount (int): A quantidade de partidas do corpus.
+    - seed (int): A semente do gerador do corpus.
+    - repeat (int): A quantidade de execuções cronometradas de cada medição.
+    - execution_mode (str): O modo de execução das seções na rewind completa.
+    - max_workers (int): A quantidade máxima de threads ou processos.
+
+    Retorna:
+    - dict: Um dicionário com as medições da rewind, da preparação e das seções.
+    """
+    list_matchs = generate_matchs(benchmark_puuid, matchs_amount, seed)
+    normalized_matchs_data_frame = normalize_matchs(list_matchs)
+
+    preparation = {
+        "normalize_matchs": measure(normalize_matchs, list_matchs, repeat=repeat),
+        "extract_match_frames": measure(
+            extract_match_frames,
+            benchmark_puuid,
+            normalized_matchs_data_frame,
+            True,
+            repeat=repeat,
+        ),
+        "extract_teams_frame": measure(
+            extract_teams_frame, normalized_matchs_data_frame, repeat=repeat
+        ),
+    }
+
+    inputs = get_rewind_section_inputs(benchmark_puuid, list_matchs)
+    results = {}
+    sections = {}
+    for name in rewind_sections:
+        arguments = {**inputs, **results}
+        sections[name] = measure(run_rewind_section, name, arguments, repeat=repeat)
+        results[name], _ = run_rewind_section(name, arguments)
+
+    rewind = measure(
+        create_rewind_from_matchs,
+        benchmark_puuid,
+        list_matchs,
+        execution_mode,
+        max_workers,
+        repeat=repeat,
+    )
+
+    return {
+        "create_rewind": rewind,
+        "preparation": preparation,
+        "sections": sections,
+    }
+
+
+def run_benchmark(
+    sizes: list[int] = default_sizes,
+    seed: int = 0,
+    repeat: int = 3,
+    execution_mode: str = REWIND_EXECUTION_MODE,
+    max_workers: int = REWIND_MAX_WORKERS,
+) -> dict:
+    """
+    Executa o benchmark da rewind para cada quantidade de partidas informada.
+
+    Parâmetros:
+    - sizes (list): As quantidades de partidas dos corpus.
+    - seed (int): A semente do gerador dos corpus.
+    - repeat (int): A quantidade de execuções cronometradas de cada medição.
+    - execution_mode (str): O modo de execução das seções na rewind completa.
+    - max_workers (int): A quantidade máxima de threads ou processos.
+
+    Retorna:
+    - dict: Um dicionário com os metadados do ambiente e as medições de cada
+      quantidade de partidas.
+    """
+    return {
+        "metadata": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pandas.__version__,
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "execution_mode": execution_mode,
+            "max_workers": max_workers,
+        },
+        "results": {
+            str(size): benchmark_matchs_amount(
+                size, seed, repeat, execution_mode, max_workers
+            )
+            for size in sizes
+        },
+    }
+
+
+def save_benchmark(benchmark: dict, path: str) -> None:
+    with open(path, "w") as file:
+        json.dump(benchmark, file, indent=2)
+
+
+def load_benchmark(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_benchmarks(
+    baseline: dict, current: dict, metric: str = "time_median"
+) -> dict:
+    """
+    Compara duas execuções do benchmark, calculando a razão entre a métrica
+    atual e a de referência para cada medição presente nas duas execuções.
+
+    Parâmetros:
+    - baseline (dict): O benchmark de referência.
+    - current (dict): O benchmark atual.
+    - metric (str): A métrica comparada (e.g., 'time_median', 'peak_memory').
+
+    Retorna:
+    - dict: Um dicionário no formato {quantidade: {medição: razão}}, onde
+      razões maiores que 1 indicam regressão.
+    """
+    comparison = {}
+    for size, current_result in current["results"].items():
+        if size not in baseline["results"]:
+            continue
+        baseline_result = baseline["results"][size]
+
+        measurements = {"create_rewind": current_result["create_rewind"]}
+        baseline_measurements = {"create_rewind": baseline_result["create_rewind"]}
+        for group in ["preparation", "sections"]:
+            measurements.update(current_result[group])
+            baseline_measurements.update(baseline_result[group])
+
+        comparison[size] = {
+            name: measurement[metric] / baseline_measurements[name][metric]
+            for name, measurement in measurements.items()
+            if name in baseline_measurements and baseline_measurements[name][metric]
+        }
+    return comparison
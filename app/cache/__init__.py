@@ -0,0 +1,3 @@
+from .rewind_cache_control import invalidate_rewind_cache, rewind_cache  # noqa
+from .singleflight_control import SingleFlight, singleflight  # noqa
+from .summoner_cache_control import SummonerCache, summoner_cache  # noqa
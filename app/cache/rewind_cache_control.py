@@ -0,0 +1,146 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+
+from redis import Redis
+from redis.exceptions import RedisError
+from serialization import dumps, loads
+
+REDIS_HOST = os.environ.get("CELERY_HOST", "localhost")
+REDIS_PORT = os.environ.get("CELERY_PORT", 6379)
+REWIND_CACHE_REDIS_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/1"
+
+REWIND_CACHE_MAX_SIZE = int(os.environ.get("REWIND_CACHE_MAX_SIZE", 128))
+REWIND_CACHE_TTL = int(os.environ.get("REWIND_CACHE_TTL", 60 * 60))
+
+REWIND_CACHE_PREFIX = "rewind_cache"
+
+
+class LRUCache:
+    def __init__(self, max_size: int) -> None:
+        """
+        Inicializa um cache em memória com política de remoção LRU.
+
+        Args:
+            max_size (int): Quantidade máxima de itens mantidos no cache.
+        """
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._items if key.startswith(prefix)]:
+                del self._items[key]
+
+
+class RewindCache:
+    def __init__(self, redis_url: str, max_size: int, ttl: int) -> None:
+        """
+        Inicializa o cache de rewinds com dois níveis: um LRU em memória no
+        processo e um nível compartilhado no Redis.
+
+        As chaves são formadas pelo puuid, pela janela de tempo da rewind e pela
+        impressão digital do conjunto de partidas do jogador, de forma que uma
+        partida nova gera uma chave nova.
+
+        Args:
+            redis_url (str): URL de conexão com o Redis.
+            max_size (int): Quantidade máxima de rewinds no LRU em memória.
+            ttl (int): Tempo de expiração (em segundos) das rewinds no Redis.
+        """
+        self.ttl = ttl
+        self._local = LRUCache(max_size)
+        self._redis = Redis.from_url(redis_url)
+
+    def _get_key(self, puuid: str, timestamp: int, fingerprint: str) -> str:
+        return f"{REWIND_CACHE_PREFIX}:{puuid}:{timestamp}:{fingerprint}"
+
+    def _get_keys_set(self, puuid: str) -> str:
+        return f"{REWIND_CACHE_PREFIX}:keys:{puuid}"
+
+    def get(self, puuid: str, timestamp: int, fingerprint: str) -> dict:
+        """
+        Busca a rewind no LRU local e, em seguida, no Redis.
+
+        Returns:
+            dict: A rewind armazenada ou None caso não exista.
+        """
+        key = self._get_key(puuid, timestamp, fingerprint)
+
+        rewind = self._local.get(key)
+        if rewind is not None:
+            return rewind
+
+        try:
+            cached = self._redis.get(key)
+        except RedisError:
+            return None
+
+        if cached is None:
+            return None
+
+        rewind = loads(cached)
+        self._local.set(key, rewind)
+        return rewind
+
+    def set(self, puuid: str, timestamp: int, fingerprint: str, rewind: dict) -> None:
+        key = self._get_key(puuid, timestamp, fingerprint)
+        self._local.set(key, rewind)
+
+        try:
+            with self._redis.pipeline() as pipe:
+                pipe.set(key, dumps(rewind), ex=self.ttl)
+                pipe.sadd(self._get_keys_set(puuid), key)
+                pipe.expire(self._get_keys_set(puuid), self.ttl)
+                pipe.execute()
+        except RedisError:
+            pass
+
+    def invalidate(self, puuids: list[str]) -> None:
+        """
+        Remove as rewinds em cache dos jogadores informados.
+
+        Args:
+            puuids (list[str]): Lista de puuids que tiveram partidas novas.
+        """
+        if not puuids:
+            return
+
+        for puuid in puuids:
+            self._local.delete_prefix(f"{REWIND_CACHE_PREFIX}:{puuid}:")
+
+        try:
+            with self._redis.pipeline() as pipe:
+                for puuid in puuids:
+                    pipe.smembers(self._get_keys_set(puuid))
+                keys = set().union(*pipe.execute())
+                if keys:
+                    pipe.delete(*keys)
+                pipe.delete(*[self._get_keys_set(puuid) for puuid in puuids])
+                pipe.execute()
+        except RedisError:
+            pass
+
+
+rewind_cache = RewindCache(
+    REWIND_CACHE_REDIS_URL, REWIND_CACHE_MAX_SIZE, REWIND_CACHE_TTL
+)
+
+
+def invalidate_rewind_cache(puuids: list[str]) -> None:
+    rewind_cache.invalidate(puuids)
@@ -0,0 +1,332 @@
+import asyncio
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from threading import Event, Lock
+
+from redis import Redis
+from redis.exceptions import RedisError
+from serialization import dumps, loads
+
+from .rewind_cache_control import REWIND_CACHE_REDIS_URL
+
+SINGLEFLIGHT_LOCK_TTL = float(os.environ.get("SINGLEFLIGHT_LOCK_TTL", 30))
+SINGLEFLIGHT_RESULT_TTL = float(os.environ.get("SINGLEFLIGHT_RESULT_TTL", 60))
+SINGLEFLIGHT_POLL_INTERVAL = float(os.environ.get("SINGLEFLIGHT_POLL_INTERVAL", 0.1))
+
+SINGLEFLIGHT_PREFIX = "singleflight"
+
+# Remove a trava apenas se ela ainda pertence a quem a adquiriu, para que uma
+# trava expirada e readquirida por outro worker não seja liberada.
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Estende a trava apenas se ela ainda pertence a quem a adquiriu.
+EXTEND_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        redis_url: str,
+        lock_ttl: float = SINGLEFLIGHT_LOCK_TTL,
+        result_ttl: float = SINGLEFLIGHT_RESULT_TTL,
+        poll_interval: float = SINGLEFLIGHT_POLL_INTERVAL,
+    ) -> None:
+        """
+        Inicializa o agrupamento de chamadas concorrentes ao mesmo recurso, para
+        que apenas uma delas faça a requisição e as demais aguardem o resultado.
+
+        No processo, as chamadas com a mesma chave aguardam a chamada em
+        andamento. Entre workers, a primeira chamada adquire uma trava no Redis
+        e publica o resultado em uma chave com expiração, que as demais
+        consultam até a trava ser liberada.
+
+        Caso o Redis esteja indisponível, a trava expire sem resultado ou a
+        chamada em andamento falhe em outro worker, a chamada é feita
+        normalmente. As chamadas aguardam enquanto a trava existir, e quem a
+        adquiriu a estende pelo tempo de espera da reserva no limitador de taxa
+        (ver 'do').
+
+        Args:
+            redis_url (str): URL de conexão com o Redis.
+            lock_ttl (float): Tempo máximo (em segundos) da trava de uma \
+            chamada, sem contar a espera da reserva.
+            result_ttl (float): Tempo (em segundos) em que o resultado publicado \
+            fica disponível no Redis.
+            poll_interval (float): Intervalo (em segundos) entre as consultas \
+            ao resultado de uma chamada em outro worker.
+        """
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._stats = {"calls": 0, "local_coalesced": 0, "remote_coalesced": 0}
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = Lock()
+        self._redis = Redis.from_url(redis_url)
+        self._release_script = self._redis.register_script(RELEASE_SCRIPT)
+        self._extend_script = self._redis.register_script(EXTEND_SCRIPT)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _get_keys(self, key: str) -> tuple[str, str]:
+        return (
+            f"{SINGLEFLIGHT_PREFIX}:lock:{key}",
+            f"{SINGLEFLIGHT_PREFIX}:result:{key}",
+        )
+
+    def _poll(self, key: str) -> tuple[bool, object, bool]:
+        """
+        Consulta o resultado publicado e a trava de uma chave.
+
+        Returns:
+            tuple: Uma tupla indicando se o resultado existe, o resultado e se \
+            a trava está ativa.
+        """
+        lock_key, result_key = self._get_keys(key)
+        with self._redis.pipeline() as pipe:
+            pipe.get(result_key)
+            pipe.exists(lock_key)
+            result, locked = pipe.execute()
+
+        if result is None:
+            return False, None, bool(locked)
+        return True, loads(result), bool(locked)
+
+    def _acquire(self, key: str, token: str) -> bool:
+        lock_key, _ = self._get_keys(key)
+        return bool(
+            self._redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        )
+
+    def _publish(self, key: str, token: str, result) -> None:
+        lock_key, result_key = self._get_keys(key)
+        try:
+            self._redis.set(result_key, dumps(result), px=int(self.result_ttl * 1000))
+        except RedisError:
+            pass
+        self._release(key, token)
+
+    def _release(self, key: str, token: str) -> None:
+        lock_key, _ = self._get_keys(key)
+        try:
+            self._release_script(keys=[lock_key], args=[token])
+        except RedisError:
+            pass
+
+    def _extend(self, key: str, token: str, ttl: float) -> None:
+        lock_key, _ = self._get_keys(key)
+        try:
+            self._extend_script(keys=[lock_key], args=[token, int(ttl * 1000)])
+        except RedisError:
+            pass
+
+    def _fetch(
+        self,
+        fetch: Callable[[], object],
+        reserve: Callable[[], float] = None,
+        key: str = None,
+        token: str = None,
+    ):
+        """
+        Faz a chamada, aguardando antes o tempo da reserva, caso exista. Com a
+        trava adquirida, ela é estendida pelo tempo de espera, para que não
+        expire enquanto a chamada aguarda o limitador de taxa.
+        """
+        if reserve is not None:
+            delay = reserve()
+            if token is not None:
+                self._extend(key, token, delay + self.lock_ttl)
+            time.sleep(delay)
+        return fetch()
+
+    async def _fetch_async(
+        self,
+        fetch: Callable[[], Awaitable],
+        reserve: Callable[[], float] = None,
+        key: str = None,
+        token: str = None,
+    ):
+        if reserve is not None:
+            delay = await asyncio.to_thread(reserve)
+            if token is not None:
+                await asyncio.to_thread(self._extend, key, token, delay + self.lock_ttl)
+            await asyncio.sleep(delay)
+        return await fetch()
+
+    def _wait_remote(self, key: str) -> tuple[str, object]:
+        """
+        Tenta obter o resultado de uma chave no Redis, adquirindo a trava caso
+        ninguém esteja buscando o recurso.
+
+        Returns:
+            tuple: O estado ('result', 'acquired', 'wait' ou 'fallback') e o \
+            resultado ou o token da trava adquirida.
+        """
+        try:
+            found, result, locked = self._poll(key)
+            if found:
+                return "result", result
+            if not locked:
+                token = uuid.uuid4().hex
+                if self._acquire(key, token):
+                    return "acquired", token
+            return "wait", None
+        except RedisError:
+            return "fallback", None
+
+    def _do_remote(
+        self, key: str, fetch: Callable[[], object], reserve: Callable[[], float]
+    ):
+        # A espera é limitada pela expiração da trava: sem trava nem resultado,
+        # a própria chamada adquire a trava.
+        while True:
+            state, value = self._wait_remote(key)
+            if state == "result":
+                self._count("remote_coalesced")
+                return value
+            if state == "acquired":
+                try:
+                    result = self._fetch(fetch, reserve, key, value)
+                except Exception:
+                    self._release(key, value)
+                    raise
+                self._publish(key, value, result)
+                return result
+            if state == "fallback":
+                return self._fetch(fetch, reserve)
+            time.sleep(self.poll_interval)
+
+    async def _do_remote_async(
+        self, key: str, fetch: Callable[[], Awaitable], reserve: Callable[[], float]
+    ):
+        while True:
+            state, value = await asyncio.to_thread(self._wait_remote, key)
+            if state == "result":
+                self._count("remote_coalesced")
+                return value
+            if state == "acquired":
+                try:
+                    result = await self._fetch_async(fetch, reserve, key, value)
+                except Exception:
+                    await asyncio.to_thread(self._release, key, value)
+                    raise
+                await asyncio.to_thread(self._publish, key, value, result)
+                return result
+            if state == "fallback":
+                return await self._fetch_async(fetch, reserve)
+            await asyncio.sleep(self.poll_interval)
+
+    def do(
+        self,
+        key: str,
+        fetch: Callable[[], object],
+        reserve: Callable[[], float] = None,
+    ):
+        """
+        Executa 'fetch' apenas se nenhuma outra chamada com a mesma chave estiver
+        em andamento, no processo ou em outro worker, e retorna o resultado
+        compartilhado caso contrário.
+
+        O resultado precisa ser serializável em JSON para ser compartilhado
+        entre workers.
+
+        A reserva no limitador de taxa deve ser feita por 'reserve', e não por
+        'fetch': assim, apenas a chamada que adquiriu a trava consome a cota da
+        API, e a trava é estendida pelo tempo de espera da reserva.
+
+        Args:
+            key (str): A chave do recurso (e.g., 'match:BR1_123').
+            fetch (Callable): A função que busca o recurso.
+            reserve (Callable, opcional): A função que reserva o horário da \
+            requisição e retorna o tempo (em segundos) a aguardar antes de \
+            'fetch' (e.g., 'RedisRateLimiter.reserve').
+
+        Returns:
+            O resultado de 'fetch'.
+        """
+        self._count("calls")
+
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            self._count("local_coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_remote(key, fetch, reserve)
+            return call.result
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable],
+        reserve: Callable[[], float] = None,
+    ):
+        """
+        Versão assíncrona de 'do', em que 'fetch' retorna uma corrotina e as
+        chamadas do mesmo event loop com a mesma chave aguardam a mesma
+        corrotina. 'reserve' é chamada em uma thread.
+        """
+        self._count("calls")
+
+        future = self._async_calls.get(key)
+        if future is not None:
+            self._count("local_coalesced")
+            return await asyncio.shield(future)
+
+        future = self._async_calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._do_remote_async(key, fetch, reserve)
+            future.set_result(result)
+            return result
+        except Exception as error:
+            future.set_exception(error)
+            # Marca a exceção como consumida caso nenhuma outra chamada aguarde.
+            future.exception()
+            raise
+        finally:
+            del self._async_calls[key]
+            if not future.done():
+                future.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+singleflight = SingleFlight(REWIND_CACHE_REDIS_URL)
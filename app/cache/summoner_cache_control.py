@@ -0,0 +1,86 @@
+import os
+from threading import Lock
+
+from redis import Redis
+from redis.exceptions import RedisError
+from serialization import dumps, loads
+
+from .rewind_cache_control import REWIND_CACHE_REDIS_URL
+
+SUMMONER_CACHE_TTL = int(os.environ.get("SUMMONER_CACHE_TTL", 24 * 60 * 60))
+
+SUMMONER_CACHE_PREFIX = "summoner_cache"
+
+
+class SummonerCache:
+    def __init__(self, redis_url: str, ttl: int) -> None:
+        """
+        Inicializa o cache no Redis das informações (nome, nível e ícone) dos
+        invocadores, indexadas pela região e pelo puuid.
+
+        Args:
+            redis_url (str): URL de conexão com o Redis.
+            ttl (int): Tempo de expiração (em segundos) das informações.
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._redis = Redis.from_url(redis_url)
+
+    def _get_key(self, region: str, puuid: str) -> str:
+        return f"{SUMMONER_CACHE_PREFIX}:{region}:{puuid}"
+
+    def get_many(self, region: str, puuids: list[str]) -> dict:
+        """
+        Busca as informações dos invocadores com um único MGET.
+
+        Args:
+            region (str): A região dos invocadores.
+            puuids (list[str]): Lista de puuids.
+
+        Returns:
+            dict: Dicionário com as informações encontradas, indexado pelo \
+            puuid.
+        """
+        puuids = list(puuids)
+        if not puuids:
+            return {}
+
+        try:
+            cached = self._redis.mget(
+                [self._get_key(region, puuid) for puuid in puuids]
+            )
+        except RedisError:
+            cached = [None] * len(puuids)
+
+        summoners = {
+            puuid: loads(summoner)
+            for puuid, summoner in zip(puuids, cached)
+            if summoner is not None
+        }
+
+        with self._lock:
+            self.hits += len(summoners)
+            self.misses += len(puuids) - len(summoners)
+
+        return summoners
+
+    def set_many(self, region: str, summoners: dict) -> None:
+        if not summoners:
+            return
+
+        try:
+            with self._redis.pipeline(transaction=False) as pipe:
+                for puuid, summoner in summoners.items():
+                    pipe.set(self._get_key(region, puuid), dumps(summoner), ex=self.ttl)
+                pipe.execute()
+        except RedisError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+summoner_cache = SummonerCache(REWIND_CACHE_REDIS_URL, SUMMONER_CACHE_TTL)
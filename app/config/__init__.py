@@ -1 +1,4 @@
+from .config import ASYNC_DATABASE_URL  # noqa
+from .config import DATABASE_MAX_OVERFLOW  # noqa
+from .config import DATABASE_POOL_SIZE  # noqa
 from .config import DATABASE_URL  # noqa
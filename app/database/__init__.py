@@ -1,2 +1,2 @@
-from .db import Base, SessionLocal, engine  # noqa
-from .decorator import dec_session, dec_session_local  # noqa
+from .db import AsyncSessionLocal, Base, SessionLocal, async_engine, engine  # noqa
+from .decorator import dec_async_session_local, dec_session, dec_session_local  # noqa
@@ -1,8 +1,8 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from sqlalchemy.orm import Session
 
-from .db import SessionLocal
+from .db import AsyncSessionLocal, SessionLocal
 
 
 @contextmanager
@@ -14,6 +14,12 @@ def db_session_local():
         db.close()
 
 
+@asynccontextmanager
+async def db_async_session_local():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 @contextmanager
 def db_session():
     db = Session()
@@ -37,3 +43,11 @@ def dec_session(func):
             return func(db, *args, **kwargs)
 
     return wrapper
+
+
+def dec_async_session_local(func):
+    async def wrapper(*args, **kwargs):
+        async with db_async_session_local() as db:
+            return await func(db, *args, **kwargs)
+
+    return wrapper
@@ -1 +1,2 @@
 from .player_not_found import PlayerNotFound  # noqa
+from .rate_limit_exceeded import RateLimitExceeded  # noqa
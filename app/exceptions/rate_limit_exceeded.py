@@ -0,0 +1,7 @@
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float = None) -> None:
+        super().__init__(
+            f"Limite de requisições da API da Riot excedido. "
+            f"Retry-After: {retry_after}"
+        )
+        self.retry_after = retry_after
@@ -1,15 +1,26 @@
-import json
-
 from celery.result import AsyncResult
 from database import Base, engine
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response, StreamingResponse
 from models import Match, Player, PlayerMatchAssociation
-from mongo import find_match_by_id, find_rewind_data_by_id
-from repository import get_player, get_player_by_name_and_region
-from tasks import get_summoner_info
-from utils import create_rewind
+from mongo import (
+    ensure_indexes,
+    find_match_by_id_async,
+    find_rewind_data_by_id_async,
+)
+from repository import get_player_async, get_player_by_name_and_region_async
+from serialization import JSONBytesResponse
+from tasks import (
+    PLAYER_INFO_TASK_PRIORITY,
+    acquire_pipeline_lock,
+    get_pipeline_key,
+    get_queue_wait_metrics,
+    get_summoner_info,
+    stream_progress,
+)
+from utils import create_rewind_cached
 
 app = FastAPI()
 
@@ -33,6 +44,8 @@ Base.metadata.create_all(
     checkfirst=True,
 )
 
+ensure_indexes()
+
 
 @app.get("/check")
 async def check(name: str, region: str) -> dict:
@@ -47,18 +60,33 @@ async def check(name: str, region: str) -> dict:
 
     Returns:
         dict: Retorna um dicionário indicando a existência do jogador,
-        o próprio jogador se existir, ou o ID da tarefa.
+        o próprio jogador se existir, ou o ID da tarefa, usado também para
+        acompanhar o pipeline em '/pipeline_progress/{task_id}'.
     """
     nick_name, riot_id = name.split("#")
-    player: Player = get_player_by_name_and_region(player_name=nick_name, region=region)
+    player: Player = await get_player_by_name_and_region_async(
+        player_name=nick_name, region=region
+    )
 
     if player and player.rewind_id is not None:
-        rewind = find_rewind_data_by_id(player.rewind_id)
-        return {"exists": True, "player": player.to_dict(), "rewind": rewind}
+        rewind = await find_rewind_data_by_id_async(player.rewind_id)
+        return JSONBytesResponse(
+            content={"exists": True, "player": player.to_dict(), "rewind": rewind}
+        )
 
-    task = get_summoner_info.delay(nick_name, riot_id, region)
+    # Consultas repetidas do mesmo jogador acompanham o pipeline em andamento
+    # em vez de iniciar outro.
+    acquired, task_id = await run_in_threadpool(
+        acquire_pipeline_lock, get_pipeline_key(region, nick_name, riot_id)
+    )
+    if acquired:
+        get_summoner_info.apply_async(
+            (nick_name, riot_id, region),
+            task_id=task_id,
+            priority=PLAYER_INFO_TASK_PRIORITY,
+        )
 
-    return {"exists": False, "task_id": task.id}
+    return {"exists": False, "task_id": task_id}
 
 
 @app.get("/get_task_result/{task_id}")
@@ -79,7 +107,7 @@ async def get_task_result(task_id: str) -> dict:
 
     if task_state == "SUCCESS":
         result = task.result
-        player = get_player(result["dados"]["puuid"])
+        player = await get_player_async(result["dados"]["puuid"])
         player = player.to_dict()
 
         return {
@@ -112,6 +140,38 @@ async def delete_task_from_id(task_id: str) -> dict:
     return {"message": f"Task {task_id} não encontrada"}
 
 
+@app.get("/pipeline_progress/{task_id}")
+async def pipeline_progress(task_id: str) -> StreamingResponse:
+    """
+    Rota que acompanha o pipeline de um jogador por server-sent events, com a
+    etapa atual, as partidas buscadas, as falhas e o tempo restante estimado,
+    desde a busca do jogador até a geração da rewind ou a falha do pipeline.
+
+    Args:
+        task_id (str): ID da tarefa retornado pela rota '/check'.
+
+    Returns:
+        StreamingResponse: O fluxo de eventos do progresso.
+    """
+    return StreamingResponse(
+        stream_progress(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/queue_metrics")
+async def queue_metrics() -> dict:
+    """
+    Rota que retorna o tempo de espera e a quantidade de tarefas aguardando em
+    cada fila do Celery.
+
+    Returns:
+        dict: As métricas de cada fila, indexadas pelo nome da fila.
+    """
+    return await run_in_threadpool(get_queue_wait_metrics)
+
+
 @app.get("/summoner_statistics/{region}/{summoner_name}")
 async def summoner_statistics(
     region: str = "br1", summoner_name: str = "NickName#RiotID"
@@ -127,12 +187,12 @@ async def summoner_statistics(
     """
     name, riot_id = summoner_name.split("#")
 
-    player = get_player_by_name_and_region(player_name=name, region=region)
+    player = await get_player_by_name_and_region_async(player_name=name, region=region)
 
-    statistics = find_rewind_data_by_id(player.rewind_id)
+    statistics = await find_rewind_data_by_id_async(player.rewind_id)
 
     if statistics:
-        return JSONResponse(
+        return JSONBytesResponse(
             content={"player_name": name, "riot_id": riot_id, "statistics": statistics}
         )
     return {"message": "Estatistica ainda não gerada!"}
@@ -140,25 +200,23 @@ async def summoner_statistics(
 
 @app.get("/summoner_statistics_by_puuid/{puuid}")
 async def summoner_statistics_by_puuid(puuid: str) -> dict:
-    return JSONResponse(
-        content=create_rewind(puuid),
+    return JSONBytesResponse(
+        content=await run_in_threadpool(create_rewind_cached, puuid),
     )
 
 
 @app.get("/get_match_info_by_match_id/{match_id}")
 async def get_match_info_by_match_id(match_id: str) -> dict:
-    document = find_match_by_id(match_id)
+    document = await find_match_by_id_async(match_id)
     if document:
-        json_result = json.dumps(document, default=str)
-        return JSONResponse(content=json_result, media_type="application/json")
-    return JSONResponse(content={"error": "Documento não encontrado"})
+        return JSONBytesResponse(content=document)
+    return JSONBytesResponse(content={"error": "Documento não encontrado"})
 
 
 @app.get("/moc")
 async def moc() -> dict:
-    with open("./utils/statistics_example.json") as f:
-        json_result = json.load(f)
-    return JSONResponse(content=json_result, media_type="application/json")
+    with open("./utils/statistics_example.json", "rb") as f:
+        return Response(content=f.read(), media_type="application/json")
 
 
 if __name__ == "__main__":
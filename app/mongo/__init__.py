@@ -1,7 +1,20 @@
+from .async_operations import find_match_by_id_async  # noqa
+from .async_operations import find_rewind_data_by_id_async  # noqa
+from .match_buffer import MatchIngestionBuffer  # noqa
+from .match_cache_control import MatchCache  # noqa
+from .match_cache_control import match_cache  # noqa
+from .operations import count_matches_by_puuid  # noqa
+from .operations import ensure_indexes  # noqa
 from .operations import find_match_by_id  # noqa
 from .operations import find_matches_by_ids  # noqa
 from .operations import find_matches_by_puuid  # noqa
+from .operations import find_matches_fingerprint_by_puuid  # noqa
 from .operations import find_rewind_data_by_id  # noqa
+from .operations import find_rewind_state_by_id  # noqa
 from .operations import insert_many_matches_data  # noqa
 from .operations import insert_match_data  # noqa
 from .operations import insert_rewind_data  # noqa
+from .operations import iter_matches_by_puuid  # noqa
+from .operations import update_rewind_data  # noqa
+from .operations import upsert_matches_data  # noqa
+from .operations import upsert_rewind_state  # noqa
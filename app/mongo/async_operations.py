@@ -0,0 +1,25 @@
+from bson.objectid import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from .operations import (
+    MONGO_COLLECTION_NAME,
+    MONGO_COLLECTION_NAME_REWIND,
+    MONGO_DB_NAME,
+    MONGO_DB_URL,
+)
+
+async_client = AsyncIOMotorClient(MONGO_DB_URL)
+
+async_db = async_client[MONGO_DB_NAME]
+
+
+async def find_match_by_id_async(match_id: str):
+    return await async_db[MONGO_COLLECTION_NAME].find_one(
+        {"metadata.matchId": match_id}, {"_id": 0}
+    )
+
+
+async def find_rewind_data_by_id_async(id_rewind: str):
+    return await async_db[MONGO_COLLECTION_NAME_REWIND].find_one(
+        {"_id": ObjectId(id_rewind)}, {"_id": 0, "rewind_state": 0}
+    )
@@ -0,0 +1,38 @@
+from itertools import islice
+
+from .operations import (
+    MONGO_COLLECTION_NAME,
+    db,
+    ensure_indexes,
+    match_projection,
+    upsert_player_matches_data,
+)
+
+BACKFILL_BATCH_SIZE = 200
+
+
+def backfill_player_matches(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Comando que preenche a coleção compacta das partidas por jogador a partir
+    das partidas já armazenadas. Pode ser executado novamente, pois os
+    documentos existentes não são alterados.
+
+    Parâmetros:
+    - batch_size (int): Quantidade de partidas processadas por lote.
+
+    Retorna:
+    - int: A quantidade de documentos inseridos.
+    """
+    ensure_indexes()
+
+    inserted = 0
+    matches = db[MONGO_COLLECTION_NAME].find(
+        {}, match_projection, batch_size=batch_size
+    )
+    while batch := list(islice(matches, batch_size)):
+        inserted += upsert_player_matches_data(batch)
+    return inserted
+
+
+if __name__ == "__main__":
+    print(f"{backfill_player_matches()} documentos de partidas por jogador inseridos.")
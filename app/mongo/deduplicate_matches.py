@@ -0,0 +1,58 @@
+from itertools import islice
+
+from .operations import MONGO_COLLECTION_NAME, db, ensure_indexes
+
+DELETE_BATCH_SIZE = 1000
+
+
+def iter_duplicated_match_ids():
+    """
+    Percorre os '_id' dos documentos duplicados da coleção de partidas,
+    mantendo, para cada 'metadata.matchId', o primeiro documento inserido.
+    """
+    duplicates = db[MONGO_COLLECTION_NAME].aggregate(
+        [
+            {"$sort": {"_id": 1}},
+            {
+                "$group": {
+                    "_id": "$metadata.matchId",
+                    "ids": {"$push": "$_id"},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+        allowDiskUse=True,
+    )
+    for duplicate in duplicates:
+        yield from duplicate["ids"][1:]
+
+
+def deduplicate_matches(batch_size: int = DELETE_BATCH_SIZE) -> int:
+    """
+    Migração que remove as partidas duplicadas e cria os índices da coleção de
+    partidas, incluindo o índice único de 'metadata.matchId'.
+
+    Parâmetros:
+    - batch_size (int): Quantidade de documentos removidos por operação.
+
+    Retorna:
+    - int: A quantidade de documentos removidos.
+    """
+    deleted = 0
+    duplicated_ids = iter_duplicated_match_ids()
+    while batch := list(islice(duplicated_ids, batch_size)):
+        result = db[MONGO_COLLECTION_NAME].delete_many({"_id": {"$in": batch}})
+        deleted += result.deleted_count
+
+    try:
+        ensure_indexes()
+    except RuntimeError as error:
+        raise RuntimeError(
+            "Partidas duplicadas inseridas durante a migração."
+        ) from error
+    return deleted
+
+
+if __name__ == "__main__":
+    print(f"{deduplicate_matches()} partidas duplicadas removidas.")
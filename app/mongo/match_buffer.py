@@ -0,0 +1,108 @@
+import os
+import time
+from collections.abc import Callable
+
+from pymongo.errors import PyMongoError
+
+from .operations import upsert_matches_data
+
+MATCH_BUFFER_MAX_SIZE = int(os.environ.get("MATCH_BUFFER_MAX_SIZE", 50))
+MATCH_BUFFER_MAX_WAIT = float(os.environ.get("MATCH_BUFFER_MAX_WAIT", 10))
+
+
+class MatchIngestionBuffer:
+    def __init__(
+        self,
+        max_size: int = MATCH_BUFFER_MAX_SIZE,
+        max_wait: float = MATCH_BUFFER_MAX_WAIT,
+        on_flush: Callable[[dict], None] = None,
+    ) -> None:
+        """
+        Inicializa um buffer de partidas que são gravadas no MongoDB em lote,
+        com upserts identificados pelo matchId (ver 'upsert_matches_data').
+
+        O buffer é descarregado quando atinge 'max_size' partidas ou quando a
+        partida mais antiga está no buffer há mais de 'max_wait' segundos, e ao
+        sair do bloco 'with'.
+
+        Args:
+            max_size (int): Quantidade máxima de partidas no buffer.
+            max_wait (float): Tempo máximo (em segundos) de uma partida no \
+            buffer antes do descarregamento.
+            on_flush (Callable, opcional): Função chamada com o resultado de \
+            cada descarregamento bem-sucedido. Seus erros são registrados e \
+            não interrompem a ingestão, pois as partidas já foram gravadas.
+        """
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.on_flush = on_flush
+        self.new = []
+        self.existing = []
+        self.failed = []
+        self._matches = []
+        self._first_added_at = None
+
+    def __enter__(self) -> "MatchIngestionBuffer":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def add(self, match_data: dict) -> dict:
+        """
+        Adiciona uma partida ao buffer, descarregando-o caso algum limite tenha
+        sido atingido.
+
+        Returns:
+            dict: O resultado do descarregamento ou None caso o buffer não \
+            tenha sido descarregado.
+        """
+        if not self._matches:
+            self._first_added_at = time.monotonic()
+        self._matches.append(match_data)
+
+        if (
+            len(self._matches) >= self.max_size
+            or time.monotonic() - self._first_added_at >= self.max_wait
+        ):
+            return self.flush()
+        return None
+
+    def flush(self) -> dict:
+        """
+        Grava as partidas do buffer. Em caso de erro do MongoDB, os matchIds do
+        lote são adicionados a 'failed' e o buffer é esvaziado.
+
+        Returns:
+            dict: Os matchIds das partidas novas ('new') e já existentes \
+            ('existing') do lote.
+        """
+        matches, self._matches = self._matches, []
+        if not matches:
+            return {"new": [], "existing": []}
+
+        try:
+            result = upsert_matches_data(matches)
+        except PyMongoError as error:
+            print(f"Falha ao gravar {len(matches)} partidas. {error}")
+            self.failed.extend(match["metadata"]["matchId"] for match in matches)
+            return {"new": [], "existing": []}
+
+        self.new.extend(result["new"])
+        self.existing.extend(result["existing"])
+        if self.on_flush is not None:
+            try:
+                self.on_flush(result)
+            except Exception as error:
+                print(f"Falha ao processar {len(matches)} partidas gravadas. {error}")
+        return result
+
+    def summary(self) -> dict:
+        return {
+            "new": len(self.new),
+            "existing": len(self.existing),
+            "failed": len(self.failed),
+        }
@@ -0,0 +1,146 @@
+import gzip
+import os
+import tempfile
+from threading import Lock
+
+from pymongo.errors import PyMongoError
+from serialization import dumps, loads
+
+from .operations import find_match_by_id, find_matches_by_ids
+
+MATCH_CACHE_DIR = os.environ.get("MATCH_CACHE_DIR", "")
+
+
+class MatchCache:
+    def __init__(self, disk_dir: str = MATCH_CACHE_DIR) -> None:
+        """
+        Inicializa o cache das partidas da Match-V5, que não mudam depois de
+        terminadas, consultado antes de gastar uma requisição com a partida.
+
+        O primeiro nível, opcional, guarda cada partida em um arquivo JSON
+        comprimido com gzip em 'disk_dir'. O segundo nível é a coleção de
+        partidas do MongoDB, gravada pela ingestão (ver 'MatchIngestionBuffer').
+
+        Args:
+            disk_dir (str, opcional): Diretório do nível em disco. Vazio \
+            desativa o nível em disco.
+        """
+        self.disk_dir = disk_dir
+        self.disk_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _get_path(self, match_id: str) -> str:
+        return os.path.join(self.disk_dir, f"{match_id}.json.gz")
+
+    def _count(self, disk_hits: int = 0, mongo_hits: int = 0, misses: int = 0):
+        with self._lock:
+            self.disk_hits += disk_hits
+            self.mongo_hits += mongo_hits
+            self.misses += misses
+
+    def _read_disk(self, match_id: str) -> dict:
+        if not self.disk_dir:
+            return None
+
+        try:
+            with gzip.open(self._get_path(match_id), "rb") as file:
+                return loads(file.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, match_id: str, match_data: dict) -> None:
+        if not self.disk_dir:
+            return
+
+        try:
+            # Grava em um arquivo temporário e o renomeia, para que leituras
+            # concorrentes nunca encontrem um arquivo incompleto.
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.disk_dir)
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(gzip.compress(dumps(match_data)))
+            os.replace(temp_path, self._get_path(match_id))
+        except OSError:
+            pass
+
+    def get(self, match_id: str) -> dict:
+        """
+        Busca a partida no disco e, em seguida, no MongoDB.
+
+        Returns:
+            dict: A partida ou None caso ainda não tenha sido buscada.
+        """
+        match_data = self._read_disk(match_id)
+        if match_data is not None:
+            self._count(disk_hits=1)
+            return match_data
+
+        try:
+            match_data = find_match_by_id(match_id)
+        except PyMongoError:
+            match_data = None
+
+        if match_data is None:
+            self._count(misses=1)
+            return None
+
+        self._count(mongo_hits=1)
+        self._write_disk(match_id, match_data)
+        return match_data
+
+    def get_many(self, match_ids: list[str]) -> dict:
+        """
+        Busca as partidas no disco e as restantes no MongoDB com uma única
+        consulta.
+
+        Args:
+            match_ids (list[str]): Lista de IDs das partidas.
+
+        Returns:
+            dict: Dicionário com as partidas encontradas, indexado pelo matchId.
+        """
+        matches = {}
+        for match_id in match_ids:
+            match_data = self._read_disk(match_id)
+            if match_data is not None:
+                matches[match_id] = match_data
+        disk_hits = len(matches)
+
+        remaining_ids = [match_id for match_id in match_ids if match_id not in matches]
+        if remaining_ids:
+            try:
+                for match_data in find_matches_by_ids(remaining_ids):
+                    match_id = match_data["metadata"]["matchId"]
+                    matches[match_id] = match_data
+                    self._write_disk(match_id, match_data)
+            except PyMongoError:
+                pass
+
+        self._count(
+            disk_hits=disk_hits,
+            mongo_hits=len(matches) - disk_hits,
+            misses=len(set(match_ids)) - len(matches),
+        )
+        return matches
+
+    def set(self, match_id: str, match_data: dict) -> None:
+        """
+        Guarda no disco uma partida buscada na API. O nível do MongoDB é gravado
+        pela ingestão das partidas.
+        """
+        self._write_disk(match_id, match_data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "disk_hits": self.disk_hits,
+                "mongo_hits": self.mongo_hits,
+                "misses": self.misses,
+            }
+
+
+match_cache = MatchCache()
@@ -1,7 +1,10 @@
 import os
 
 from bson.objectid import ObjectId
-from pymongo import MongoClient
+from cache import invalidate_rewind_cache
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.command_cursor import CommandCursor
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 MONGO_DB_USER = os.environ.get("MONGO_INITDB_ROOT_USERNAME", "admin")
 MONGO_DB_PASSWORD = os.environ.get("MONGO_INITDB_ROOT_PASSWORD", "adminpassword")
@@ -13,6 +16,20 @@ MONGO_COLLECTION_NAME = "lol_matches"
 
 MONGO_COLLECTION_NAME_REWIND = "lol_rewind"
 
+# O estado da rewind (ver 'utils.rewind_state') fica separado do documento da
+# rewind, indexado pelo mesmo '_id', pois os contadores por jogador crescem
+# com a quantidade de partidas.
+MONGO_COLLECTION_NAME_REWIND_STATE = "lol_rewind_state"
+
+MONGO_COLLECTION_NAME_PLAYER_MATCHES = "lol_player_matches"
+
+MATCH_ID_INDEX_NAME = "match_id_unique"
+MATCHES_BY_PUUID_INDEX_NAME = "participants_game_creation"
+PLAYER_MATCH_ID_INDEX_NAME = "match_id_puuid_unique"
+PLAYER_MATCHES_BY_PUUID_INDEX_NAME = "puuid_game_creation"
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
 MONGO_DB_URL = (
     f"mongodb://{MONGO_DB_USER}:{MONGO_DB_PASSWORD}@{MONGO_DB_HOST}:{MONGO_DB_PORT}"
 )
@@ -21,13 +38,335 @@ client = MongoClient(MONGO_DB_URL)
 
 db = client[MONGO_DB_NAME]
 
+match_projection = {
+    "_id": 0,
+    "metadata.matchId": 1,
+    "metadata.participants": 1,
+    "info.gameCreation": 1,
+    "info.gameDuration": 1,
+    "info.gameEndTimestamp": 1,
+    "info.gameStartTimestamp": 1,
+    "info.gameMode": 1,
+    "info.participants.puuid": 1,
+    "info.participants.teamId": 1,
+    "info.participants.assists": 1,
+    "info.participants.deaths": 1,
+    "info.participants.kills": 1,
+    "info.participants.doubleKills": 1,
+    "info.participants.tripleKills": 1,
+    "info.participants.quadraKills": 1,
+    "info.participants.pentaKills": 1,
+    "info.participants.firstBloodKill": 1,
+    "info.participants.dragonKills": 1,
+    "info.participants.totalDamageDealt": 1,
+    "info.participants.totalDamageDealtToChampions": 1,
+    "info.participants.magicDamageDealt": 1,
+    "info.participants.magicDamageDealtToChampions": 1,
+    "info.participants.totalHealsOnTeammates": 1,
+    "info.participants.visionScore": 1,
+    "info.participants.goldEarned": 1,
+    "info.participants.goldSpent": 1,
+    "info.participants.turretTakedowns": 1,
+    "info.participants.firstTowerKill": 1,
+    "info.participants.wardsKilled": 1,
+    "info.participants.wardsPlaced": 1,
+    "info.participants.damageSelfMitigated": 1,
+    "info.participants.killingSprees": 1,
+    "info.participants.largestCriticalStrike": 1,
+    "info.participants.largestKillingSpree": 1,
+    "info.participants.objectivesStolen": 1,
+    "info.participants.totalMinionsKilled": 1,
+    "info.participants.totalTimeCCDealt": 1,
+    "info.participants.totalAllyJungleMinionsKilled": 1,
+    "info.participants.baronTakedowns": 1,
+    "info.participants.championName": 1,
+    "info.participants.championId": 1,
+    "info.participants.win": 1,
+    "info.participants.teamPosition": 1,
+    "info.participants.item0": 1,
+    "info.participants.item1": 1,
+    "info.participants.item2": 1,
+    "info.participants.item3": 1,
+    "info.participants.item4": 1,
+    "info.participants.item5": 1,
+    "info.participants.item6": 1,
+    "info.participants.challenges": 1,
+    "info.participants.profileIcon": 1,
+    "info.participants.summonerLevel": 1,
+    "info.teams.bans": 1,
+    "info.teams.objectives.kills": 1,
+    "info.teams.objectives.dragon": 1,
+    "info.teams.objectives.baron": 1,
+    "info.teams.teamId": 1,
+}
+
+
+def get_projection_tree(projection: dict) -> dict:
+    """
+    Converte uma projeção de inclusão do MongoDB ('a.b.c': 1) em uma árvore de
+    campos ({'a': {'b': {'c': True}}}) usada por 'project_document'.
+    """
+    tree = {}
+    for path, included in projection.items():
+        if not included:
+            continue
+        *parents, field = path.split(".")
+        node = tree
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[field] = True
+    return tree
+
+
+def project_document(document, tree: dict):
+    """
+    Aplica uma árvore de campos de 'get_projection_tree' a um documento, com a
+    mesma semântica da projeção de inclusão do MongoDB para listas de
+    subdocumentos.
+    """
+    if isinstance(document, list):
+        return [project_document(item, tree) for item in document]
+    if not isinstance(document, dict):
+        return document
+    return {
+        field: (
+            document[field]
+            if subtree is True
+            else project_document(document[field], subtree)
+        )
+        for field, subtree in tree.items()
+        if field in document
+    }
+
+
+match_projection_tree = get_projection_tree(match_projection)
+
+
+def build_player_matches(match_data: dict) -> list[dict]:
+    """
+    Monta os documentos compactos da partida para cada participante, no formato
+    das partidas da Match-V5 e com apenas os campos de 'match_projection'.
+
+    Em cada documento, apenas o participante do documento mantém todos os
+    campos; os demais mantêm o 'puuid' e o 'teamId'. Apenas a equipe do
+    participante é mantida em 'info.teams'.
+
+    Parâmetros:
+    - match_data (dict): A partida retornada pela API da Riot.
+
+    Retorna:
+    - list[dict]: Lista com um documento por participante, identificado pelos
+      campos 'metadata.matchId' e 'puuid'.
+    """
+    match = project_document(match_data, match_projection_tree)
+    info = match.get("info", {})
+    participants = info.get("participants", [])
+    teams = info.get("teams", [])
+    participants_keys = [
+        {"puuid": participant.get("puuid"), "teamId": participant.get("teamId")}
+        for participant in participants
+    ]
+
+    return [
+        {
+            "puuid": participant.get("puuid"),
+            "metadata": match["metadata"],
+            "info": {
+                **info,
+                "participants": [
+                    participant if index == participant_index else participant_keys
+                    for participant_index, participant_keys in enumerate(
+                        participants_keys
+                    )
+                ],
+                "teams": [
+                    team
+                    for team in teams
+                    if team.get("teamId") == participant.get("teamId")
+                ],
+            },
+        }
+        for index, participant in enumerate(participants)
+    ]
+
+
+def upsert_player_matches_data(matches_data: list[dict]) -> int:
+    """
+    Insere os documentos compactos de 'build_player_matches' das partidas que
+    ainda não existem, com upserts identificados pelo matchId e pelo puuid.
+
+    Parâmetros:
+    - matches_data (list[dict]): Lista de partidas retornadas pela API da Riot.
+
+    Retorna:
+    - int: A quantidade de documentos inseridos.
+    """
+    requests = [
+        UpdateOne(
+            {
+                "metadata.matchId": player_match["metadata"]["matchId"],
+                "puuid": player_match["puuid"],
+            },
+            {"$setOnInsert": player_match},
+            upsert=True,
+        )
+        for match_data in matches_data
+        for player_match in build_player_matches(match_data)
+    ]
+    if not requests:
+        return 0
+
+    try:
+        result = db[MONGO_COLLECTION_NAME_PLAYER_MATCHES].bulk_write(
+            requests, ordered=False
+        )
+        return result.upserted_count
+    except BulkWriteError as error:
+        if any(
+            write_error["code"] != DUPLICATE_KEY_ERROR_CODE
+            for write_error in error.details["writeErrors"]
+        ):
+            raise
+        return error.details["nUpserted"]
+
+
+def ensure_indexes() -> None:
+    """
+    Cria os índices da coleção de partidas: o índice único de 'metadata.matchId',
+    que impede partidas duplicadas, e o índice multikey de
+    'metadata.participants' e 'info.gameCreation'. Cria também os índices da
+    coleção compacta das partidas por jogador: o índice de 'puuid' e
+    'info.gameCreation', usado pelas consultas das partidas de um jogador, e o
+    índice único de 'metadata.matchId' e 'puuid'.
+
+    O índice único só pode ser criado depois de remover as partidas duplicadas
+    com a migração 'python -m mongo.deduplicate_matches'. Sem ele, a gravação
+    das partidas não impede duplicatas, então a aplicação não deve iniciar.
+
+    Exceções:
+    - RuntimeError: Caso existam partidas duplicadas.
+    """
+    db[MONGO_COLLECTION_NAME].create_index(
+        [("metadata.participants", ASCENDING), ("info.gameCreation", ASCENDING)],
+        name=MATCHES_BY_PUUID_INDEX_NAME,
+    )
+    db[MONGO_COLLECTION_NAME_PLAYER_MATCHES].create_index(
+        [("puuid", ASCENDING), ("info.gameCreation", ASCENDING)],
+        name=PLAYER_MATCHES_BY_PUUID_INDEX_NAME,
+    )
+    db[MONGO_COLLECTION_NAME_PLAYER_MATCHES].create_index(
+        [("metadata.matchId", ASCENDING), ("puuid", ASCENDING)],
+        unique=True,
+        name=PLAYER_MATCH_ID_INDEX_NAME,
+    )
+    try:
+        db[MONGO_COLLECTION_NAME].create_index(
+            "metadata.matchId", unique=True, name=MATCH_ID_INDEX_NAME
+        )
+    except DuplicateKeyError as error:
+        raise RuntimeError(
+            "Existem partidas duplicadas, execute a migração "
+            "'python -m mongo.deduplicate_matches'."
+        ) from error
+
+
+def insert_match_data(match_data: dict) -> bool:
+    try:
+        db[MONGO_COLLECTION_NAME].insert_one(match_data)
+    except DuplicateKeyError:
+        return False
+    upsert_player_matches_data([match_data])
+    invalidate_rewind_cache(match_data["metadata"]["participants"])
+    return True
+
+
+def insert_many_matches_data(matches_data: list[dict]) -> int:
+    try:
+        inserted = len(
+            db[MONGO_COLLECTION_NAME]
+            .insert_many(matches_data, ordered=False)
+            .inserted_ids
+        )
+    except BulkWriteError as error:
+        if any(
+            write_error["code"] != DUPLICATE_KEY_ERROR_CODE
+            for write_error in error.details["writeErrors"]
+        ):
+            raise
+        inserted = error.details["nInserted"]
+    upsert_player_matches_data(matches_data)
+    invalidate_rewind_cache(
+        list(
+            {
+                puuid
+                for match in matches_data
+                for puuid in match["metadata"]["participants"]
+            }
+        )
+    )
+    return inserted
+
+
+def upsert_matches_data(matches_data: list[dict]) -> dict:
+    """
+    Insere as partidas que ainda não existem na coleção com um único
+    'bulk_write' não ordenado de upserts identificados pelo 'metadata.matchId'.
+    As partidas já existentes não são alteradas.
+
+    Parâmetros:
+    - matches_data (list[dict]): Lista de partidas retornadas pela API da Riot.
+
+    Retorna:
+    - dict: Um dicionário com os matchIds das partidas novas ('new') e das que
+      já existiam ('existing').
+    """
+    matches_by_id = {match["metadata"]["matchId"]: match for match in matches_data}
+    match_ids = list(matches_by_id)
+    if not match_ids:
+        return {"new": [], "existing": []}
+
+    requests = [
+        UpdateOne(
+            {"metadata.matchId": match_id},
+            {"$setOnInsert": matches_by_id[match_id]},
+            upsert=True,
+        )
+        for match_id in match_ids
+    ]
+
+    try:
+        upserted = db[MONGO_COLLECTION_NAME].bulk_write(requests, ordered=False)
+        upserted_indexes = set(upserted.upserted_ids)
+    except BulkWriteError as error:
+        # Upserts concorrentes da mesma partida violam o índice único; a partida
+        # foi inserida pela outra escrita e é tratada como existente.
+        if any(
+            write_error["code"] != DUPLICATE_KEY_ERROR_CODE
+            for write_error in error.details["writeErrors"]
+        ):
+            raise
+        upserted_indexes = {upsert["index"] for upsert in error.details["upserted"]}
 
-def insert_match_data(match_data: dict) -> None:
-    db[MONGO_COLLECTION_NAME].insert_one(match_data)
+    upsert_player_matches_data(list(matches_by_id.values()))
 
+    new_ids = [match_ids[index] for index in sorted(upserted_indexes)]
+    existing_ids = [
+        match_id
+        for index, match_id in enumerate(match_ids)
+        if index not in upserted_indexes
+    ]
 
-def insert_many_matches_data(matches_data: list[dict]) -> None:
-    db[MONGO_COLLECTION_NAME].insert_many(matches_data)
+    invalidate_rewind_cache(
+        list(
+            {
+                puuid
+                for match_id in new_ids
+                for puuid in matches_by_id[match_id]["metadata"]["participants"]
+            }
+        )
+    )
+
+    return {"new": new_ids, "existing": existing_ids}
 
 
 def insert_rewind_data(rewind_info: dict) -> ObjectId:
@@ -35,6 +374,13 @@ def insert_rewind_data(rewind_info: dict) -> ObjectId:
     return result.inserted_id
 
 
+def update_rewind_data(id_rewind: str, rewind_info: dict) -> ObjectId:
+    db[MONGO_COLLECTION_NAME_REWIND].replace_one(
+        {"_id": ObjectId(id_rewind)}, rewind_info, upsert=True
+    )
+    return ObjectId(id_rewind)
+
+
 def find_match_by_id(match_id: str):
     return db[MONGO_COLLECTION_NAME].find_one(
         {"metadata.matchId": match_id}, {"_id": 0}
@@ -44,95 +390,86 @@ def find_match_by_id(match_id: str):
 def find_rewind_data_by_id(id_rewind: str):
     return list(
         db[MONGO_COLLECTION_NAME_REWIND].aggregate(
-            [{"$match": {"_id": ObjectId(id_rewind)}}, {"$project": {"_id": 0}}]
+            [
+                {"$match": {"_id": ObjectId(id_rewind)}},
+                {"$project": {"_id": 0, "rewind_state": 0}},
+            ]
         )
     )[0]
 
 
+def upsert_rewind_state(id_rewind: str, rewind_state: dict) -> None:
+    db[MONGO_COLLECTION_NAME_REWIND_STATE].replace_one(
+        {"_id": ObjectId(id_rewind)}, {"rewind_state": rewind_state}, upsert=True
+    )
+
+
+def find_rewind_state_by_id(id_rewind: str) -> dict:
+    document = db[MONGO_COLLECTION_NAME_REWIND_STATE].find_one(
+        {"_id": ObjectId(id_rewind)}, {"_id": 0}
+    )
+    if document is None:
+        # Rewinds geradas antes da separação guardam o estado no documento.
+        document = db[MONGO_COLLECTION_NAME_REWIND].find_one(
+            {"_id": ObjectId(id_rewind)}, {"_id": 0, "rewind_state": 1}
+        )
+    if document:
+        return document.get("rewind_state")
+    return None
+
+
 def find_matches_by_ids(match_ids: list[str]):
     return db[MONGO_COLLECTION_NAME].find(
         {"metadata.matchId": {"$in": match_ids}}, {"_id": 0}
     )
 
 
-def find_matches_by_puuid(puuid: str, datetimestamp: int = None) -> list[dict]:
-    match_param = {"first_document.metadata.participants": {"$in": [puuid]}}
+def get_matches_by_puuid_filter(puuid: str, datetimestamp: int = None) -> dict:
+    match_param = {"puuid": puuid}
     if datetimestamp:
-        match_param["first_document.info.gameCreation"] = {"$gt": datetimestamp}
+        match_param["info.gameCreation"] = {"$gt": datetimestamp}
+    return match_param
+
+
+def count_matches_by_puuid(puuid: str, datetimestamp: int = None) -> int:
+    return db[MONGO_COLLECTION_NAME_PLAYER_MATCHES].count_documents(
+        get_matches_by_puuid_filter(puuid, datetimestamp)
+    )
+
+
+def find_matches_fingerprint_by_puuid(puuid: str, datetimestamp: int = None) -> str:
+    result = list(
+        db[MONGO_COLLECTION_NAME_PLAYER_MATCHES].aggregate(
+            [
+                {"$match": get_matches_by_puuid_filter(puuid, datetimestamp)},
+                {
+                    "$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "last_game_creation": {"$max": "$info.gameCreation"},
+                    }
+                },
+            ]
+        )
+    )
+    if result:
+        return f"{result[0]['total']}-{result[0]['last_game_creation']}"
+    return "0"
+
 
-    cursor = db[MONGO_COLLECTION_NAME].aggregate(
+def iter_matches_by_puuid(
+    puuid: str, datetimestamp: int = None, batch_size: int = None
+) -> CommandCursor:
+    cursor = db[MONGO_COLLECTION_NAME_PLAYER_MATCHES].aggregate(
         [
-            {
-                "$group": {
-                    "_id": "$metadata.matchId",
-                    "first_document": {"$first": "$$ROOT"},
-                }
-            },
-            {"$match": match_param},
-            {
-                "$project": {
-                    "_id": 0,
-                    "first_document.metadata.matchId": 1,
-                    "first_document.metadata.participants": 1,
-                    "first_document.info.gameCreation": 1,
-                    "first_document.info.gameDuration": 1,
-                    "first_document.info.gameEndTimestamp": 1,
-                    "first_document.info.gameStartTimestamp": 1,
-                    "first_document.info.gameMode": 1,
-                    "first_document.info.participants.puuid": 1,
-                    "first_document.info.participants.teamId": 1,
-                    "first_document.info.participants.assists": 1,
-                    "first_document.info.participants.deaths": 1,
-                    "first_document.info.participants.kills": 1,
-                    "first_document.info.participants.doubleKills": 1,
-                    "first_document.info.participants.tripleKills": 1,
-                    "first_document.info.participants.quadraKills": 1,
-                    "first_document.info.participants.pentaKills": 1,
-                    "first_document.info.participants.firstBloodKill": 1,
-                    "first_document.info.participants.dragonKills": 1,
-                    "first_document.info.participants.totalDamageDealt": 1,
-                    "first_document.info.participants.totalDamageDealtToChampions": 1,
-                    "first_document.info.participants.magicDamageDealt": 1,
-                    "first_document.info.participants.magicDamageDealtToChampions": 1,
-                    "first_document.info.participants.totalHealsOnTeammates": 1,
-                    "first_document.info.participants.visionScore": 1,
-                    "first_document.info.participants.goldEarned": 1,
-                    "first_document.info.participants.goldSpent": 1,
-                    "first_document.info.participants.turretTakedowns": 1,
-                    "first_document.info.participants.firstTowerKill": 1,
-                    "first_document.info.participants.wardsKilled": 1,
-                    "first_document.info.participants.wardsPlaced": 1,
-                    "first_document.info.participants.damageSelfMitigated": 1,
-                    "first_document.info.participants.killingSprees": 1,
-                    "first_document.info.participants.largestCriticalStrike": 1,
-                    "first_document.info.participants.largestKillingSpree": 1,
-                    "first_document.info.participants.objectivesStolen": 1,
-                    "first_document.info.participants.totalMinionsKilled": 1,
-                    "first_document.info.participants.totalTimeCCDealt": 1,
-                    "first_document.info.participants.totalAllyJungleMinionsKilled": 1,
-                    "first_document.info.participants.baronTakedowns": 1,
-                    "first_document.info.participants.championName": 1,
-                    "first_document.info.participants.championId": 1,
-                    "first_document.info.participants.win": 1,
-                    "first_document.info.participants.teamPosition": 1,
-                    "first_document.info.participants.item0": 1,
-                    "first_document.info.participants.item1": 1,
-                    "first_document.info.participants.item2": 1,
-                    "first_document.info.participants.item3": 1,
-                    "first_document.info.participants.item4": 1,
-                    "first_document.info.participants.item5": 1,
-                    "first_document.info.participants.item6": 1,
-                    "first_document.info.participants.challenges": 1,
-                    "first_document.info.participants.profileIcon": 1,
-                    "first_document.info.participants.summonerLevel": 1,
-                    "first_document.info.teams.bans": 1,
-                    "first_document.info.teams.objectives.kills": 1,
-                    "first_document.info.teams.objectives.dragon": 1,
-                    "first_document.info.teams.objectives.baron": 1,
-                    "first_document.info.teams.teamId": 1,
-                }
-            },
-        ]
+            {"$match": get_matches_by_puuid_filter(puuid, datetimestamp)},
+            {"$project": {"_id": 0, "puuid": 0}},
+        ],
+        **({"batchSize": batch_size} if batch_size else {}),
     )
 
-    return list(cursor)
+    return cursor
+
+
+def find_matches_by_puuid(puuid: str, datetimestamp: int = None) -> list[dict]:
+    return list(iter_matches_by_puuid(puuid, datetimestamp))
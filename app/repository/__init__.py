@@ -1,11 +1,15 @@
 from .match import create_match  # noqa
 from .match import get_match  # noqa
+from .match import set_matches_searched  # noqa
 from .match import update_match  # noqa
 from .player import create_player  # noqa
 from .player import get_all_players  # noqa
 from .player import get_matches_not_searched_by_puuid  # noqa
 from .player import get_player  # noqa
+from .player import get_player_async  # noqa
 from .player import get_player_by_name  # noqa
 from .player import get_player_by_name_and_region  # noqa
+from .player import get_player_by_name_and_region_async  # noqa
+from .player import get_players_to_refresh  # noqa
 from .player import update_player  # noqa
 from .player_match_association import create_player_match_association  # noqa
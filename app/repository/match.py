@@ -24,3 +24,14 @@ def update_match(db: SessionLocal, match_id: str, updated_match: Match) -> Match
         db.commit()
         db.refresh(existing_match)
     return existing_match
+
+
+@dec_session_local
+def set_matches_searched(db: SessionLocal, match_ids: list[str]) -> int:
+    updated = (
+        db.query(Match)
+        .filter(Match.match_id.in_(match_ids))
+        .update({Match.is_searched: True}, synchronize_session=False)
+    )
+    db.commit()
+    return updated
@@ -1,6 +1,9 @@
-from database import dec_session_local
+from datetime import datetime
+
+from database import dec_async_session_local, dec_session_local
 from models import Player
-from sqlalchemy import text
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 
@@ -22,6 +25,19 @@ def get_all_players(db: Session) -> list[Player]:
     return db.query(Player).all()
 
 
+@dec_session_local
+def get_players_to_refresh(
+    db: Session, updated_before: datetime, limit: int
+) -> list[Player]:
+    return (
+        db.query(Player)
+        .filter(Player.rewind_id.isnot(None), Player.update < updated_before)
+        .order_by(Player.update)
+        .limit(limit)
+        .all()
+    )
+
+
 @dec_session_local
 def update_player(db: Session, player_puuid: str, updated_player: Player) -> Player:
     existing_item = db.query(Player).filter(Player.puuid == player_puuid).first()
@@ -65,3 +81,19 @@ def get_matches_not_searched_by_puuid(db: Session, player_puuid: str) -> list[st
     result = db.execute(sql_query, params)
 
     return [match[0] for match in result.fetchall()]
+
+
+@dec_async_session_local
+async def get_player_async(db: AsyncSession, player_puuid: str) -> Player:
+    result = await db.scalars(select(Player).where(Player.puuid == player_puuid))
+    return result.first()
+
+
+@dec_async_session_local
+async def get_player_by_name_and_region_async(
+    db: AsyncSession, player_name: str, region: str
+) -> Player:
+    result = await db.scalars(
+        select(Player).where(Player.name == player_name, Player.region == region)
+    )
+    return result.first()
@@ -1,2 +1,3 @@
+from .async_lol_api import AsyncLolApi  # noqa
 from .lol_api import LolApi  # noqa
 from .summoner_dto import Summoner  # noqa
@@ -0,0 +1,134 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from .base_api import AsyncBaseRiotApi
+from .summoner_dto import Summoner
+
+
+class AsyncLolApi(AsyncBaseRiotApi):
+    def __init__(
+        self, token: str, rate_limiter=None, match_cache=None, singleflight=None
+    ) -> None:
+        super().__init__(rate_limiter)
+        self.match_cache = match_cache
+        self.singleflight = singleflight
+        self.token = token
+        self._headers["X-Riot-Token"] = self.token
+
+    async def get_summoner_info_by_puuid(
+        self, puuid: str, server_account: str = "br1"
+    ) -> Summoner:
+        final_url = f"/lol/summoner/v4/summoners/by-puuid/{puuid}"
+        response = await self._get(
+            self._get_base_url_region(server_account) + final_url,
+            server_account,
+            "summoner",
+        )
+
+        if response.status_code == 200:
+            return Summoner(**response.json())
+
+        raise Exception(
+            f"Falha na requisição para puuid: {puuid}. "
+            f"Status Code: {response.status_code}"
+        )
+
+    async def get_match_infos_by_id(self, match_id: str, region: str):
+        final_url = f"/lol/match/v5/matches/{match_id}"
+
+        response = await self._get(
+            self._get_base_url_region(self._regions[region]) + final_url,
+            self._regions[region],
+            "match",
+        )
+
+        if response.status_code == 200:
+            match_info = response.json()
+            if self.match_cache is not None:
+                await asyncio.to_thread(self.match_cache.set, match_id, match_info)
+            return match_info
+
+        raise Exception(f"Falha ma requisição. Status Code: {response.status_code}")
+
+    async def iter_match_infos_by_ids(
+        self,
+        match_ids: list[str],
+        region: str,
+        rate_limiter,
+        max_in_flight: int = 10,
+    ) -> AsyncIterator[tuple[str, dict, Exception]]:
+        """
+        Busca as partidas concorrentemente, mantendo no máximo 'max_in_flight'
+        requisições em andamento, e retorna cada partida assim que sua requisição
+        termina, independente da ordem de 'match_ids'.
+
+        As partidas já presentes no 'match_cache' são retornadas primeiro, sem
+        requisição. Cada requisição aguarda o horário reservado no
+        'rate_limiter' antes de ser enviada, sem bloquear as demais, e é
+        agrupada pelo 'singleflight' com as buscas da mesma partida em
+        andamento em outros workers, caso em que apenas quem faz a requisição
+        reserva um horário.
+
+        Args:
+            match_ids (list[str]): Lista de IDs das partidas.
+            region (str): Região do jogador.
+            rate_limiter: Limitador de taxa com os métodos 'reserve' e \
+            'make_request_async', chamados com a região de roteamento e o \
+            método "match".
+            max_in_flight (int): Quantidade máxima de requisições em andamento.
+
+        Yields:
+            tuple: Uma tupla contendo o ID da partida, as informações da \
+            partida (None em caso de falha) e a exceção (None em caso de \
+            sucesso).
+        """
+
+        def reserve() -> float:
+            return rate_limiter.reserve(self._regions[region], "match")
+
+        async def fetch(match_id: str) -> tuple[str, dict, Exception]:
+            try:
+                if self.singleflight is None:
+                    await rate_limiter.make_request_async(
+                        self._regions[region], "match"
+                    )
+                    return (
+                        match_id,
+                        await self.get_match_infos_by_id(match_id, region),
+                        None,
+                    )
+                return (
+                    match_id,
+                    await self.singleflight.do_async(
+                        f"match:{match_id}",
+                        lambda: self.get_match_infos_by_id(match_id, region),
+                        reserve,
+                    ),
+                    None,
+                )
+            except Exception as error:
+                return match_id, None, error
+
+        if self.match_cache is not None:
+            cached = await asyncio.to_thread(self.match_cache.get_many, match_ids)
+            for match_id, match_info in cached.items():
+                yield match_id, match_info, None
+            match_ids = [match_id for match_id in match_ids if match_id not in cached]
+
+        pending_ids = iter(match_ids)
+        in_flight = set()
+
+        while True:
+            for match_id in pending_ids:
+                in_flight.add(asyncio.create_task(fetch(match_id)))
+                if len(in_flight) >= max_in_flight:
+                    break
+
+            if not in_flight:
+                return
+
+            done, in_flight = await asyncio.wait(
+                in_flight, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
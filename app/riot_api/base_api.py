@@ -1,9 +1,13 @@
-from httpx import Client, Response
+from exceptions import RateLimitExceeded
+from httpx import AsyncClient, Client, Response
+
+from .rate_limit_headers import get_rate_limits
 
 
 class BaseRiotApi:
-    def __init__(self) -> None:
-        self._client = Client()
+    def __init__(self, rate_limiter=None) -> None:
+        self.rate_limiter = rate_limiter
+        self._client = self._create_client()
         self._headers = {
             "User-Agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
@@ -20,11 +24,59 @@ class BaseRiotApi:
             "oc1": "sea",
         }
 
-    def _get(self, url: str) -> Response:
-        return self._client.get(url=url, headers=self._headers)
+    def _create_client(self) -> Client:
+        return Client()
+
+    def _get(self, url: str, region: str = None, method: str = None) -> Response:
+        response = self._client.get(url=url, headers=self._headers)
+        self._handle_rate_limits(response, region, method)
+        return response
+
+    def _handle_rate_limits(
+        self, response: Response, region: str = None, method: str = None
+    ) -> None:
+        """
+        Repassa ao limitador de taxa os limites, as contagens e o 'Retry-After'
+        informados nos cabeçalhos da resposta, e lança 'RateLimitExceeded'
+        quando a Riot responde 429.
+
+        Args:
+            response (Response): A resposta da requisição.
+            region (str, opcional): A região usada na reserva da requisição.
+            method (str, opcional): O método usado na reserva da requisição.
+        """
+        rate_limits = get_rate_limits(response.headers)
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_limits(region, method, rate_limits)
+
+        if response.status_code == 429:
+            raise RateLimitExceeded(rate_limits["retry_after"])
 
     def _get_base_url_region(self, region: str = "br1") -> str:
         return f"https://{region}.api.riotgames.com"
 
     def __del__(self) -> None:
         self._client.close()
+
+
+class AsyncBaseRiotApi(BaseRiotApi):
+    def _create_client(self) -> AsyncClient:
+        return AsyncClient()
+
+    async def _get(self, url: str, region: str = None, method: str = None) -> Response:
+        response = await self._client.get(url=url, headers=self._headers)
+        self._handle_rate_limits(response, region, method)
+        return response
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncBaseRiotApi":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    def __del__(self) -> None:
+        pass
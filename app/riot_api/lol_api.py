@@ -6,8 +6,9 @@ from .summoner_dto import Summoner
 
 # TODO melhorar o tratamento de exceção
 class LolApi(BaseRiotApi):
-    def __init__(self, token: str) -> None:
-        super().__init__()
+    def __init__(self, token: str, rate_limiter=None, match_cache=None) -> None:
+        super().__init__(rate_limiter)
+        self.match_cache = match_cache
         self.token = token
         self._headers["X-Riot-Token"] = self.token
 
@@ -19,7 +20,11 @@ class LolApi(BaseRiotApi):
         )
         final_url = f"/lol/summoner/v4/summoners/by-puuid/{puuid}"
 
-        response = self._get(self._get_base_url_region(server_account) + final_url)
+        response = self._get(
+            self._get_base_url_region(server_account) + final_url,
+            server_account,
+            "summoner",
+        )
 
         if response.status_code == 200:
             return Summoner(**response.json())
@@ -37,7 +42,11 @@ class LolApi(BaseRiotApi):
 
     def get_summoner_info_by_puuid(self, puuid: str, server_account: str = "br1"):
         final_url = f"/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        response = self._get(self._get_base_url_region(server_account) + final_url)
+        response = self._get(
+            self._get_base_url_region(server_account) + final_url,
+            server_account,
+            "summoner",
+        )
 
         if response.status_code == 200:
             return Summoner(**response.json())
@@ -52,7 +61,11 @@ class LolApi(BaseRiotApi):
     ):
         final_url = f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
 
-        response = self._get(self._get_base_url_region(server_account) + final_url)
+        response = self._get(
+            self._get_base_url_region(server_account) + final_url,
+            server_account,
+            "account",
+        )
 
         if response.status_code == 200:
             return response.json()["puuid"]
@@ -85,20 +98,34 @@ class LolApi(BaseRiotApi):
         if type:
             final_url += f"&{type=}"
 
-        response = self._get(self._get_base_url_region(match_region) + final_url)
+        response = self._get(
+            self._get_base_url_region(match_region) + final_url,
+            match_region,
+            "matchlist",
+        )
         if response.status_code == 200:
             return response.json()
         raise Exception(f"Falha na requisição. Status Code: {response.status_code}")
 
     def get_match_infos_by_id(self, match_id: str, region: str):
+        if self.match_cache is not None:
+            match_info = self.match_cache.get(match_id)
+            if match_info is not None:
+                return match_info
+
         final_url = f"/lol/match/v5/matches/{match_id}"
 
         response = self._get(
-            self._get_base_url_region(self._regions[region]) + final_url
+            self._get_base_url_region(self._regions[region]) + final_url,
+            self._regions[region],
+            "match",
         )
 
         if response.status_code == 200:
-            return response.json()
+            match_info = response.json()
+            if self.match_cache is not None:
+                self.match_cache.set(match_id, match_info)
+            return match_info
 
         print(self._get_base_url_region(region) + final_url)
         raise Exception(f"Falha ma requisição. Status Code: {response.status_code}")
@@ -106,7 +133,9 @@ class LolApi(BaseRiotApi):
     def get_league_entries_infos_by_summoner(self, summoner_id: str, region: str):
         final_url = f"/lol/league/v4/entries/by-summoner/{summoner_id}"
 
-        response = self._get(self._get_base_url_region(region) + final_url)
+        response = self._get(
+            self._get_base_url_region(region) + final_url, region, "league"
+        )
 
         if response.status_code == 200:
             return response.json()
@@ -0,0 +1,46 @@
+def parse_rate_limit_header(value: str) -> list[tuple[int, int]]:
+    """
+    Converte um cabeçalho de limite da Riot (e.g., '20:1,100:120') em uma lista
+    de pares (quantidade, intervalo em segundos).
+
+    Parâmetros:
+    - value (str): O valor do cabeçalho.
+
+    Retorna:
+    - list: Lista de pares (quantidade, intervalo), vazia caso o cabeçalho não
+      exista.
+    """
+    if not value:
+        return []
+
+    pairs = []
+    for window in value.split(","):
+        amount, interval = window.split(":")
+        pairs.append((int(amount), int(interval)))
+    return pairs
+
+
+def get_rate_limits(headers) -> dict:
+    """
+    Extrai os limites, as contagens e o tempo de espera informados pela Riot nos
+    cabeçalhos de uma resposta.
+
+    Parâmetros:
+    - headers: Os cabeçalhos da resposta.
+
+    Retorna:
+    - dict: Dicionário com os limites e as contagens da aplicação e do método,
+      o 'Retry-After' (em segundos) e o tipo do limite excedido.
+    """
+    retry_after = headers.get("Retry-After")
+
+    return {
+        "app_limits": parse_rate_limit_header(headers.get("X-App-Rate-Limit")),
+        "app_counts": parse_rate_limit_header(headers.get("X-App-Rate-Limit-Count")),
+        "method_limits": parse_rate_limit_header(headers.get("X-Method-Rate-Limit")),
+        "method_counts": parse_rate_limit_header(
+            headers.get("X-Method-Rate-Limit-Count")
+        ),
+        "retry_after": float(retry_after) if retry_after else None,
+        "limit_type": headers.get("X-Rate-Limit-Type"),
+    }
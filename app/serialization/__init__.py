@@ -0,0 +1 @@
+from .json_serializer import JSONBytesResponse, dumps, loads, to_serializable  # noqa
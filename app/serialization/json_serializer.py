@@ -0,0 +1,112 @@
+import json
+from datetime import date, datetime
+
+import numpy
+import pandas
+from bson import ObjectId
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+)
+
+
+def to_serializable(value, digits: int = None, rounding: dict = None):
+    """
+    Converte, em uma única passagem, um valor com tipos do numpy e do pandas em
+    tipos nativos do Python, arredondando os floats conforme as regras
+    informadas.
+
+    Parâmetros:
+    - value: O valor convertido (e.g., o dicionário da rewind).
+    - digits (int, opcional): Casas decimais dos floats de todo o valor.
+    - rounding (dict, opcional): Casas decimais por chave, aplicadas aos floats
+      do valor da chave em qualquer nível (e.g., {'player_role_win_info': 2}).
+
+    Retorna:
+    - O valor convertido, com dicionários e listas novos.
+    """
+    if isinstance(value, dict):
+        if rounding is None:
+            return {key: to_serializable(item, digits) for key, item in value.items()}
+        return {
+            key: to_serializable(item, rounding.get(key, digits), rounding)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [to_serializable(item, digits, rounding) for item in value]
+    if isinstance(value, float):
+        # 'round' em um numpy.float64 usa o arredondamento do numpy.
+        return float(round(value, digits) if digits is not None else value)
+    if isinstance(value, numpy.integer):
+        return int(value)
+    if isinstance(value, numpy.floating):
+        return to_serializable(float(value), digits)
+    if isinstance(value, numpy.bool_):
+        return bool(value)
+    if isinstance(value, numpy.ndarray):
+        return to_serializable(value.tolist(), digits, rounding)
+    if value is pandas.NaT:
+        return None
+    if isinstance(value, pandas.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if value is pandas.NaT:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Tipo {type(value).__name__} não é serializável em JSON")
+
+
+def dumps(value) -> bytes:
+    """
+    Serializa um valor em JSON, usando o orjson quando instalado.
+
+    Além dos tipos do JSON, aceita chaves não textuais, datetime, ObjectId e os
+    tipos do numpy e do pandas.
+
+    Parâmetros:
+    - value: O valor serializado.
+
+    Retorna:
+    - bytes: O JSON codificado em UTF-8.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(
+        value, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def loads(data: bytes | str):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JSONBytesResponse(Response):
+    """
+    Resposta JSON serializada com 'dumps' diretamente em bytes, sem a conversão
+    do 'jsonable_encoder' nem a codificação do módulo json da biblioteca padrão.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
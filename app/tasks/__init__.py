@@ -1 +1,4 @@
+from .pipeline_lock import acquire_pipeline_lock, get_pipeline_key  # noqa
+from .progress import stream_progress  # noqa
 from .riot_tasks import PLAYER_INFO_TASK_PRIORITY, get_summoner_info  # noqa
+from .scheduling import get_queue_wait_metrics  # noqa
@@ -1,11 +1,27 @@
 import os
 
 from celery import Celery
+from kombu import Queue
 
 CELERY_HOST = os.environ.get("CELERY_HOST", "localhost")
 CELERY_PORT = os.environ.get("CELERY_PORT", 6379)
 CELERY_URL = f"redis://{CELERY_HOST}:{CELERY_PORT}/0"
 
+# Uma fila por etapa do pipeline, permitindo dedicar workers a cada etapa com
+# 'celery worker -Q'. Dentro de cada fila, as tarefas com prioridade menor são
+# executadas primeiro (0 a 9, como no transporte do Redis).
+PLAYER_QUEUE = "player"
+MATCH_LIST_QUEUE = "match_list"
+MATCH_INFO_QUEUE = "match_info"
+MATCH_INFO_FAIL_QUEUE = "match_info_fail"
+REWIND_QUEUE = "rewind"
+REFRESH_QUEUE = "refresh"
+
+# Intervalo (em segundos) entre as rodadas de atualização dos jogadores, que
+# iniciam poucas atualizações por vez para distribuí-las ao longo das janelas
+# de limite da API da Riot.
+REFRESH_TICK = float(os.environ.get("REFRESH_TICK", 120))
+
 celery_app = Celery("LolAnalytics")
 celery_app.conf.broker_connection_retry_on_startup = True
 celery_app.conf.broker_url = CELERY_URL
@@ -15,5 +31,48 @@ celery_app.conf.result_serializer = "json"
 celery_app.conf.task_serializer = "json"
 celery_app.conf.timezone = "America/Sao_Paulo"
 
+celery_app.conf.broker_transport_options = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+celery_app.conf.task_queues = [
+    Queue("celery"),
+    Queue(PLAYER_QUEUE),
+    Queue(MATCH_LIST_QUEUE),
+    Queue(MATCH_INFO_QUEUE),
+    Queue(MATCH_INFO_FAIL_QUEUE),
+    Queue(REWIND_QUEUE),
+    Queue(REFRESH_QUEUE),
+]
+celery_app.conf.task_routes = {
+    "tasks.riot_tasks.get_summoner_info": {"queue": PLAYER_QUEUE},
+    "tasks.riot_tasks.get_all_matchs_id": {"queue": MATCH_LIST_QUEUE},
+    "tasks.riot_tasks.get_infos_from_list_matchs": {"queue": MATCH_LIST_QUEUE},
+    "tasks.riot_tasks.get_infos_from_matchs_chunk": {"queue": MATCH_INFO_QUEUE},
+    "tasks.riot_tasks.finish_infos_from_list_matchs": {"queue": MATCH_INFO_QUEUE},
+    "tasks.riot_tasks.get_infos_from_list_matchs_failed": {
+        "queue": MATCH_INFO_FAIL_QUEUE
+    },
+    "tasks.riot_tasks.generate_rewind": {"queue": REWIND_QUEUE},
+    "tasks.riot_tasks.refresh_players": {"queue": REFRESH_QUEUE},
+    "tasks.riot_tasks.refresh_player": {"queue": REFRESH_QUEUE},
+}
+celery_app.conf.task_default_priority = 5
+# Cada processo do worker reserva no máximo uma tarefa além da que executa,
+# para que as prioridades valham também para as tarefas já publicadas. As
+# tarefas são confirmadas ao serem recebidas: com 'task_acks_late', o Redis
+# entregaria novamente as tarefas mais longas que o 'visibility_timeout' (1
+# hora), repetindo as requisições à API da Riot.
+celery_app.conf.worker_prefetch_multiplier = 1
+
+# Executado pelo 'celery beat' (ver docker/app/beat-entrypoint.sh).
+celery_app.conf.beat_schedule = {
+    "refresh-players": {
+        "task": "tasks.riot_tasks.refresh_players",
+        "schedule": REFRESH_TICK,
+        "options": {"expires": REFRESH_TICK},
+    },
+}
+
 
 celery_app.autodiscover_tasks(["tasks"])
@@ -0,0 +1,195 @@
+import os
+import uuid
+
+from celery.result import AsyncResult
+from celery.signals import task_failure, task_prerun
+from redis import Redis
+from redis.exceptions import RedisError
+
+from .celery_app import CELERY_URL, celery_app
+
+PIPELINE_LOCK_TTL = int(os.environ.get("PIPELINE_LOCK_TTL", 60 * 60))
+PIPELINE_LOCK_MAX_DEPTH = 10
+
+PIPELINE_LOCK_PREFIX = "pipeline_lock"
+
+# Tarefas do pipeline que recebem o puuid do jogador como primeiro argumento.
+# A trava do jogador é renovada no início de cada uma delas.
+PIPELINE_TASKS = (
+    "tasks.riot_tasks.get_all_matchs_id",
+    "tasks.riot_tasks.get_infos_from_list_matchs",
+    "tasks.riot_tasks.get_infos_from_matchs_chunk",
+    "tasks.riot_tasks.get_infos_from_list_matchs_failed",
+    "tasks.riot_tasks.generate_rewind",
+    "tasks.riot_tasks.refresh_player",
+)
+
+# Substitui a trava apenas se ela ainda aponta para a tarefa considerada
+# encerrada, para que duas chamadas não a recuperem ao mesmo tempo.
+RECLAIM_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Renova a trava e as travas associadas a ela (ver 'link_pipeline_lock').
+REFRESH_SCRIPT = """
+redis.call("EXPIRE", KEYS[1], ARGV[1])
+redis.call("EXPIRE", KEYS[2], ARGV[1])
+for _, alias in ipairs(redis.call("SMEMBERS", KEYS[2])) do
+    redis.call("EXPIRE", alias, ARGV[1])
+end
+return 1
+"""
+
+# Remove a trava, as travas associadas a ela e o conjunto das associações.
+RELEASE_SCRIPT = """
+for _, alias in ipairs(redis.call("SMEMBERS", KEYS[2])) do
+    redis.call("DEL", alias)
+end
+return redis.call("DEL", KEYS[1], KEYS[2])
+"""
+
+redis_client = Redis.from_url(CELERY_URL)
+reclaim_script = redis_client.register_script(RECLAIM_SCRIPT)
+refresh_script = redis_client.register_script(REFRESH_SCRIPT)
+release_script = redis_client.register_script(RELEASE_SCRIPT)
+
+
+def get_aliases_key(key: str) -> str:
+    return f"{key}:aliases"
+
+
+def get_pipeline_key(*parts: str) -> str:
+    """
+    Monta a chave da trava de um pipeline a partir das partes informadas (e.g.,
+    região e riot id, ou puuid), sem diferenciar maiúsculas e minúsculas.
+    """
+    return ":".join([PIPELINE_LOCK_PREFIX, *[part.lower() for part in parts]])
+
+
+def is_pipeline_running(task_id: str) -> bool:
+    """
+    Segue a cadeia de tarefas a partir de 'task_id', pelo 'task_id' retornado
+    por cada tarefa, até encontrar a tarefa atual do pipeline.
+
+    Parâmetros:
+    - task_id (str): O ID da primeira tarefa do pipeline.
+
+    Retorna:
+    - bool: False caso alguma tarefa tenha falhado ou sido revogada, ou caso a
+      última tarefa tenha terminado sem iniciar outra, e True caso contrário.
+    """
+    for _ in range(PIPELINE_LOCK_MAX_DEPTH):
+        task = AsyncResult(task_id, app=celery_app)
+
+        if task.state in ("FAILURE", "REVOKED"):
+            return False
+        if task.state != "SUCCESS":
+            return True
+
+        result = task.result
+        task_id = result.get("task_id") if isinstance(result, dict) else None
+        if task_id is None:
+            return False
+
+    return True
+
+
+def acquire_pipeline_lock(key: str) -> tuple[bool, str]:
+    """
+    Reserva o início de um pipeline, gerando o ID da sua primeira tarefa.
+
+    Caso outro pipeline com a mesma chave esteja em andamento, retorna o ID da
+    primeira tarefa dele. Travas de pipelines encerrados são recuperadas, e as
+    demais expiram após PIPELINE_LOCK_TTL segundos sem serem renovadas (ver
+    'refresh_pipeline_lock').
+
+    Parâmetros:
+    - key (str): A chave da trava (ver 'get_pipeline_key').
+
+    Retorna:
+    - tuple: Uma tupla indicando se a trava foi adquirida e o ID da primeira
+      tarefa do pipeline, a ser usado em 'apply_async(task_id=...)' caso a trava
+      tenha sido adquirida.
+    """
+    task_id = str(uuid.uuid4())
+
+    try:
+        # A trava pode ser liberada ou recuperada por outra chamada entre as
+        # operações; nesse caso, a aquisição é tentada novamente.
+        for _ in range(3):
+            if redis_client.set(key, task_id, nx=True, ex=PIPELINE_LOCK_TTL):
+                return True, task_id
+
+            running_task_id = redis_client.get(key)
+            if running_task_id is None:
+                continue
+
+            running_task_id = running_task_id.decode()
+            if is_pipeline_running(running_task_id):
+                return False, running_task_id
+
+            if reclaim_script(
+                keys=[key], args=[running_task_id, task_id, PIPELINE_LOCK_TTL]
+            ):
+                return True, task_id
+    except RedisError:
+        pass
+
+    return True, task_id
+
+
+def link_pipeline_lock(key: str, *alias_keys: str) -> None:
+    """
+    Associa travas à trava 'key' (e.g., a trava do riot id consultado à trava
+    do puuid do jogador), para que sejam renovadas e liberadas junto com ela.
+    """
+    aliases_key = get_aliases_key(key)
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.sadd(aliases_key, *alias_keys)
+            pipe.expire(aliases_key, PIPELINE_LOCK_TTL)
+            pipe.execute()
+    except RedisError:
+        pass
+
+
+def refresh_pipeline_lock(key: str) -> None:
+    """
+    Renova por PIPELINE_LOCK_TTL segundos a trava e as travas associadas a ela,
+    para que não expirem durante pipelines longos.
+    """
+    try:
+        refresh_script(keys=[key, get_aliases_key(key)], args=[PIPELINE_LOCK_TTL])
+    except RedisError:
+        pass
+
+
+def release_pipeline_lock(key: str) -> None:
+    try:
+        release_script(keys=[key, get_aliases_key(key)])
+    except RedisError:
+        pass
+
+
+@task_prerun.connect
+def refresh_pipeline_lock_on_start(sender=None, args=None, **kwargs) -> None:
+    if sender is not None and sender.name in PIPELINE_TASKS and args:
+        refresh_pipeline_lock(get_pipeline_key(args[0]))
+
+
+@task_failure.connect
+def release_failed_pipeline_lock(sender=None, args=None, **kwargs) -> None:
+    """
+    Libera a trava do pipeline que falhou, sem aguardar sua expiração.
+    """
+    if sender is None or not args:
+        return
+    if sender.name == "tasks.riot_tasks.get_summoner_info":
+        nick_name, riot_id, region = args
+        release_pipeline_lock(get_pipeline_key(region, nick_name, riot_id))
+    elif sender.name in PIPELINE_TASKS:
+        release_pipeline_lock(get_pipeline_key(args[0]))
@@ -0,0 +1,218 @@
+import os
+import time
+from collections.abc import AsyncIterator
+
+from celery.signals import task_failure
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+from serialization import dumps, loads
+
+from .celery_app import CELERY_URL
+from .pipeline_lock import PIPELINE_TASKS
+
+PROGRESS_TTL = int(os.environ.get("PROGRESS_TTL", 24 * 60 * 60))
+PROGRESS_BATCH_SIZE = int(os.environ.get("PROGRESS_BATCH_SIZE", 10))
+PROGRESS_KEEPALIVE = float(os.environ.get("PROGRESS_KEEPALIVE", 15))
+
+PROGRESS_PREFIX = "pipeline_progress"
+
+FETCH_STAGES = ("match_info", "match_info_fail")
+FINAL_STAGES = ("done", "failed")
+
+redis_client = Redis.from_url(CELERY_URL)
+
+
+def get_progress_key(puuid: str) -> str:
+    return f"{PROGRESS_PREFIX}:{puuid}"
+
+
+def get_task_progress_key(task_id: str) -> str:
+    return f"{PROGRESS_PREFIX}:task:{task_id}"
+
+
+def build_progress(fields: dict) -> dict:
+    """
+    Converte os campos do hash de progresso do Redis em um dicionário,
+    estimando o tempo restante da etapa pela taxa de partidas já buscadas.
+
+    Parâmetros:
+    - fields (dict): Os campos do hash, como retornados pelo HGETALL.
+
+    Retorna:
+    - dict: O progresso do pipeline do jogador, com o puuid None enquanto o
+      jogador não foi encontrado.
+    """
+    fields = {key.decode(): value.decode() for key, value in fields.items()}
+
+    progress = {
+        "puuid": fields.get("puuid"),
+        "stage": fields.get("stage"),
+        "total": int(fields.get("total", 0)),
+        "fetched": int(fields.get("fetched", 0)),
+        "failures": int(fields.get("failures", 0)),
+        "eta": None,
+        "updated_at": float(fields.get("updated_at", 0)),
+    }
+    if "message" in fields:
+        progress["message"] = fields["message"]
+
+    started_at = float(fields.get("started_at", 0))
+    done = progress["fetched"] + progress["failures"]
+    if (
+        progress["stage"] in FETCH_STAGES
+        and started_at
+        and done
+        and progress["total"] > done
+    ):
+        elapsed = progress["updated_at"] - started_at
+        progress["eta"] = round(elapsed / done * (progress["total"] - done), 1)
+
+    return progress
+
+
+def _publish(key: str, pipe) -> None:
+    pipe.expire(key, PROGRESS_TTL)
+    pipe.hgetall(key)
+    progress = build_progress(pipe.execute()[-1])
+    redis_client.publish(key, dumps(progress))
+
+
+def _set_progress(key: str, stage: str, fields: dict) -> None:
+    mapping = {"stage": stage, "updated_at": time.time(), **fields}
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            if "message" not in mapping:
+                pipe.hdel(key, "message")
+            pipe.hset(key, mapping=mapping)
+            _publish(key, pipe)
+    except RedisError:
+        pass
+
+
+def set_progress(puuid: str, stage: str, **fields) -> None:
+    """
+    Define a etapa atual do pipeline do jogador e publica o progresso no canal
+    do jogador.
+
+    Parâmetros:
+    - puuid (str): O puuid do jogador.
+    - stage (str): A etapa atual (e.g., 'match_info', 'rewind', 'done').
+    - fields: Outros campos do progresso (e.g., total, fetched, failures).
+    """
+    _set_progress(get_progress_key(puuid), stage, {"puuid": puuid, **fields})
+
+
+def set_task_progress(task_id: str, stage: str, **fields) -> None:
+    """
+    Define a etapa da primeira tarefa do pipeline ('get_summoner_info'), cujo
+    ID é retornado pela rota '/check' antes de o puuid do jogador ser
+    conhecido. Ao informar o puuid, o progresso passa a ser acompanhado pelo
+    canal do jogador (ver 'stream_progress').
+
+    Parâmetros:
+    - task_id (str): O ID da primeira tarefa do pipeline.
+    - stage (str): A etapa atual ('player' ou 'failed').
+    - fields: Outros campos do progresso (e.g., puuid, message).
+    """
+    _set_progress(get_task_progress_key(task_id), stage, fields)
+
+
+def start_progress(puuid: str, stage: str, total: int) -> None:
+    """
+    Inicia uma etapa de busca de partidas, zerando as contagens.
+    """
+    set_progress(
+        puuid, stage, total=total, fetched=0, failures=0, started_at=time.time()
+    )
+
+
+def add_progress(puuid: str, fetched: int = 0, failures: int = 0) -> None:
+    """
+    Incrementa atomicamente as partidas buscadas e as que falharam na etapa
+    atual, que podem ser buscadas por vários workers ao mesmo tempo.
+    """
+    key = get_progress_key(puuid)
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, "fetched", fetched)
+            pipe.hincrby(key, "failures", failures)
+            pipe.hset(key, "updated_at", time.time())
+            _publish(key, pipe)
+    except RedisError:
+        pass
+
+
+@task_failure.connect
+def set_failed_progress(
+    sender=None, task_id=None, args=None, exception=None, **kwargs
+) -> None:
+    if sender is None:
+        return
+    if sender.name == "tasks.riot_tasks.get_summoner_info":
+        set_task_progress(task_id, "failed", message=str(exception))
+    elif sender.name in PIPELINE_TASKS and args:
+        set_progress(args[0], "failed", message=str(exception))
+
+
+def _format_event(progress: dict) -> bytes:
+    return b"data: " + dumps(progress) + b"\n\n"
+
+
+async def stream_progress(task_id: str) -> AsyncIterator[bytes]:
+    """
+    Gera os eventos (server-sent events) do progresso de um pipeline a partir
+    do ID da sua primeira tarefa, retornado pela rota '/check'.
+
+    O progresso começa pela etapa 'player', publicada por 'get_summoner_info'.
+    Quando o puuid do jogador é publicado, o progresso atual do jogador é
+    enviado e o canal do jogador é acompanhado até a etapa final.
+
+    Parâmetros:
+    - task_id (str): O ID da primeira tarefa do pipeline.
+
+    Retorna:
+    - AsyncIterator: Os eventos codificados, com comentários periódicos para
+      manter a conexão aberta.
+    """
+    task_key = get_task_progress_key(task_id)
+    client = AsyncRedis.from_url(CELERY_URL)
+    pubsub = client.pubsub()
+    player_key = None
+
+    async def follow_player(puuid: str) -> dict:
+        # Inscreve no canal antes de ler o progresso atual, para não perder
+        # publicações entre as duas operações.
+        nonlocal player_key
+        player_key = get_progress_key(puuid)
+        await pubsub.subscribe(player_key)
+        fields = await client.hgetall(player_key)
+        return build_progress(fields) if fields else None
+
+    try:
+        await pubsub.subscribe(task_key)
+
+        fields = await client.hgetall(task_key)
+        pending = [build_progress(fields)] if fields else []
+
+        while True:
+            while pending:
+                progress = pending.pop(0)
+                yield _format_event(progress)
+                if progress["stage"] in FINAL_STAGES:
+                    return
+                if player_key is None and progress["puuid"]:
+                    player_progress = await follow_player(progress["puuid"])
+                    if player_progress:
+                        pending.append(player_progress)
+
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=PROGRESS_KEEPALIVE
+            )
+            if message is None:
+                yield b": keepalive\n\n"
+            elif player_key is None or message["channel"].decode() == player_key:
+                pending.append(loads(message["data"]))
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
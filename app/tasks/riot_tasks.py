@@ -1,33 +1,105 @@
+import asyncio
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from itertools import chain
 
-from celery import shared_task
+from cache import singleflight, summoner_cache
+from celery import chord, shared_task
 from dotenv import load_dotenv
 from models import Match, Player, PlayerMatchAssociation
-from mongo import insert_match_data, insert_rewind_data
+from mongo import (
+    MatchIngestionBuffer,
+    find_rewind_state_by_id,
+    insert_rewind_data,
+    match_cache,
+    update_rewind_data,
+    upsert_rewind_state,
+)
 from repository import (
     create_match,
     create_player,
     create_player_match_association,
-    get_match,
     get_matches_not_searched_by_puuid,
     get_player,
-    update_match,
+    get_players_to_refresh,
+    set_matches_searched,
     update_player,
 )
-from riot_api.lol_api import LolApi
+from riot_api import AsyncLolApi, LolApi
 from sqlalchemy.exc import IntegrityError
-from utils import RateLimiter, create_rewind, get_timestamp_from_year
+from utils import (
+    Profiler,
+    RateLimiter,
+    RedisRateLimiter,
+    get_timestamp_from_year,
+    update_rewind_state,
+)
 
-from .celery_app import celery_app
+from .celery_app import (
+    MATCH_INFO_FAIL_QUEUE,
+    MATCH_INFO_QUEUE,
+    MATCH_LIST_QUEUE,
+    PLAYER_QUEUE,
+    celery_app,
+)
+from .pipeline_lock import (
+    acquire_pipeline_lock,
+    get_pipeline_key,
+    link_pipeline_lock,
+    release_pipeline_lock,
+)
+from .progress import (
+    PROGRESS_BATCH_SIZE,
+    add_progress,
+    set_progress,
+    set_task_progress,
+    start_progress,
+)
+from .scheduling import count_pending_tasks, get_chunk_priority
 
+REWIND_TASK_PRIORITY = 2
 MATCH_INFO_TASK_PRIORITY = 3
 MATCH_LIST_TASK_PRIORITY = 4
 PLAYER_INFO_TASK_PRIORITY = 5
+REFRESH_TASK_PRIORITY = 9
+# Com 'priority_steps' de 0 a 9 (ver celery_app.py), o kombu trata prioridades
+# acima de 9 como 9.
 PLAYER_INFO_FAIL_TASK_PRIORITY = 10
 
-rate_limiter = RateLimiter(20, 80, 1, 120)
+RIOT_MAX_IN_FLIGHT = int(os.environ.get("RIOT_MAX_IN_FLIGHT", 10))
+MATCH_CHUNK_SIZE = int(os.environ.get("MATCH_CHUNK_SIZE", 100))
+
+# Jogadores com rewind gerada há mais de REFRESH_INTERVAL segundos são
+# atualizados, REFRESH_PLAYERS_PER_TICK por rodada, apenas quando as filas das
+# consultas dos usuários têm no máximo REFRESH_MAX_PENDING tarefas aguardando.
+REFRESH_INTERVAL = float(os.environ.get("REFRESH_INTERVAL", 24 * 60 * 60))
+REFRESH_PLAYERS_PER_TICK = int(os.environ.get("REFRESH_PLAYERS_PER_TICK", 2))
+REFRESH_MAX_PENDING = int(os.environ.get("REFRESH_MAX_PENDING", 0))
+
+INTERACTIVE_QUEUES = [
+    PLAYER_QUEUE,
+    MATCH_LIST_QUEUE,
+    MATCH_INFO_QUEUE,
+    MATCH_INFO_FAIL_QUEUE,
+]
+
+RATE_LIMITER_BACKEND = os.environ.get("RATE_LIMITER_BACKEND", "redis")
+
+# Limites da chave de desenvolvimento da Riot, por região. São substituídos
+# pelos limites informados nos cabeçalhos das respostas da API.
+RIOT_APP_LIMITS = [(20, 1), (100, 120)]
+RIOT_METHOD_LIMITS = {
+    "account": [(1000, 60)],
+    "summoner": [(1600, 60)],
+    "league": [(100, 60)],
+    "matchlist": [(2000, 10)],
+    "match": [(2000, 10)],
+}
+
+if RATE_LIMITER_BACKEND == "redis":
+    rate_limiter = RedisRateLimiter(RIOT_APP_LIMITS, RIOT_METHOD_LIMITS)
+else:
+    rate_limiter = RateLimiter(20, 80, 1, 120)
 
 
 @celery_app.task()
@@ -62,7 +134,7 @@ def get_matchs_ids(
     if list_ids is None:
         list_ids = []
 
-    rate_limiter.make_request()
+    rate_limiter.make_request(region, "matchlist")
     ids = lol_api.get_matchs_ids(puuid, region, start, count, start_time)
 
     if ids is None:
@@ -85,7 +157,7 @@ def get_matchs_ids(
 
 
 def get_player_ranked_infos(lol_api: LolApi, summoner_id: str, region: str):
-    rate_limiter.make_request()
+    rate_limiter.make_request(region, "league")
     league_infos = lol_api.get_league_entries_infos_by_summoner(summoner_id, region)
 
     return {
@@ -94,23 +166,170 @@ def get_player_ranked_infos(lol_api: LolApi, summoner_id: str, region: str):
     }
 
 
-def get_player_infos_by_puuids(lol_api: LolApi, dict_players: dict, region: str):
+async def fetch_summoners_infos_async(
+    token: str, puuids: list[str], region: str
+) -> dict:
+    """
+    Busca concorrentemente as informações dos invocadores na API da Riot,
+    mantendo no máximo RIOT_MAX_IN_FLIGHT requisições em andamento.
+
+    Args:
+        token (str): Chave da API da Riot.
+        puuids (list[str]): Lista de puuids dos invocadores.
+        region (str): Região dos invocadores.
+
+    Returns:
+        dict: Dicionário com o nome, o nível e o ícone de cada invocador, \
+        indexado pelo puuid.
+    """
+    semaphore = asyncio.Semaphore(RIOT_MAX_IN_FLIGHT)
+
+    async with AsyncLolApi(token, rate_limiter) as lol_api:
+
+        def reserve() -> float:
+            return rate_limiter.reserve(region, "summoner")
+
+        async def request(puuid: str) -> dict:
+            summoner = await lol_api.get_summoner_info_by_puuid(puuid, region)
+            return {
+                "name": summoner.name,
+                "level": summoner.summoner_level,
+                "icon": summoner.profile_icon_id,
+            }
+
+        async def fetch(puuid: str) -> tuple[str, dict]:
+            async with semaphore:
+                return puuid, await singleflight.do_async(
+                    f"summoner:{region}:{puuid}", lambda: request(puuid), reserve
+                )
+
+        return dict(await asyncio.gather(*[fetch(puuid) for puuid in puuids]))
+
+
+def get_player_infos_by_puuids(token: str, dict_players: dict, region: str):
+    """
+    Obtém o nome, o nível e o ícone dos jogadores que participaram das partidas
+    do jogador, consultando primeiro o cache de invocadores e buscando na API
+    apenas os que não estão no cache.
+
+    Args:
+        token (str): Chave da API da Riot.
+        dict_players (dict): Os jogadores de cada categoria da rewind, \
+        indexados pelo puuid.
+        region (str): Região do jogador.
+
+    Returns:
+        dict: Dicionário com as informações de cada jogador, indexado pelo \
+        puuid.
+    """
     puuids = set(chain(*[set(values.keys()) for _, values in dict_players.items()]))
-    dict_puuid = {}
-    for puuid in puuids:
-        rate_limiter.make_request()
-        summoner = lol_api.get_summoner_info_by_puuid(puuid, region)
-        dict_puuid[puuid] = {
-            "name": summoner.name,
-            "level": summoner.summoner_level,
-            "icon": summoner.profile_icon_id,
-        }
+    dict_puuid = summoner_cache.get_many(region, puuids)
+
+    missing_puuids = [puuid for puuid in puuids if puuid not in dict_puuid]
+    if missing_puuids:
+        fetched = asyncio.run(
+            fetch_summoners_infos_async(token, missing_puuids, region)
+        )
+        summoner_cache.set_many(region, fetched)
+        dict_puuid.update(fetched)
 
     return dict_puuid
 
 
-@shared_task
-def get_summoner_info(nick_name: str, riot_id: str, region: str) -> dict:
+def mark_matchs_as_searched(ingestion_result: dict) -> None:
+    set_matches_searched(
+        match_ids=ingestion_result["new"] + ingestion_result["existing"]
+    )
+
+
+async def fetch_matchs_infos_async(
+    token: str,
+    list_matchs_ids: list[str],
+    region: str,
+    buffer: MatchIngestionBuffer,
+    puuid: str = None,
+) -> list[str]:
+    """
+    Busca as informações das partidas concorrentemente na API da Riot,
+    adicionando cada partida ao buffer assim que sua requisição termina. Os
+    descarregamentos do buffer são feitos em uma thread, para não bloquear as
+    requisições em andamento.
+
+    Args:
+        token (str): Chave da API da Riot.
+        list_matchs_ids (list[str]): Lista de IDs das partidas.
+        region (str): Região do jogador.
+        buffer (MatchIngestionBuffer): Buffer de gravação das partidas.
+        puuid (str, opcional): Jogador cujo progresso é publicado a cada \
+        PROGRESS_BATCH_SIZE partidas.
+
+    Returns:
+        list: Lista de IDs das partidas cuja requisição falhou.
+    """
+    list_matchs_failure = []
+    fetched = failures = 0
+
+    async with AsyncLolApi(token, rate_limiter, match_cache, singleflight) as lol_api:
+        async for match_id, match_info, error in lol_api.iter_match_infos_by_ids(
+            list_matchs_ids, region, rate_limiter, max_in_flight=RIOT_MAX_IN_FLIGHT
+        ):
+            if error is not None:
+                list_matchs_failure.append(match_id)
+                failures += 1
+            else:
+                await asyncio.to_thread(buffer.add, match_info)
+                fetched += 1
+
+            if puuid and fetched + failures >= PROGRESS_BATCH_SIZE:
+                await asyncio.to_thread(add_progress, puuid, fetched, failures)
+                fetched = failures = 0
+
+    if puuid and fetched + failures:
+        await asyncio.to_thread(add_progress, puuid, fetched, failures)
+
+    return list_matchs_failure
+
+
+def fetch_matchs_infos(
+    token: str, list_matchs_ids: list[str], region: str, puuid: str = None
+):
+    """
+    Busca as informações das partidas na API da Riot e as grava no MongoDB em
+    lotes, marcando as partidas gravadas como buscadas. Caso a marcação falhe,
+    as partidas continuam não buscadas e são obtidas do cache de partidas na
+    próxima busca.
+
+    Até RIOT_MAX_IN_FLIGHT requisições ficam em andamento ao mesmo tempo,
+    respeitando o limitador de taxa compartilhado.
+
+    Args:
+        token (str): Chave da API da Riot.
+        list_matchs_ids (list[str]): Lista de IDs das partidas.
+        region (str): Região do jogador.
+        puuid (str, opcional): Jogador cujo progresso é publicado.
+
+    Returns:
+        tuple: Uma tupla contendo a lista de IDs das partidas que falharam e o \
+        resumo das partidas novas, já existentes e que falharam, com os \
+        acertos e as faltas acumulados do cache de partidas e as chamadas \
+        agrupadas pelo singleflight.
+    """
+    with MatchIngestionBuffer(on_flush=mark_matchs_as_searched) as buffer:
+        list_matchs_failure = asyncio.run(
+            fetch_matchs_infos_async(token, list_matchs_ids, region, buffer, puuid)
+        )
+
+    list_matchs_failure.extend(buffer.failed)
+
+    return list_matchs_failure, {
+        **buffer.summary(),
+        "cache": match_cache.stats(),
+        "coalescing": singleflight.stats(),
+    }
+
+
+@shared_task(bind=True)
+def get_summoner_info(self, nick_name: str, riot_id: str, region: str) -> dict:
     """
     Obtém informações sobre um invocador do League of Legends e suas partidas.
 
@@ -125,9 +344,12 @@ def get_summoner_info(nick_name: str, riot_id: str, region: str) -> dict:
     """
     load_dotenv()
 
-    lol_api = LolApi(os.environ.get("riot_api_key"))
+    set_task_progress(self.request.id, "player")
 
-    rate_limiter.make_request()
+    lol_api = LolApi(os.environ.get("riot_api_key"), rate_limiter)
+
+    rate_limiter.make_request(lol_api._regions[region], "account")
+    rate_limiter.make_request(region, "summoner")
     dados = lol_api.get_summoner_info_riot_id(nick_name, riot_id, region)
 
     player = Player(
@@ -143,17 +365,89 @@ def get_summoner_info(nick_name: str, riot_id: str, region: str) -> dict:
     except IntegrityError as e:
         print(f"Player já registrado porem não possui rewind gerada. {e}")
 
-    task_matchs = get_all_matchs_id.delay(dados.puuid, region)
+    # Outro pipeline do mesmo jogador (e.g., buscado com outro riot id) pode
+    # já estar em andamento; nesse caso, o pipeline continua pelo existente.
+    acquired, task_matchs_id = acquire_pipeline_lock(get_pipeline_key(dados.puuid))
+    link_pipeline_lock(
+        get_pipeline_key(dados.puuid), get_pipeline_key(region, nick_name, riot_id)
+    )
+    if acquired:
+        set_progress(dados.puuid, "match_list")
+        get_all_matchs_id.apply_async(
+            (dados.puuid, region),
+            task_id=task_matchs_id,
+            priority=MATCH_LIST_TASK_PRIORITY,
+        )
+
+    # Com o puuid, o progresso do pipeline passa a ser o progresso do jogador.
+    set_task_progress(self.request.id, "player", puuid=dados.puuid)
 
     return {
         "dados": {"puuid": dados.puuid, "player_name": dados.name},
-        "task_id": task_matchs.id,
+        "task_id": task_matchs_id,
         "next_task": "listar_matchs",
     }
 
 
+def save_player_matchs(player: Player, list_ids: list[str]) -> None:
+    """
+    Registra as partidas e a associação delas com o jogador, ignorando as já
+    registradas.
+
+    Args:
+        player (Player): O jogador.
+        list_ids (list[str]): Lista de IDs das partidas.
+    """
+    list_match = [Match(match_id=match_id) for match_id in list_ids]
+
+    for obj in list_match:
+        try:
+            create_match(match=obj)
+        except IntegrityError:
+            pass
+
+    for match in list_match:
+        try:
+            create_player_match_association(
+                player_match=PlayerMatchAssociation(
+                    player_puuid=player.puuid, match_id=match.match_id
+                )
+            )
+        except IntegrityError:
+            pass
+
+
+def get_refresh_start_time(player: Player, year: int) -> int:
+    """
+    Obtém o carimbo de tempo a partir do qual as partidas do jogador devem ser
+    listadas na atualização: a criação da última partida considerada na rewind
+    do jogador, guardada no estado da rewind, ou o início do ano.
+
+    Args:
+        player (Player): O jogador.
+        year (int): Ano da rewind.
+
+    Returns:
+        int: Carimbo de tempo UNIX (em segundos) inicial da busca.
+    """
+    start_time = get_timestamp_from_year(year)
+
+    rewind_state = None
+    if player.rewind_id:
+        rewind_state = find_rewind_state_by_id(player.rewind_id)
+
+    if rewind_state:
+        # 'gameCreation' é dado em milissegundos e 'startTime' em segundos. A
+        # última partida é listada novamente, mas já está registrada.
+        start_time = max(start_time, rewind_state["last_game_creation"] // 1000)
+
+    return start_time
+
+
 @shared_task
-def get_all_matchs_id(puuid: str, region: str, year: int = 2023) -> list:
+def get_all_matchs_id(
+    puuid: str, region: str, year: int = 2023, start_time: int = None
+) -> list:
     """
     Obtém todos os IDs de partidas de um jogador dentro de um ano específico.
 
@@ -161,6 +455,8 @@ def get_all_matchs_id(puuid: str, region: str, year: int = 2023) -> list:
         puuid (str): Identificador único do jogador.
         region (str): Região do jogador.
         year (int, opcional): Ano para busca das partidas. Padrão é 2023.
+        start_time (int, opcional): Carimbo de tempo inicial da busca, caso \
+        apenas as partidas mais recentes do ano devam ser listadas.
 
     Returns:
         list: Dados serializados contendo os IDs das partidas e o ID da tarefa \
@@ -168,37 +464,21 @@ def get_all_matchs_id(puuid: str, region: str, year: int = 2023) -> list:
     """
     load_dotenv()
 
-    lol_api = LolApi(os.environ.get("riot_api_key"))
+    lol_api = LolApi(os.environ.get("riot_api_key"), rate_limiter)
     list_all_ids = get_matchs_ids(
         lol_api,
         puuid,
         lol_api._regions[region],
-        start_time=get_timestamp_from_year(year),
+        start_time=start_time or get_timestamp_from_year(year),
         start=0,
         count=100,
     )
 
-    player = get_player(player_puuid=puuid)
-
-    list_match = [Match(match_id=match_id) for match_id in list_all_ids]
-
-    for obj in list_match:
-        try:
-            create_match(match=obj)
-        except IntegrityError:
-            pass
-
-    for match in list_match:
-        try:
-            create_player_match_association(
-                player_match=PlayerMatchAssociation(
-                    player_puuid=player.puuid, match_id=match.match_id
-                )
-            )
-        except IntegrityError:
-            pass
+    save_player_matchs(get_player(player_puuid=puuid), list_all_ids)
 
-    match_task = get_infos_from_list_matchs.delay(puuid, region)
+    match_task = get_infos_from_list_matchs.apply_async(
+        (puuid, region), priority=MATCH_LIST_TASK_PRIORITY
+    )
 
     return {
         "dados": {"puuid": puuid, "lista_ids": list_all_ids},
@@ -210,60 +490,130 @@ def get_all_matchs_id(puuid: str, region: str, year: int = 2023) -> list:
 @shared_task
 def get_infos_from_list_matchs(puuid: str, region: str) -> list:
     """
-    Obtém informações de uma lista de partidas não pesquisadas de um jogador.
+    Divide as partidas não pesquisadas de um jogador em lotes de
+    MATCH_CHUNK_SIZE partidas, buscados em paralelo pelos workers como um
+    'chord', com prioridades decrescentes para intercalar os lotes de jogadores
+    diferentes (ver 'get_chunk_priority'). Ao fim de todos os lotes,
+    'finish_infos_from_list_matchs' inicia a nova tentativa das partidas que
+    falharam ou a geração da rewind.
 
     Args:
         puuid (str): Identificador único do jogador.
         region (str): Região do jogador.
 
     Returns:
-        None: Retorna com base no progresso da busca por informações das \
-        partidas.
+        dict: O ID da tarefa que consolida os lotes.
+    """
+    list_matchs_ids = get_matches_not_searched_by_puuid(player_puuid=puuid)
+
+    print(f"Faltam: {len(list_matchs_ids)} a serem buscadas")
+
+    if not list_matchs_ids:
+        return finish_infos_from_list_matchs([], puuid, region)
+
+    start_progress(puuid, "match_info", len(list_matchs_ids))
+
+    chunks = [
+        list_matchs_ids[index : index + MATCH_CHUNK_SIZE]
+        for index in range(0, len(list_matchs_ids), MATCH_CHUNK_SIZE)
+    ]
+
+    task = chord(
+        get_infos_from_matchs_chunk.s(puuid, region, chunk).set(
+            priority=get_chunk_priority(MATCH_INFO_TASK_PRIORITY, index)
+        )
+        for index, chunk in enumerate(chunks)
+    )(
+        finish_infos_from_list_matchs.s(puuid, region).set(
+            priority=MATCH_INFO_TASK_PRIORITY
+        )
+    )
+
+    return {
+        "mensagem": (f"Buscando {len(list_matchs_ids)} matchs em {len(chunks)} lotes."),
+        "dados": {"puuid": puuid, "lotes": len(chunks)},
+        "task_id": task.id,
+        "next_task": "busca_dados_match",
+    }
+
+
+@shared_task
+def get_infos_from_matchs_chunk(
+    puuid: str, region: str, list_matchs_ids: list[str]
+) -> dict:
+    """
+    Busca as informações de um lote de partidas.
+
+    Args:
+        puuid (str): Identificador único do jogador.
+        region (str): Região do jogador.
+        list_matchs_ids (list[str]): Lista de IDs das partidas do lote.
+
+    Returns:
+        dict: Os IDs das partidas que falharam e o resumo da ingestão do lote.
     """
     load_dotenv()
 
-    lol_api = LolApi(os.environ.get("riot_api_key"))
+    list_matchs_failure, ingestion = fetch_matchs_infos(
+        os.environ.get("riot_api_key"), list_matchs_ids, region, puuid
+    )
 
-    list_matchs_ids = get_matches_not_searched_by_puuid(player_puuid=puuid)
+    return {
+        "total": len(list_matchs_ids),
+        "falhas": list_matchs_failure,
+        "ingestao": ingestion,
+    }
 
-    print(f"Faltam: {len(list_matchs_ids)} a serem buscadas")
 
-    list_matchs_failure = []
+@shared_task
+def finish_infos_from_list_matchs(chunks_results: list[dict], puuid: str, region: str):
+    """
+    Consolida os resultados dos lotes de partidas e inicia a nova tentativa das
+    partidas que falharam ou, caso não haja falhas, a geração da rewind.
 
-    for match_id in list_matchs_ids:
-        try:
-            rate_limiter.make_request()
-            match_info = lol_api.get_match_infos_by_id(match_id, region)
-            insert_match_data(match_info)
-            match = get_match(match_id=match_id)
-            match.is_searched = True
-            match = update_match(match_id=match_id, updated_match=match)
-        except Exception:
-            list_matchs_failure.append(match_id)
+    Args:
+        chunks_results (list[dict]): Os resultados de \
+        'get_infos_from_matchs_chunk'.
+        puuid (str): Identificador único do jogador.
+        region (str): Região do jogador.
+
+    Returns:
+        dict: Retorna com base no progresso da busca por informações das \
+        partidas.
+    """
+    total = sum(result["total"] for result in chunks_results)
+    list_matchs_failure = list(
+        chain.from_iterable(result["falhas"] for result in chunks_results)
+    )
+    ingestion = {
+        key: sum(result["ingestao"][key] for result in chunks_results)
+        for key in ("new", "existing", "failed")
+    }
 
     if list_matchs_failure:
-        task_matchs_failure = get_infos_from_list_matchs_failed.delay(
-            puuid, region, list_matchs_failure
+        task_matchs_failure = get_infos_from_list_matchs_failed.apply_async(
+            (puuid, region, list_matchs_failure),
+            priority=PLAYER_INFO_FAIL_TASK_PRIORITY,
         )
         return {
             "mensagem": (
                 f"Foram recuperadas "
-                f"{len(list_matchs_ids) - len(list_matchs_failure)}"
-                f" de {len(list_matchs_ids)}. Iniciando tentativa de buscar as"
+                f"{total - len(list_matchs_failure)}"
+                f" de {total}. Iniciando tentativa de buscar as"
                 f" {len(list_matchs_failure)} tasks faltantes."
             ),
-            "dados": {"puuid": puuid},
+            "dados": {"puuid": puuid, "ingestao": ingestion},
             "task_id": task_matchs_failure.id,
             "next_task": "buscar_dados_error",
         }
 
-    task = generate_rewind.delay(puuid, region)
+    set_progress(puuid, "rewind")
+    task = generate_rewind.apply_async((puuid, region), priority=REWIND_TASK_PRIORITY)
     return {
         "mensagem": (
-            f"Foram recuperadas {len(list_matchs_ids)} matchs"
-            "Iniciando geração de estatisticas."
+            f"Foram recuperadas {total} matchs" "Iniciando geração de estatisticas."
         ),
-        "dados": {"puuid": puuid},
+        "dados": {"puuid": puuid, "ingestao": ingestion},
         "next_task": "gerar_estatisticas",
         "task_id": task.id,
     }
@@ -287,60 +637,184 @@ def get_infos_from_list_matchs_failed(
     """
     load_dotenv()
 
-    lol_api = LolApi(os.environ.get("riot_api_key"))
-
     print(f"Faltam: {list_matchs_fail} a serem buscadas")
 
-    falhas = []
+    start_progress(puuid, "match_info_fail", len(list_matchs_fail))
 
-    for match_id in list_matchs_fail:
-        try:
-            rate_limiter.make_request()
-            match_info = lol_api.get_match_infos_by_id(match_id, region)
-            insert_match_data(match_info)
-            match = get_match(match_id=match_id)
-            match.is_searched = True
-            match = update_match(match_id=match_id, updated_match=match)
-        except Exception:
-            falhas.append(match_id)
-
-    task = generate_rewind.delay(puuid, region)
+    falhas, ingestion = fetch_matchs_infos(
+        os.environ.get("riot_api_key"), list_matchs_fail, region, puuid
+    )
+
+    set_progress(puuid, "rewind")
+
+    task = generate_rewind.apply_async((puuid, region), priority=REWIND_TASK_PRIORITY)
     return {
         "mensagem": f"{len(falhas)} partida não foram encontradas no momento.",
-        "dados": {"lista_falhas": falhas, "puuid": puuid},
+        "dados": {"lista_falhas": falhas, "puuid": puuid, "ingestao": ingestion},
         "next_task": "gerar_estatisticas",
         "task_id": task.id,
     }
 
 
 @shared_task
-def generate_rewind(puuid: str, region: str):
+def generate_rewind(puuid: str, region: str, year: int = 2023):
     load_dotenv()
 
-    lol_api = LolApi(os.environ.get("riot_api_key"))
+    lol_api = LolApi(os.environ.get("riot_api_key"), rate_limiter)
 
-    player = get_player(player_puuid=puuid)
+    profiler = Profiler.from_flags()
 
-    player_ranked = get_player_ranked_infos(lol_api, player.summoner_id, region)
+    with profiler.capture():
+        player = get_player(player_puuid=puuid)
 
-    rewind = create_rewind(puuid, get_timestamp_from_year(2023))
+        with profiler.phase("ranked_infos"):
+            player_ranked = get_player_ranked_infos(lol_api, player.summoner_id, region)
 
-    rewind["ranked_infos"] = player_ranked
+        rewind_state = None
+        if player.rewind_id:
+            with profiler.phase("load_state"):
+                rewind_state = find_rewind_state_by_id(player.rewind_id)
 
-    dict_info_player = get_player_infos_by_puuids(
-        lol_api, rewind["other_infos_players"], region
-    )
+        rewind, rewind_state = update_rewind_state(
+            puuid, rewind_state, get_timestamp_from_year(year), profiler=profiler
+        )
+
+        rewind["ranked_infos"] = player_ranked
+
+        with profiler.phase("detail_players"):
+            dict_info_player = get_player_infos_by_puuids(
+                os.environ.get("riot_api_key"), rewind["other_infos_players"], region
+            )
+
+        rewind["detail_players"] = dict_info_player
 
-    rewind["detail_players"] = dict_info_player
+        with profiler.phase("mongo_insert"):
+            if player.rewind_id:
+                rewind_id = update_rewind_data(player.rewind_id, rewind)
+            else:
+                rewind_id = insert_rewind_data(rewind)
+            upsert_rewind_state(rewind_id, rewind_state)
+        player.rewind_id = str(rewind_id)
+        player.update = datetime.now()
+        update_player(player_puuid=puuid, updated_player=player)
 
-    rewind_id = insert_rewind_data(rewind)
-    player.rewind_id = str(rewind_id)
-    player.update = datetime.now()
-    update_player(player_puuid=puuid, updated_player=player)
+    release_pipeline_lock(get_pipeline_key(puuid))
+    set_progress(puuid, "done")
 
     return {
         "mensagem": f"Rewind gerada com sucesso para o jogador {player.name}"
         f"Rewind de id {str(rewind_id)}",
         "dados": {"puuid": puuid},
         "next_task": "dados_gerados",
+        "timings": profiler.summary(),
+    }
+
+
+@shared_task
+def refresh_players() -> dict:
+    """
+    Inicia a atualização dos REFRESH_PLAYERS_PER_TICK jogadores com a rewind
+    mais antiga, entre os que não foram atualizados nos últimos
+    REFRESH_INTERVAL segundos. Executada periodicamente pelo 'celery beat'.
+
+    A rodada é adiada caso as filas das consultas dos usuários tenham tarefas
+    aguardando, e os jogadores com pipeline em andamento são ignorados.
+
+    Returns:
+        dict: Os puuids dos jogadores cuja atualização foi iniciada.
+    """
+    pending = count_pending_tasks(INTERACTIVE_QUEUES)
+    if pending > REFRESH_MAX_PENDING:
+        return {
+            "mensagem": f"{pending} tarefas aguardando. Atualização adiada.",
+            "dados": {"jogadores": []},
+        }
+
+    players = get_players_to_refresh(
+        updated_before=datetime.now() - timedelta(seconds=REFRESH_INTERVAL),
+        limit=REFRESH_PLAYERS_PER_TICK,
+    )
+
+    list_puuids = []
+    for player in players:
+        acquired, task_id = acquire_pipeline_lock(get_pipeline_key(player.puuid))
+        if acquired:
+            refresh_player.apply_async(
+                (player.puuid, player.region),
+                task_id=task_id,
+                priority=REFRESH_TASK_PRIORITY,
+            )
+            list_puuids.append(player.puuid)
+
+    return {
+        "mensagem": f"Atualizando {len(list_puuids)} jogadores.",
+        "dados": {"jogadores": list_puuids},
+    }
+
+
+@shared_task
+def refresh_player(puuid: str, region: str, year: int = 2023) -> dict:
+    """
+    Atualiza a rewind de um jogador buscando apenas as partidas criadas depois
+    da última partida da rewind (ver 'get_refresh_start_time'), além das que
+    falharam em buscas anteriores.
+
+    As partidas novas são poucas, então são buscadas nesta mesma tarefa, e a
+    rewind é gerada com a menor prioridade.
+
+    Args:
+        puuid (str): Identificador único do jogador.
+        region (str): Região do jogador.
+        year (int, opcional): Ano da rewind. Padrão é 2023.
+
+    Returns:
+        dict: O resumo das partidas buscadas e o ID da tarefa de geração da \
+        rewind, caso existam partidas novas.
+    """
+    load_dotenv()
+
+    lol_api = LolApi(os.environ.get("riot_api_key"), rate_limiter)
+
+    player = get_player(player_puuid=puuid)
+    list_new_ids = get_matchs_ids(
+        lol_api,
+        puuid,
+        lol_api._regions[region],
+        start_time=get_refresh_start_time(player, year),
+        start=0,
+        count=100,
+    )
+    save_player_matchs(player, list_new_ids)
+
+    list_matchs_ids = get_matches_not_searched_by_puuid(player_puuid=puuid)
+
+    if not list_matchs_ids:
+        player.update = datetime.now()
+        update_player(player_puuid=puuid, updated_player=player)
+        release_pipeline_lock(get_pipeline_key(puuid))
+        return {
+            "mensagem": f"Nenhuma partida nova para o jogador {player.name}.",
+            "dados": {"puuid": puuid},
+            "next_task": "dados_gerados",
+        }
+
+    start_progress(puuid, "match_info", len(list_matchs_ids))
+
+    falhas, ingestion = fetch_matchs_infos(
+        os.environ.get("riot_api_key"), list_matchs_ids, region, puuid
+    )
+
+    set_progress(puuid, "rewind")
+
+    task = generate_rewind.apply_async(
+        (puuid, region, year), priority=REFRESH_TASK_PRIORITY
+    )
+    return {
+        "mensagem": (
+            f"Foram recuperadas {len(list_matchs_ids) - len(falhas)} de "
+            f"{len(list_matchs_ids)} partidas novas. Atualizando estatisticas."
+        ),
+        "dados": {"lista_falhas": falhas, "puuid": puuid, "ingestao": ingestion},
+        "next_task": "gerar_estatisticas",
+        "task_id": task.id,
     }
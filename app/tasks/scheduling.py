@@ -0,0 +1,129 @@
+import time
+
+from celery.signals import before_task_publish, task_prerun
+from redis import Redis
+from redis.exceptions import RedisError
+
+from .celery_app import CELERY_URL, celery_app
+
+QUEUE_WAIT_PREFIX = "queue_wait"
+QUEUE_WAIT_SAMPLES = 1000
+
+MAX_TASK_PRIORITY = 9
+
+redis_client = Redis.from_url(CELERY_URL)
+
+
+def get_priority_queue_keys(queue: str) -> list[str]:
+    # Com prioridades, o Redis mantém uma lista por prioridade.
+    return [
+        f"{queue}:{priority}" if priority else queue
+        for priority in range(MAX_TASK_PRIORITY + 1)
+    ]
+
+
+def count_pending_tasks(queues: list[str]) -> int:
+    """
+    Conta as tarefas aguardando nas filas informadas, em todas as prioridades.
+
+    Parâmetros:
+    - queues (list[str]): Os nomes das filas.
+
+    Retorna:
+    - int: A quantidade de tarefas aguardando.
+    """
+    with redis_client.pipeline(transaction=False) as pipe:
+        for queue in queues:
+            for key in get_priority_queue_keys(queue):
+                pipe.llen(key)
+        return sum(pipe.execute())
+
+
+def get_chunk_priority(base_priority: int, chunk_index: int) -> int:
+    """
+    Calcula a prioridade de um lote de partidas a partir da sua posição entre os
+    lotes do jogador.
+
+    O primeiro lote de cada jogador recebe a prioridade base e os seguintes
+    prioridades cada vez menores, de forma que o primeiro lote de um jogador que
+    chegou depois é executado antes dos lotes finais de um jogador com muitas
+    partidas, intercalando os jogadores.
+
+    Parâmetros:
+    - base_priority (int): A prioridade do primeiro lote.
+    - chunk_index (int): A posição do lote entre os lotes do jogador.
+
+    Retorna:
+    - int: A prioridade do lote (0 é a maior).
+    """
+    return min(base_priority + chunk_index, MAX_TASK_PRIORITY)
+
+
+@before_task_publish.connect
+def set_enqueued_at(headers: dict = None, **kwargs) -> None:
+    if headers is not None:
+        headers["enqueued_at"] = time.time()
+
+
+@task_prerun.connect
+def record_queue_wait(task=None, **kwargs) -> None:
+    """
+    Registra no Redis o tempo entre a publicação e o início da execução da
+    tarefa, por fila.
+    """
+    enqueued_at = task.request.get("enqueued_at")
+    if enqueued_at is None:
+        return
+
+    delivery_info = task.request.delivery_info or {}
+    queue = delivery_info.get("routing_key") or "celery"
+    wait = max(time.time() - enqueued_at, 0)
+
+    key = f"{QUEUE_WAIT_PREFIX}:{queue}"
+    try:
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, "count", 1)
+            pipe.hincrbyfloat(key, "total", wait)
+            pipe.lpush(f"{key}:samples", wait)
+            pipe.ltrim(f"{key}:samples", 0, QUEUE_WAIT_SAMPLES - 1)
+            pipe.execute()
+    except RedisError:
+        pass
+
+
+def get_queue_wait_metrics() -> dict:
+    """
+    Monta as métricas do tempo de espera de cada fila, com a média desde o
+    início e os percentis das últimas QUEUE_WAIT_SAMPLES tarefas.
+
+    Retorna:
+    - dict: As métricas (em segundos) e a quantidade de tarefas aguardando,
+      indexadas pelo nome da fila.
+    """
+    queues = [queue.name for queue in celery_app.conf.task_queues]
+
+    with redis_client.pipeline(transaction=False) as pipe:
+        for queue in queues:
+            pipe.hgetall(f"{QUEUE_WAIT_PREFIX}:{queue}")
+            pipe.lrange(f"{QUEUE_WAIT_PREFIX}:{queue}:samples", 0, -1)
+            for key in get_priority_queue_keys(queue):
+                pipe.llen(key)
+        results = pipe.execute()
+
+    metrics = {}
+    step = MAX_TASK_PRIORITY + 3
+    for index, queue in enumerate(queues):
+        totals, samples, *pending = results[index * step : (index + 1) * step]
+        count = int(totals.get(b"count", 0))
+        samples = sorted(float(sample) for sample in samples)
+
+        metrics[queue] = {
+            "pending": sum(pending),
+            "count": count,
+            "mean": float(totals.get(b"total", 0)) / count if count else None,
+            "p50": samples[len(samples) // 2] if samples else None,
+            "p95": samples[int(len(samples) * 0.95)] if samples else None,
+            "max": samples[-1] if samples else None,
+        }
+
+    return metrics
@@ -1,3 +1,5 @@
-from .functions_statistics import create_rewind  # noqa
-from .rate_limit_control import RateLimiter  # noqa
+from .functions_statistics import create_rewind, create_rewind_cached  # noqa
+from .profiling import Profiler  # noqa
+from .rate_limit_control import RateLimiter, RedisRateLimiter  # noqa
+from .rewind_state import create_rewind_streaming, update_rewind_state  # noqa
 from .time_calculator import get_timestamp_from_year  # noqa
@@ -1,10 +1,22 @@
+import os
+import time
 from collections import Counter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from itertools import chain
-from statistics import mode
+from multiprocessing import get_context
 
 import numpy
 import pandas
-from mongo import find_matches_by_puuid
+from cache import rewind_cache
+from mongo import find_matches_by_puuid, find_matches_fingerprint_by_puuid
+from serialization import to_serializable
+
+from .profiling import Profiler
 
 player_infos_keys = [
     "firstBloodKill",
@@ -41,14 +53,53 @@ player_challenges_keys = [
     "soloBaronKills",
 ]
 
+other_stats_aggregations = {
+    "sum": player_infos_keys,
+    "mean": player_infos_keys,
+    "max": player_max_infos_keys,
+}
+
 team_objectives_key = ["dragon", "baron"]
 
+rewind_rounding = {"player_role_win_info": 2}
+
+REWIND_EXECUTION_MODE = os.environ.get("REWIND_EXECUTION_MODE", "serial")
+REWIND_MAX_WORKERS = int(os.environ.get("REWIND_MAX_WORKERS", os.cpu_count() or 1))
+
 timestamp_columns = [
+    "gameCreation",
+    "gameEndTimestamp",
+    "gameStartTimestamp",
+]
+
+match_columns = [
     "info.gameCreation",
+    "info.gameDuration",
     "info.gameEndTimestamp",
     "info.gameStartTimestamp",
 ]
 
+participant_base_keys = [
+    "teamId",
+    "kills",
+    "deaths",
+    "assists",
+    "doubleKills",
+    "tripleKills",
+    "quadraKills",
+    "pentaKills",
+    "championId",
+    "win",
+    "teamPosition",
+    "profileIcon",
+    "summonerLevel",
+]
+
+participant_default_values = {
+    "win": None,
+    "teamPosition": None,
+}
+
 itens_keys = [
     "item0",
     "item1",
@@ -60,17 +111,6 @@ itens_keys = [
 ]
 
 
-def convert_to_serializable(dict_convert: dict):
-    for key in dict_convert.keys():
-        if isinstance(dict_convert[key], dict):
-            convert_to_serializable(dict_convert[key])
-        if isinstance(dict_convert[key], numpy.float64):
-            dict_convert[key] = float(dict_convert[key])
-        if isinstance(dict_convert[key], numpy.int64):
-            dict_convert[key] = int(dict_convert[key])
-    return dict_convert
-
-
 def transpose_dict(dict_data):
     new_dict = {}
     for key, value in dict_data.items():
@@ -81,15 +121,6 @@ def transpose_dict(dict_data):
     return new_dict
 
 
-def format_float_number(dict_data):
-    for key in dict_data.keys():
-        if isinstance(dict_data[key], dict):
-            format_float_number(dict_data[key])
-        if isinstance(dict_data[key], float):
-            dict_data[key] = round(dict_data[key], 2)
-    return dict_data
-
-
 def merge_other_values(dict_other_total: dict, dict_other_means: dict) -> dict:
     dict_others = {}
     for key in dict_other_total.keys():
@@ -121,282 +152,215 @@ def add_total_in_dict(dict_data: dict) -> dict:
     return dict_data
 
 
-def get_info_participant_value(puuid: str, row: pandas.Series, key: str) -> int:
+def get_participant_keys() -> list[str]:
     """
-    Obtém o valor associado à chave especificada para um participante
-    específico em uma partida de League of Legends.
-
-    Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - row (pandas.Series): Uma linha do DataFrame pandas representando
-      informações da partida.
-    - key (str): O nome da chave do dicionário que representa uma estatística
-      da partida de League of Legends.
+    Monta a lista de chaves de participante extraídas para o DataFrame do
+    jogador, sem repetições e mantendo a ordem de declaração.
 
     Retorna:
-    - int: O valor associado à chave para o participante identificado por 'puuid'.
-      Se o participante não for encontrado ou a chave não existir, retorna 0.
+    - list: Lista com as chaves do participante usadas pelas estatísticas.
     """
-    participants = row.get("info.participants", [])
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            return participant.get(key, 0)
-
-
-def get_info_participant_value_per_mode(
-    puuid: str, row: pandas.Series, key: str
-) -> tuple[str, int]:
-    """
-    Obtém o valor associado à chave para um participante específico em uma
-    partida de League of Legends, juntamente com o modo de jogo correspondente.
+    return list(
+        dict.fromkeys(
+            [
+                *participant_base_keys,
+                *player_infos_keys,
+                *player_max_infos_keys,
+                *itens_keys,
+            ]
+        )
+    )
 
-    Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - row (pandas.Series): Uma linha do DataFrame pandas representando
-      informações da partida.
-    - key (str): O nome da chave do dicionário que representa uma estatística
-      da partida de League of Legends.
 
-    Retorna:
-    - tuple: Uma tupla contendo o modo de jogo (game_mode) e o valor associado
-      à chave para o participante identificado por 'puuid'. Se o participante
-      não for encontrado ou a chave não existir, o valor é 0.
+def extract_match_frames(
+    puuid: str, df: pandas.DataFrame, with_participants: bool = False
+) -> tuple[pandas.DataFrame, pandas.DataFrame]:
     """
-    game_mode = row.get("info.gameMode")
-    participants = row.get("info.participants", [])
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            return (game_mode, participant.get(key, 0))
+    Extrai, em uma única passagem pelas partidas, um DataFrame colunar com uma
+    linha por partida para o jogador informado e, opcionalmente, um DataFrame
+    com todos os participantes de cada partida.
 
-
-def get_info_team_id_and_match_id_from_player(puuid: str, row: pandas.Series, key: str):
-    """
-    Obtém o identificador da partida (match_id) e o valor associado à chave para
-    um jogador específico em uma partida de League of Legends.
+    O DataFrame do jogador contém as informações da partida (matchId, gameMode
+    e timestamps já convertidos para datetime), as chaves do participante
+    listadas em 'get_participant_keys', os desafios de
+    'player_challenges_keys' (prefixados com 'challenges.') e a lista de
+    campeões banidos pelo time do jogador na coluna 'bans'.
 
     Parâmetros:
     - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - row (pandas.Series): Uma linha do DataFrame pandas representando
-      informações da partida.
-    - key (str): O nome da chave do dicionário que representa uma estatística
-      da partida de League of Legends.
+    - df (pandas.DataFrame): O DataFrame normalizado contendo informações sobre
+      as partidas de League of Legends.
+    - with_participants (bool): Se True, também monta o DataFrame com todos os
+      participantes (matchId, puuid e teamId).
 
     Retorna:
-    - tuple: Uma tupla contendo o identificador da partida (match_id) e o valor
-      associado à chave para o jogador identificado por 'puuid'. Se o jogador
-      não for encontrado ou a chave não existir, o valor é 0.
-    """
-    match_id = row.get("metadata.matchId")
-    participants = row.get("info.participants", [])
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            return (match_id, participant.get(key, 0))
-
-
-def get_info_team_objectives(
-    row: pandas.Series, key: str, df_team_played: pandas.DataFrame
-):
+    - tuple: Uma tupla contendo o DataFrame do jogador e o DataFrame de todos os
+      participantes (None caso 'with_participants' seja False).
     """
-    Obtém a quantidade de kills associada a um objetivo específico de equipe em
-    uma partida de League of Legends.
-
-    A função utiliza as informações contidas na série de dados da partida e no
-    DataFrame 'df_team_played' para identificar a equipe do jogador na partida.
-    Em seguida, recupera as estatísticas associadas ao objetivo específico dessa
-    equipe e retorna a quantidade de kills.
+    participant_keys = get_participant_keys()
+    default_values = {
+        key: participant_default_values.get(key, 0) for key in participant_keys
+    }
 
-    Parâmetros:
-    - row (pandas.Series): Uma linha do DataFrame contendo informações sobre a
-      partida de League of Legends.
-    - key (str): A chave do objetivo específico de equipe desejado
-    (e.g., 'BARON_NASHOR_KILL').
-    - df_team_played (pandas.DataFrame): O DataFrame contendo informações sobre
-      as equipes que participaram das partidas de League of Legends.
+    player_rows = []
+    participants_rows = []
+
+    for match_id, game_mode, participants, teams, *match_values in zip(
+        df["metadata.matchId"],
+        df["info.gameMode"],
+        df["info.participants"],
+        df["info.teams"],
+        *[
+            df.get(column, pandas.Series(numpy.nan, index=df.index))
+            for column in match_columns
+        ],
+    ):
+        player = None
+        for participant in participants:
+            if participant.get("puuid") == puuid:
+                player = participant
+            if with_participants:
+                participants_rows.append(
+                    (match_id, participant.get("puuid"), participant.get("teamId"))
+                )
 
-    Retorna:
-    - int: A quantidade de kills associada ao objetivo específico da equipe na partida.
-    """
-    match_id = row.get("metadata.matchId")
-    teams = row.get("info.teams", [])
-    for team in teams:
-        if (
-            team.get("teamId")
-            == df_team_played.loc[df_team_played["matchId"] == match_id, "teamId"].iloc[
-                0
-            ]
-        ):
-            objectives = team.get("objectives", {})
-            return objectives.get(key, {}).get("kills", 0)
+        if player is None:
+            continue
 
+        challenges = player.get("challenges", {})
+        team_id = player.get("teamId")
+        bans = next(
+            (
+                [ban.get("championId") for ban in team.get("bans", [])]
+                for team in teams
+                if team.get("teamId") == team_id
+            ),
+            [],
+        )
 
-def get_info_player_challengers_per_game_mode(
-    puuid: str, row: pandas.Series, keys: list[str]
-):
-    """
-    Obtém as estatísticas de desafios de um jogador em uma partida de League of
-    Legends por modo de jogo.
+        player_rows.append(
+            (
+                match_id,
+                game_mode,
+                *match_values,
+                *[player.get(key, default_values[key]) for key in participant_keys],
+                *[challenges.get(key, 0) for key in player_challenges_keys],
+                bans,
+            )
+        )
 
-    Para o jogador identificado pelo PUUID fornecido, a função procura na série de
-    dados da partida por estatísticas de desafios correspondentes às chaves
-    fornecidas. Retorna uma tupla contendo o modo de jogo e um dicionário com as
-    estatísticas de desafios para cada chave.
+    df_player = pandas.DataFrame.from_records(
+        player_rows,
+        columns=[
+            "matchId",
+            "gameMode",
+            *[column.split(".")[-1] for column in match_columns],
+            *participant_keys,
+            *[f"challenges.{key}" for key in player_challenges_keys],
+            "bans",
+        ],
+    )
+    for column in timestamp_columns:
+        df_player[column] = pandas.to_datetime(df_player[column], unit="ms")
 
-    Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - row (pandas.Series): Uma linha do DataFrame contendo informações sobre a
-      partida de League of Legends.
-    - keys (list): Uma lista de chaves representando os desafios desejados.
+    df_participants = None
+    if with_participants:
+        df_participants = pandas.DataFrame.from_records(
+            participants_rows, columns=["matchId", "puuid", "teamId"]
+        )
 
-    Retorna:
-    - tuple: Uma tupla contendo o modo de jogo e um dicionário com as estatísticas
-      de desafios para cada chave, correspondentes ao participante identificado
-      pelo PUUID na partida.
-    """
-    game_mode = row.get("info.gameMode")
-    participants = row.get("info.participants", [])
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            return (
-                game_mode,
-                {key: participant.get("challenges", {}).get(key, 0) for key in keys},
-            )
+    return df_player, df_participants
 
 
-def get_infos_parcipant_value_in_list(
-    puuid: str, row: pandas.Series, keys: list[str]
-) -> list:
+def extract_teams_frame(df: pandas.DataFrame) -> pandas.DataFrame:
     """
-    Obtém os valores das estatísticas de um participante em uma partida de League
-    of Legends, com base nas chaves especificadas.
-
-    Para o jogador identificado pelo PUUID fornecido, a função procura na série
-    de dados da partida por estatísticas correspondentes às chaves fornecidas.
-    Retorna uma lista dos valores encontrados para cada chave.
+    Explode a lista 'info.teams' das partidas em um DataFrame com uma linha por
+    equipe em cada partida.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - row (pandas.Series): Uma linha do DataFrame contendo informações sobre a
-      partida de League of Legends.
-    - keys (list): Uma lista de chaves representando as estatísticas desejadas.
+    - df (pandas.DataFrame): O DataFrame normalizado contendo informações sobre
+      as partidas de League of Legends.
 
     Retorna:
-    - list: Uma lista contendo os valores correspondentes às estatísticas
-      especificadas para o participante identificado pelo PUUID.
+    - pandas.DataFrame: Um DataFrame com as colunas 'matchId', 'teamId' e uma
+      coluna para cada objetivo de 'team_objectives_key' contendo a quantidade
+      de kills da equipe naquele objetivo.
     """
-    participants = row.get("info.participants", [])
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            return [participant.get(key) for key in keys if participant.get(key)]
+    df_teams = (
+        df[["metadata.matchId", "info.teams"]]
+        .explode("info.teams", ignore_index=True)
+        .dropna(subset=["info.teams"])
+    )
+    teams = df_teams["info.teams"].to_list()
+    return pandas.DataFrame(
+        {
+            "matchId": df_teams["metadata.matchId"].to_numpy(),
+            "teamId": [team.get("teamId") for team in teams],
+            **{
+                key: [
+                    team.get("objectives", {}).get(key, {}).get("kills", 0)
+                    for team in teams
+                ]
+                for key in team_objectives_key
+            },
+        }
+    )
 
 
-def get_infos_parcipant_value_in_list_per_mode(
-    puuid: str, row: pandas.Series, keys: list[str]
-) -> tuple:
+def get_team_played_index(df: pandas.DataFrame) -> pandas.Series:
     """
-    Obtém os valores das estatísticas de um participante em uma partida de League
-    of Legends, com base nas chaves especificadas, juntamente com o modo de jogo.
-
-    Para o jogador identificado pelo PUUID fornecido, a função procura na série
-    de dados da partida por estatísticas correspondentes às chaves fornecidas.
-    Retorna uma tupla contendo o modo de jogo e uma lista dos valores encontrados
-    para cada chave.
+    Monta o índice matchId -> teamId do jogador a partir do DataFrame do jogador.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - row (pandas.Series): Uma linha do DataFrame contendo informações sobre a
-      partida de League of Legends.
-    - keys (list): Uma lista de chaves representando as estatísticas desejadas.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
-    - tuple: Uma tupla contendo o modo de jogo e uma lista dos valores
-      correspondentes às estatísticas especificadas para o participante identificado
-      pelo PUUID.
+    - pandas.Series: Uma série indexada por 'matchId' com o 'teamId' do jogador
+      em cada partida.
     """
-    game_mode = row.get("info.gameMode")
-    participants = row.get("info.participants", [])
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            return (
-                game_mode,
-                [participant.get(key) for key in keys if participant.get(key)],
-            )
+    return df.set_index("matchId")["teamId"]
 
 
-def get_multiple_kills(
-    puuid: str, df: pandas.DataFrame, type_kills: str
-) -> pandas.DataFrame:
+def get_sum_per_mode(df: pandas.DataFrame, keys: list[str]) -> dict:
     """
-    Calcula o número total de kills de um determinado tipo por modo de jogo para
-    um jogador específico.
-
-    A função utiliza o DataFrame fornecido e o identificador único (PUUID) do
-    jogador juntamente com a função auxiliar 'get_info_participant_value_per_mode'
-    para obter o número de kills do tipo especificado para cada partida do jogador.
-    Esses valores são somados por modo de jogo.
+    Soma as colunas informadas por modo de jogo e adiciona a chave 'TOTAL'.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
-    - type_kills (str): O tipo de kills desejado (e.g., 'doubleKills', 'tripleKills').
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
+    - keys (list): Uma lista com as colunas a serem somadas.
 
     Retorna:
-    - pandas.DataFrame: Um DataFrame contendo o número total de kills do tipo
-      especificado por modo de jogo, onde as colunas são 'gameMode' e o tipo
-      de kills, e as linhas representam os modos de jogo.
+    - dict: Um dicionário onde as chaves são as colunas e os valores são
+      subdicionários com os modos de jogo como chaves e as somas de cada modo,
+      incluindo a chave 'TOTAL'.
     """
-    mult_kill = df.apply(
-        lambda row: get_info_participant_value_per_mode(puuid, row, type_kills), axis=1
-    ).to_list()
-    return (
-        pandas.DataFrame(mult_kill, columns=["gameMode", type_kills])
-        .groupby(by="gameMode")
-        .sum()
-    )
+    return add_total_in_dict(df.groupby(by="gameMode")[keys].sum().to_dict())
 
 
-def get_team_side_per_mode(df: pandas.DataFrame) -> dict[dict[str, int]]:
+def get_most_frequent_value(values: pandas.Series):
     """
-    Obtém um dicionário representando o número de ocorrências de cada combinação
-    de modo de jogo e lado da equipe em um DataFrame pandas.
+    Obtém o valor mais frequente de uma série, desempatando pela primeira
+    ocorrência (mesmo comportamento de 'statistics.mode').
 
     Parâmetros:
-    - df (pandas.DataFrame): Um DataFrame pandas contendo informações sobre
-      partidas de League of Legends.
+    - values (pandas.Series): A série com os valores.
 
     Retorna:
-    - dict: Um dicionário onde as chaves são Id do Time (teamId) e os valores
-      são dicionarios que as chaves são modos de jogo e os valores são
-      a quantidade de partidas.
+    - O valor mais frequente da série.
     """
-    team_side = df.apply(
-        lambda row: get_info_participant_value_per_mode(row, "teamId"), axis=1
-    )
-
-    return (
-        pandas.DataFrame(team_side.to_list(), columns=["gameMode", "teamId"])
-        .groupby(by=["gameMode", "teamId"])
-        .size()
-        .unstack(fill_value=0)
-        .to_dict()
-    )
+    return values.value_counts(sort=False).idxmax()
 
 
-def get_player_kda_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
+def get_player_kda_per_mode(df: pandas.DataFrame) -> dict:
     """
-    Calcula e retorna o KDA (Kills, Deaths, Assists) por modo de jogo para um
-    jogador específico.
-
-    Para cada estatística (Kills, Deaths, Assists), a função cria um DataFrame
-    contendo a soma da estatística para cada modo de jogo. Os DataFrames
-    resultantes são concatenados ao longo do eixo horizontal, gerando um
-    DataFrame final com as estatísticas KDA para cada modo de jogo.
+    Calcula e retorna o KDA (Kills, Deaths, Assists) por modo de jogo para o
+    jogador.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of
-      Legends.
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
     - dict: Um dicionário contendo as estatísticas KDA por modo de jogo, onde
@@ -406,103 +370,48 @@ def get_player_kda_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
       'TOTAL' que representa a soma total da estatística para todos os modos
       de jogo.
     """
-    list_df_kda = [
-        (
-            pandas.DataFrame(
-                df.apply(
-                    lambda row: get_info_participant_value_per_mode(
-                        puuid, row, tp_stats
-                    ),
-                    axis=1,
-                ).to_list(),
-                columns=["gameMode", tp_stats],
-            )
-            .groupby(by="gameMode")
-            .sum()
-        )
-        for tp_stats in ["kills", "deaths", "assists"]
-    ]
-    df_kda = pandas.concat(list_df_kda, axis=1, sort=True)
-    dict_kda = df_kda.to_dict()
-    dict_kda = add_total_in_dict(dict_kda)
-    return dict_kda
+    return get_sum_per_mode(df, ["kills", "deaths", "assists"])
 
 
-def game_by_side_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
+def game_by_side_per_mode(df: pandas.DataFrame) -> dict:
     """
-    Conta o número de partidas jogadas por modo de jogo e lado da equipe para um
-    jogador específico.
-
-    Para cada modo de jogo, a função cria um DataFrame contendo a contagem de
-    partidas para cada lado da equipe. Os DataFrames resultantes são
-    consolidados em um dicionário onde as chaves são tuplas (gameMode, teamId)
-    e os valores são os totais de partidas para cada combinação. Cada subdicionário
-    também inclui uma chave 'TOTAL' que representa a soma total de partidas para
-    o modo de jogo correspondente.
+    Conta o número de partidas jogadas por modo de jogo e lado da equipe para o
+    jogador.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
-    - dict: Um dicionário contendo o número de partidas jogadas por modo de jogo
-      e lado da equipe, onde as chaves são tuplas (gameMode, teamId) e os valores
-      são subdicionários com os lados da equipe como chaves e os totais de partidas
-      para cada lado. Cada subdicionário também inclui uma chave 'TOTAL' que
-      representa a soma total de partidas para o modo de jogo correspondente.
+    - dict: Um dicionário onde as chaves são os lados da equipe (teamId) e os
+      valores são subdicionários com os modos de jogo como chaves e os totais de
+      partidas para cada modo. Cada subdicionário também inclui uma chave 'TOTAL'
+      que representa a soma total de partidas para o lado correspondente.
     """
     dict_side = (
-        pandas.DataFrame(
-            df.apply(
-                lambda row: get_info_participant_value_per_mode(puuid, row, "teamId"),
-                axis=1,
-            ).to_list(),
-            columns=["gameMode", "teamId"],
-        )
-        .groupby(by=["gameMode", "teamId"])
-        .size()
-        .unstack(fill_value=0)
-        .to_dict()
+        df.groupby(by=["gameMode", "teamId"]).size().unstack(fill_value=0).to_dict()
     )
     dict_side = add_total_in_dict(dict_side)
     return dict_side
 
 
-def get_infos_player_champion_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
+def get_infos_player_champion_per_mode(df: pandas.DataFrame) -> dict:
     champion_most_played = (
-        pandas.DataFrame(
-            df.apply(
-                lambda row: get_info_participant_value_per_mode(
-                    puuid, row, "championId"
-                ),
-                axis=1,
-            ).to_list(),
-            columns=["gameMode", "championId"],
-        )
-        .groupby(by="gameMode")["championId"]
+        df.groupby(by="gameMode")["championId"]
         .agg(lambda x: x.mode().iloc[0])
         .to_dict()
     )
     return champion_most_played
 
 
-def get_multi_kills_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
+def get_multi_kills_per_mode(df: pandas.DataFrame) -> dict:
     """
     Calcula o número total de multi-kills (double, triple, quadra, penta) por
-    modo de jogo para um jogador específico.
-
-    A função utiliza a função auxiliar 'get_multiple_kills' para obter o número
-    de kills de cada tipo para cada modo de jogo. Os resultados são consolidados
-    em um dicionário onde as chaves são os tipos de kills e os valores são
-    subdicionários com os modos de jogo como chaves e os totais de cada tipo
-    de kills para cada modo. Cada subdicionário também inclui uma chave 'TOTAL'
-    que representa a soma total de kills para o tipo correspondente.
+    modo de jogo para o jogador.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
     - dict: Um dicionário contendo o número total de multi-kills (double, triple,
@@ -511,34 +420,18 @@ def get_multi_kills_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
       de cada tipo de kills para cada modo. Cada subdicionário também inclui uma
       chave 'TOTAL' que representa a soma total de kills para o tipo correspondente.
     """
-    list_multi_kills = [
-        get_multiple_kills(puuid, df, type_kills)
-        for type_kills in ["doubleKills", "tripleKills", "quadraKills", "pentaKills"]
-    ]
-    df_multi_kills = pandas.concat(list_multi_kills, axis=1, sort=True)
-
-    dict_multi_kills = df_multi_kills.to_dict()
-    dict_multi_kills = add_total_in_dict(dict_multi_kills)
-
-    return dict_multi_kills
+    return get_sum_per_mode(
+        df, ["doubleKills", "tripleKills", "quadraKills", "pentaKills"]
+    )
 
 
-def get_first_blood_amount_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
+def get_first_blood_amount_per_mode(df: pandas.DataFrame) -> dict:
     """
-    Calcula o número total de first blood kills por modo de jogo para um jogador
-    específico.
-
-    A função utiliza a função auxiliar 'get_info_participant_value_per_mode'
-    para obter o número de first blood kills para cada modo de jogo. Os resultados
-    são consolidados em um dicionário onde as chaves são os modos de jogo e os
-    valores são os totais de first blood kills para cada modo. Cada valor também
-    inclui uma chave 'TOTAL' que representa a soma total de first blood kills para
-    o modo correspondente.
+    Calcula o número total de first blood kills por modo de jogo para o jogador.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
     - dict: Um dicionário contendo o número total de first blood kills por modo
@@ -546,38 +439,40 @@ def get_first_blood_amount_per_mode(puuid: str, df: pandas.DataFrame) -> dict:
       first blood kills para cada modo. Cada valor também inclui uma chave 'TOTAL'
       que representa a soma total de first blood kills para o modo correspondente.
     """
-    df_first_blood = (
-        pandas.DataFrame(
-            df.apply(
-                lambda row: get_info_participant_value_per_mode(
-                    puuid, row, "firstBloodKill"
-                ),
-                axis=1,
-            ).to_list(),
-            columns=["gameMode", "firstBloodKill"],
-        )
-        .groupby(by="gameMode")
-        .sum()
-    )
-    dict_first_blood = df_first_blood.to_dict()
-    dict_first_blood = add_total_in_dict(dict_first_blood)
+    return get_sum_per_mode(df, ["firstBloodKill"])
 
-    return dict_first_blood
+
+def get_max_consecutive_days(dates: list) -> int:
+    """
+    Calcula o máximo de dias consecutivos com partidas jogadas.
+
+    Parâmetros:
+    - dates (list): Lista ordenada e sem repetições das datas com partidas.
+
+    Retorna:
+    - int: O máximo de dias consecutivos com partidas jogadas.
+    """
+    df_dates = pandas.DataFrame(dates, columns=["date"])
+    df_dates["intervals"] = df_dates["date"].diff().dt.days
+
+    return (
+        df_dates.groupby((df_dates["intervals"] != 1).cumsum())["intervals"]
+        .count()
+        .max()
+    )
 
 
 def general_infos(df: pandas.DataFrame) -> dict:
     """
-    Calcula informações gerais com base no DataFrame de partidas de League of Legends.
+    Calcula informações gerais com base no DataFrame de partidas do jogador.
 
     Realiza operações como:
-    1. Calcula a duração do jogo em segundos e adiciona a coluna
-        'info.gameDurationSeconds' ao DataFrame.
-    2. Calcula o total de horas jogadas com base na coluna 'info.gameDurationHours'
-        do DataFrame.
+    1. Calcula a duração do jogo em segundos, considerando que partidas sem
+        'gameEndTimestamp' possuem 'gameDuration' em milissegundos.
+    2. Calcula o total de horas jogadas.
     3. Conta o número de partidas jogadas por modo de jogo e retorna um dicionário.
-    4. Adiciona a coluna 'info.date' ao DataFrame representando a data da criação
-        da partida.
-    5. Ordena o DataFrame com base na coluna 'info.gameCreation'.
+    4. Calcula a data de criação de cada partida.
+    5. Ordena as partidas com base na coluna 'gameCreation'.
 
     Retorna uma tupla com informações como total de horas jogadas,
     partidas por modo de jogo, máximo de partidas jogadas em um único dia,
@@ -585,45 +480,28 @@ def general_infos(df: pandas.DataFrame) -> dict:
     máximo de dias sem jogar entre partidas.
 
     Parâmetros:
-    - df (pandas.DataFrame): DataFrame contendo informações sobre as partidas
-        de League of Legends.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
     - dict: Dicionario contendo informações mencionadas acima.
     """
-
-    df_infos = df.copy()
-    df_infos["info.gameDurationSeconds"] = df_infos["info.gameDuration"]
-    df_infos.loc[
-        pandas.isnull(df_infos["info.gameEndTimestamp"]), "info.gameDurationSeconds"
-    ] = (
-        df_infos.loc[
-            pandas.isnull(df_infos["info.gameEndTimestamp"]), "info.gameDuration"
-        ]
-        / 1000
+    game_duration_seconds = df["gameDuration"].where(
+        pandas.notnull(df["gameEndTimestamp"]), df["gameDuration"] / 1000
     )
-    df_infos["info.gameDurationHours"] = df_infos["info.gameDurationSeconds"] / 60 / 60
-
-    hours_played = df_infos["info.gameDurationHours"].sum()
 
-    played_per_game_mode = df_infos["info.gameMode"].value_counts().to_dict()
+    hours_played = (game_duration_seconds / 60 / 60).sum()
 
-    df_infos["info.date"] = df_infos["info.gameCreation"].dt.date
+    played_per_game_mode = df["gameMode"].value_counts().to_dict()
 
-    df_infos.sort_values(by="info.gameCreation", inplace=True)
+    game_creation = df["gameCreation"].sort_values()
+    dates = game_creation.dt.date
 
-    max_matchs_in_one_day = df_infos.groupby(by="info.date").size().max()
+    max_matchs_in_one_day = dates.groupby(dates).size().max()
 
-    df_dates = pandas.DataFrame(df_infos["info.date"].unique(), columns=["date"])
-    df_dates["intervals"] = df_dates["date"].diff().dt.days
+    max_consecutive_days = get_max_consecutive_days(dates.unique())
 
-    max_consecutive_days = (
-        df_dates.groupby((df_dates["intervals"] != 1).cumsum())["intervals"]
-        .count()
-        .max()
-    )
-
-    max_days_without_playing = df_infos["info.gameCreation"].diff().dt.days.max()
+    max_days_without_playing = game_creation.diff().dt.days.max()
     max_days_without_playing = (
         int(max_days_without_playing)
         if max_days_without_playing
@@ -639,114 +517,94 @@ def general_infos(df: pandas.DataFrame) -> dict:
     }
 
 
-def get_itens_statistics(puuid: str, df: pandas.DataFrame) -> dict:
+def get_itens_statistics(df: pandas.DataFrame) -> dict:
     """
-    Calcula as estatísticas dos itens mais usados por modo de jogo para um jogador
-    específico.
+    Calcula o item mais usado por modo de jogo para o jogador.
 
-    A função utiliza a função auxiliar 'get_infos_participant_value_in_list_per_mode'
-    para obter a lista de itens utilizados por cada jogador em cada partida.
-    Os resultados são consolidados em um dicionário onde as chaves são os modos de
-    jogo e os valores são as listas de itens mais utilizados para cada modo.
-    Além disso, a função calcula o item mais utilizado (moda) para cada modo e
-    retorna um dicionário com essas informações.
+    Os itens de todas as partidas são empilhados em uma única série (ignorando
+    slots vazios) e o item mais frequente é calculado para cada modo de jogo e
+    para o total, desempatando pela primeira ocorrência.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
-    - dict: Um dicionário contendo as estatísticas dos itens mais usados por modo
-      de jogo, onde as chaves são os modos de jogo e os valores são as listas de
-      itens mais utilizados para cada modo. Cada valor também inclui uma chave
-      'TOTAL' que representa a lista total de itens utilizados para o modo
-      correspondente.
+    - dict: Um dicionário onde as chaves são os modos de jogo e os valores são os
+      itens mais utilizados em cada modo. Também inclui a chave 'TOTAL' com o
+      item mais utilizado considerando todos os modos.
     """
-    dict_list_itens = (
-        pandas.DataFrame(
-            df.apply(
-                lambda row: get_infos_parcipant_value_in_list_per_mode(
-                    puuid, row, itens_keys
-                ),
-                axis=1,
-            ).to_list(),
-            columns=["gameMode", "list_itens"],
-        )
-        .groupby(by="gameMode")
-        .sum()
-        .to_dict()
+    itens = (
+        df.set_index("gameMode")[itens_keys]
+        .stack()
+        .reset_index(level=1, drop=True)
+        .sort_index(kind="stable")
     )
-    for key in dict_list_itens.keys():
-        dict_list_itens[key]["TOTAL"] = list(chain(*dict_list_itens[key].values()))
-    dict_itens_most_used = {
-        key: mode(value)
-        for key, value in dict_list_itens["list_itens"].items()
-        if value
-    }
+    itens = itens[itens.fillna(0).astype(bool)]
+
+    if itens.empty:
+        return {}
+
+    dict_itens_most_used = itens.groupby(level=0).agg(get_most_frequent_value).to_dict()
+    dict_itens_most_used["TOTAL"] = get_most_frequent_value(itens)
     return dict_itens_most_used
 
 
-def get_infos_by_team(df: pandas.DataFrame, df_team: pandas.DataFrame) -> dict:
+def get_infos_by_team(
+    df_teams: pandas.DataFrame, team_played_index: pandas.Series
+) -> dict:
     """
-    Calcula estatísticas globais de objetivos por equipe em partidas de League
-    of Legends.
+    Calcula estatísticas globais de objetivos da equipe do jogador em partidas
+    de League of Legends.
 
-    A função utiliza a função auxiliar 'get_info_team_objectives' para obter a
-    quantidade total de kills associada a objetivos específicos de equipe para
-    todas as partidas no DataFrame 'df'. Os resultados são consolidados em um
-    dicionário onde as chaves são os objetivos de equipe e os valores são as
-    quantidades totais de kills para cada objetivo.
+    As equipes de cada partida são cruzadas com o índice matchId -> teamId do
+    jogador, mantendo apenas a equipe do jogador, e as kills de cada objetivo
+    de 'team_objectives_key' são somadas.
 
     Parâmetros:
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
-    - df_team (pandas.DataFrame): O DataFrame contendo informações sobre as
-      equipes que participaram das partidas de League of Legends.
+    - df_teams (pandas.DataFrame): O DataFrame de equipes gerado por
+      'extract_teams_frame'.
+    - team_played_index (pandas.Series): O índice matchId -> teamId gerado por
+      'get_team_played_index'.
 
     Retorna:
     - dict: Um dicionário contendo estatísticas globais de kills associadas a
       objetivos de equipe para todas as partidas, onde as chaves são os objetivos
       de equipe e os valores são as quantidades totais de kills para cada objetivo.
     """
-    return {
-        key: int(
-            df.apply(
-                lambda row: get_info_team_objectives(row, key, df_team), axis=1
-            ).sum()
-        )
-        for key in team_objectives_key
-    }
+    df_player_teams = df_teams[
+        df_teams["teamId"] == df_teams["matchId"].map(team_played_index)
+    ]
+    return {key: int(df_player_teams[key].sum()) for key in team_objectives_key}
 
 
 def get_players_same_team(
-    puuid: str, row: pandas.Series, df_team_played: pandas.DataFrame
-) -> list:
-    match_id = row.get("metadata.matchId")
-    participants = row.get("info.participants")
-    return [
-        participant.get("puuid")
-        for participant in participants
-        if (
-            participant.get("teamId")
-            == df_team_played.loc[df_team_played["matchId"] == match_id, "teamId"].iloc[
-                0
-            ]
-        )
-        and participant.get("puuid") != puuid
+    puuid: str, df_participants: pandas.DataFrame, team_played_index: pandas.Series
+) -> pandas.DataFrame:
+    """
+    Obtém os jogadores que estiveram na mesma equipe do jogador em cada partida.
+
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - df_participants (pandas.DataFrame): O DataFrame de participantes gerado por
+      'extract_match_frames'.
+    - team_played_index (pandas.Series): O índice matchId -> teamId gerado por
+      'get_team_played_index'.
+
+    Retorna:
+    - pandas.DataFrame: Um DataFrame com as colunas 'matchId' e 'puuid' dos
+      aliados do jogador em cada partida.
+    """
+    return df_participants.loc[
+        (df_participants["teamId"] == df_participants["matchId"].map(team_played_index))
+        & (df_participants["puuid"] != puuid),
+        ["matchId", "puuid"],
     ]
 
 
-def get_infos_other_players_frequency(
-    puuid: str, df: pandas.DataFrame, df_team_played: pandas.DataFrame
-):
+def get_infos_other_players_frequency(puuid: str, df_participants: pandas.DataFrame):
     most_commom_player = Counter(
-        filter(
-            lambda x: x != puuid,
-            chain(
-                *df.apply(lambda row: row.get("metadata.participants"), axis=1).tolist()
-            ),
-        )
+        df_participants.loc[df_participants["puuid"] != puuid, "puuid"]
     ).most_common(5)
 
     return {
@@ -754,44 +612,13 @@ def get_infos_other_players_frequency(
     }
 
 
-def get_player_role_win_info(puuid: str, row: pandas.Series):
-    """
-    Obtém informações sobre a vitória e posição de um jogador em uma partida de
-    League of Legends.
-
-    Para o jogador identificado pelo PUUID fornecido, a função procura na série de
-    dados da partida por informações correspondentes à vitória e posição do
-    participante. Retorna uma tupla contendo as informações de vitória e posição.
-
-    Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - row (pandas.Series): Uma linha do DataFrame contendo informações sobre a
-      partida de League of Legends.
-
-    Retorna:
-    - tuple: Uma tupla contendo informações sobre a vitória e posição do jogador
-      na partida, ou (None, None) se o jogador não for encontrado na partida.
-    """
-    participants = row.get("info.participants", [])
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            return (participant.get("win", None), participant.get("teamPosition", None))
-
-
-def get_player_info_per_role(puuid: str, df: pandas.DataFrame) -> dict:
+def get_player_info_per_role(df: pandas.DataFrame) -> dict:
     """
-    Calcula estatísticas por posição de um jogador em partidas de League of Legends.
-
-    A função utiliza a função auxiliar 'get_player_role_win_info' para obter informações
-    sobre a vitória e posição de um jogador em cada partida. Os resultados são
-    consolidados em um dicionário onde as chaves são as posições e os valores são
-    dicionários contendo a quantidade de partidas jogadas e a taxa de vitória para
-    cada posição.
+    Calcula estatísticas por posição do jogador em partidas de League of Legends.
 
     Parâmetros:
-    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
-    - df (pandas.DataFrame): O DataFrame contendo informações sobre as partidas
-      de League of Legends.
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
 
     Retorna:
     - dict: Um dicionário contendo estatísticas por posição de um jogador em
@@ -799,44 +626,51 @@ def get_player_info_per_role(puuid: str, df: pandas.DataFrame) -> dict:
       dicionários contendo a quantidade de partidas jogadas e a taxa de vitória
       para cada posição.
     """
-    df_roles = pandas.DataFrame(
-        df.apply(lambda row: get_player_role_win_info(puuid, row), axis=1).to_list(),
-        columns=["win", "role"],
-    )
-
-    df_roles = df_roles[df_roles["role"] != ""].reset_index(drop=True)
+    df_roles = df.loc[df["teamPosition"] != "", ["win", "teamPosition"]]
+    df_roles_grouped = df_roles.groupby("teamPosition")["win"]
     return {
-        "amount_matchs": {**df_roles.groupby("role")["win"].count().to_dict()},
-        "win_rate": {**(df_roles.groupby("role")["win"].mean() * 100).to_dict()},
+        "amount_matchs": {**df_roles_grouped.count().to_dict()},
+        "win_rate": {**(df_roles_grouped.mean() * 100).to_dict()},
     }
 
 
 def get_other_stats(
-    puuid,
     df: pandas.DataFrame,
-    calculation_function: str,
-    keys: list[str] = player_infos_keys,
+    aggregations: dict[str, list[str]] = other_stats_aggregations,
 ) -> dict:
-    other_statistics = {}
-    for key in keys:
-        other_statistics.update(
-            add_total_in_dict(
-                pandas.DataFrame(
-                    df.apply(
-                        lambda row: get_info_participant_value_per_mode(
-                            puuid, row, key
-                        ),
-                        axis=1,
-                    ).to_list(),
-                    columns=["gameMode", key],
-                )
-                .groupby(by="gameMode")
-                .agg(calculation_function)
-                .to_dict()
-            )
-        )
+    """
+    Calcula, em uma única agregação agrupada por modo de jogo, todas as
+    estatísticas declaradas em 'aggregations'.
+
+    As colunas que aparecem em mais de uma agregação são calculadas na mesma
+    passagem (e.g., 'killingSprees' para 'sum', 'mean' e 'max').
 
-    return other_statistics
+    Parâmetros:
+    - df (pandas.DataFrame): O DataFrame do jogador gerado por
+      'extract_match_frames'.
+    - aggregations (dict): Um dicionário onde as chaves são as funções de
+      agregação do pandas (e.g., 'sum', 'mean', 'max') e os valores são as
+      listas de colunas a serem agregadas com cada função.
+
+    Retorna:
+    - dict: Um dicionário onde as chaves são as funções de agregação e os
+      valores são dicionários no formato {coluna: {modo de jogo: valor}}. Cada
+      subdicionário também inclui a chave 'TOTAL' com a soma dos valores de
+      todos os modos.
+    """
+    columns_aggregations = {}
+    for calculation_function, keys in aggregations.items():
+        for key in keys:
+            columns_aggregations.setdefault(key, []).append(calculation_function)
+
+    df_aggregated = df.groupby(by="gameMode").agg(columns_aggregations)
+
+    return {
+        calculation_function: add_total_in_dict(
+            {key: df_aggregated[(key, calculation_function)].to_dict() for key in keys}
+        )
+        for calculation_function, keys in aggregations.items()
+    }
 
 
 def get_gold_wasted(dict_gold_earned: dict, dict_gold_spent: dict) -> dict:
@@ -846,221 +680,394 @@ def get_gold_wasted(dict_gold_earned: dict, dict_gold_spent: dict) -> dict:
     }
 
 
-def get_other_mean(puuid: str, df: pandas.DataFrame) -> dict:
-    other_status = get_other_stats(puuid, df, "mean")
+def get_other_mean(other_stats: dict) -> dict:
+    other_status = other_stats["mean"]
     other_status["goldWasted"] = get_gold_wasted(
         other_status["goldEarned"], other_status["goldSpent"]
     )
 
-    other_status = format_float_number(other_status)
+    other_status = to_serializable(other_status, digits=2)
 
     return other_status
 
 
-def get_other_total(puuid: str, df: pandas.DataFrame) -> dict:
-    other_status = get_other_stats(puuid, df, "sum")
+def get_other_total(other_stats: dict) -> dict:
+    other_status = other_stats["sum"]
     other_status["goldWasted"] = get_gold_wasted(
         other_status["goldEarned"], other_status["goldSpent"]
     )
     return other_status
 
 
-def get_other_max(puuid: str, df: pandas.DataFrame) -> dict:
-    return get_other_stats(puuid, df, "max", player_max_infos_keys)
+def get_other_max(other_stats: dict) -> dict:
+    return other_stats["max"]
 
 
-def get_team_bans(puuid: str, row: pandas.Series) -> list:
-    participants = row.get("info.participants", [])
-    teams = row.get("info.teams")
-    for participant in participants:
-        if participant.get("puuid") == puuid:
-            team_id = participant.get("teamId")
-            for team in teams:
-                if team.get("teamId") == team_id:
-                    return [ban.get("championId") for ban in team.get("bans", [])]
-    return []
+def get_top_5_banned_champ_in_team(df: pandas.DataFrame) -> dict:
+    return {
+        str(key): value
+        for key, value in Counter(chain.from_iterable(df["bans"])).most_common(5)
+    }
 
 
-def get_top_5_banned_champ_in_team(puuid: str, df: pandas.DataFrame) -> dict:
-    df_bans = pandas.DataFrame(
-        df.apply(lambda row: get_team_bans(puuid, row), axis=1),
-        columns=["list_bans"],
+def get_challenges_per_mode(df: pandas.DataFrame):
+    challenges_columns = {f"challenges.{key}": key for key in player_challenges_keys}
+    return (
+        df.groupby(by="gameMode")[list(challenges_columns)]
+        .sum()
+        .rename(columns=challenges_columns)
+        .to_dict()
     )
 
+
+def get_most_commom_build_with_win_champ(
+    df: pandas.DataFrame, most_played_champions: dict
+):
+    df_win = df[
+        df["win"].fillna(False).astype(bool)
+        & (df["championId"] == df["gameMode"].map(most_played_champions))
+    ]
+    builds = pandas.Series(
+        [
+            tuple(sorted({item for item in itens if item}))
+            for itens in df_win[itens_keys].to_numpy().tolist()
+        ],
+        index=df_win["gameMode"],
+        dtype=object,
+    )
     return {
-        str(key): value
-        for key, value in Counter(
-            chain(
-                *df_bans[~df_bans["list_bans"].apply(lambda x: len(x) == 0)][
-                    "list_bans"
-                ].to_list()
-            )
-        ).most_common(5)
+        game_mode: list(build)
+        for game_mode, build in builds.groupby(level=0)
+        .agg(lambda x: x.mode().iloc[0])
+        .items()
     }
 
 
-def get_challenges_per_mode(puuid: str, df: pandas.DataFrame):
-    dict_challenges = df.apply(
-        lambda row: get_info_player_challengers_per_game_mode(
-            puuid, row, player_challenges_keys
-        ),
-        axis=1,
+def get_player_cosmetics(df: pandas.DataFrame) -> dict:
+    return (
+        df.loc[
+            df["gameEndTimestamp"] == df["gameEndTimestamp"].max(),
+            ["profileIcon", "summonerLevel"],
+        ]
+        .iloc[0]
+        .to_dict()
     )
 
-    df_result = pandas.DataFrame(
-        dict_challenges.to_list(), columns=["gameMode", "valores"]
-    )
-    df_result = (
-        pandas.concat([df_result, pandas.json_normalize(df_result["valores"])], axis=1)
-        .drop("valores", axis=1)
-        .groupby(by="gameMode")
-        .sum()
+
+# Seções da rewind: nome -> (função, nomes dos argumentos). Um argumento com o
+# nome de outra seção recebe o resultado dela e cria uma dependência.
+rewind_sections = {
+    "challenges": (get_challenges_per_mode, ["df_player"]),
+    "kda_infos": (get_player_kda_per_mode, ["df_player"]),
+    "side_infos": (game_by_side_per_mode, ["df_player"]),
+    "multi_kills_infos": (get_multi_kills_per_mode, ["df_player"]),
+    "first_blood_infos": (get_first_blood_amount_per_mode, ["df_player"]),
+    "itens_statistics": (get_itens_statistics, ["df_player"]),
+    "team_statistics": (get_infos_by_team, ["df_teams", "team_played_index"]),
+    "other_stats": (get_other_stats, ["df_player"]),
+    "general_infos": (general_infos, ["df_player"]),
+    "other_infos_players": (
+        get_infos_other_players_frequency,
+        ["puuid", "df_participants"],
+    ),
+    "player_role_win_info": (get_player_info_per_role, ["df_player"]),
+    "most_played_champ": (get_infos_player_champion_per_mode, ["df_player"]),
+    "top_5_team_bans": (get_top_5_banned_champ_in_team, ["df_player"]),
+    "build_most_win_rate_with_champ": (
+        get_most_commom_build_with_win_champ,
+        ["df_player", "most_played_champ"],
+    ),
+    "player_cosmetics": (get_player_cosmetics, ["df_player"]),
+}
+
+_rewind_section_inputs = {}
+
+
+def _set_rewind_section_inputs(inputs: dict) -> None:
+    global _rewind_section_inputs
+    _rewind_section_inputs = inputs
+
+
+def run_rewind_section(name: str, arguments: dict) -> tuple:
+    """
+    Executa uma seção da rewind e mede o tempo de execução.
+
+    Os argumentos não encontrados em 'arguments' são buscados nas entradas
+    compartilhadas do processo, definidas na criação do pool de processos.
+
+    Parâmetros:
+    - name (str): O nome da seção em 'rewind_sections'.
+    - arguments (dict): Os valores disponíveis para os argumentos da seção.
+
+    Retorna:
+    - tuple: Uma tupla contendo o resultado da seção e o tempo de execução em
+      segundos.
+    """
+    function, argument_names = rewind_sections[name]
+    start = time.perf_counter()
+    result = function(
+        *[
+            (
+                arguments[argument]
+                if argument in arguments
+                else _rewind_section_inputs[argument]
+            )
+            for argument in argument_names
+        ]
     )
+    return result, time.perf_counter() - start
 
-    return df_result.to_dict()
 
+def run_rewind_sections(
+    inputs: dict,
+    execution_mode: str = REWIND_EXECUTION_MODE,
+    max_workers: int = REWIND_MAX_WORKERS,
+    timings: dict = None,
+) -> dict:
+    """
+    Executa todas as seções de 'rewind_sections', respeitando as dependências
+    entre elas.
+
+    Modos de execução:
+    - 'serial': executa as seções em sequência no processo atual.
+    - 'thread': executa as seções em um pool de threads, compartilhando os
+      DataFrames de 'inputs' sem cópia.
+    - 'process': executa as seções em um pool de processos criado com 'fork',
+      de forma que os DataFrames de 'inputs' são herdados pelos processos sem
+      serialização. Não pode ser usado dentro de processos daemon (e.g.,
+      workers prefork do Celery).
 
-def get_builds_in_win_with_champ_per_mode(
-    puuid: str, row: pandas.Series, champion_id: dict
-):
-    participants = row.get("info.participants", [])
-    game_mode = row.get("info.gameMode")
-    for participant in participants:
-        if (
-            participant.get("puuid") == puuid
-            and participant.get("win")
-            and participant.get("championId") == champion_id.get(game_mode, None)
-        ):
-            return (
-                game_mode,
-                champion_id.get(game_mode, None),
-                sorted(
-                    {
-                        participant.get(item)
-                        for item in itens_keys
-                        if participant.get(item)
-                    }
-                ),
+    Parâmetros:
+    - inputs (dict): As entradas das seções (e.g., 'puuid', 'df_player').
+    - execution_mode (str): O modo de execução ('serial', 'thread' ou 'process').
+    - max_workers (int): A quantidade máxima de threads ou processos.
+    - timings (dict, opcional): Dicionário preenchido com o tempo de execução,
+      em segundos, de cada seção.
+
+    Retorna:
+    - dict: Um dicionário com o resultado de cada seção.
+    """
+    if timings is None:
+        timings = {}
+    results = {}
+
+    if execution_mode == "serial":
+        for name in rewind_sections:
+            results[name], timings[name] = run_rewind_section(
+                name, {**inputs, **results}
             )
-    return []
+        return results
+
+    if execution_mode == "thread":
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    elif execution_mode == "process":
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_context("fork"),
+            initializer=_set_rewind_section_inputs,
+            initargs=(inputs,),
+        )
+    else:
+        raise ValueError(f"Modo de execução inválido: {execution_mode}")
+
+    pending = dict(rewind_sections)
+    running = {}
+    with executor:
+        while pending or running:
+            for name, (_, argument_names) in list(pending.items()):
+                dependencies = [
+                    argument
+                    for argument in argument_names
+                    if argument in rewind_sections
+                ]
+                if not all(dependency in results for dependency in dependencies):
+                    continue
+                if execution_mode == "thread":
+                    arguments = {**inputs, **results}
+                else:
+                    arguments = {
+                        dependency: results[dependency] for dependency in dependencies
+                    }
+                running[executor.submit(run_rewind_section, name, arguments)] = name
+                del pending[name]
 
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], timings[name] = future.result()
 
-def get_most_commom_build_with_win_champ(
-    puuid: str, df: pandas.DataFrame, most_played_champions: dict
-):
-    return (
-        pandas.DataFrame(
-            filter(
-                lambda x: x,
-                df.apply(
-                    lambda row: get_builds_in_win_with_champ_per_mode(
-                        puuid, row, most_played_champions
-                    ),
-                    axis=1,
-                ).to_list(),
-            ),
-            columns=["gameMode", "championId", "build"],
+    return results
+
+
+def normalize_matchs(list_matchs: list[dict]) -> pandas.DataFrame:
+    """
+    Normaliza os documentos retornados por 'find_matches_by_puuid' em um
+    DataFrame com uma linha por partida.
+
+    Parâmetros:
+    - list_matchs (list): Lista de documentos das partidas.
+
+    Retorna:
+    - pandas.DataFrame: O DataFrame normalizado das partidas.
+    """
+    return pandas.json_normalize(list_matchs)
+
+
+def get_rewind_section_inputs(
+    puuid: str, list_matchs: list[dict], profiler: Profiler = None
+) -> dict:
+    """
+    Monta as entradas compartilhadas pelas seções de 'rewind_sections' a partir
+    dos documentos das partidas do jogador.
+
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - list_matchs (list): Lista de documentos das partidas.
+    - profiler (Profiler, opcional): Coletor dos tempos das fases 'normalize' e
+      'extract_frames'.
+
+    Retorna:
+    - dict: Um dicionário com o puuid e os DataFrames usados pelas seções.
+    """
+    profiler = profiler or Profiler()
+
+    with profiler.phase("normalize"):
+        normalized_matchs_data_frame = normalize_matchs(list_matchs)
+
+    with profiler.phase("extract_frames"):
+        df_player, df_participants = extract_match_frames(
+            puuid, normalized_matchs_data_frame, with_participants=True
         )
-        .groupby("gameMode")
-        .apply(lambda x: x["build"].mode().iloc[0])
-        .to_dict()
-    )
+        df_teams = extract_teams_frame(normalized_matchs_data_frame)
+        team_played_index = get_team_played_index(df_player)
 
+    return {
+        "puuid": puuid,
+        "df_player": df_player,
+        "df_participants": df_participants,
+        "df_teams": df_teams,
+        "team_played_index": team_played_index,
+    }
 
-def get_level_icon(puuid: str, row: pandas.Series) -> dict:
-    profile_icon = get_info_participant_value(puuid, row, "profileIcon")
-    player_level = get_info_participant_value(puuid, row, "summonerLevel")
-    return {"profileIcon": profile_icon, "summonerLevel": player_level}
 
+def create_rewind(
+    puuid: str,
+    timestamp_statistic: int = None,
+    execution_mode: str = REWIND_EXECUTION_MODE,
+    max_workers: int = REWIND_MAX_WORKERS,
+    timings: dict = None,
+    profiler: Profiler = None,
+):
+    profiler = profiler or Profiler()
 
-def create_rewind(puuid: str, timestamp_statistic: int = None):
-    list_matchs = find_matches_by_puuid(puuid, timestamp_statistic)
-    matchs_data_frame = pandas.DataFrame(list_matchs)
-    normalized_matchs_data_frame = pandas.json_normalize(
-        matchs_data_frame["first_document"]
-    )
-    normalized_matchs_data_frame[timestamp_columns] = (
-        normalized_matchs_data_frame[timestamp_columns]
-        .apply(lambda x: pandas.to_datetime(x, unit="ms"))
-        .sort_values(by="info.gameCreation")
-    )
-    normalized_matchs_data_frame.reset_index(drop=True, inplace=True)
-
-    df_team_played = pandas.DataFrame(
-        normalized_matchs_data_frame.apply(
-            lambda row: get_info_team_id_and_match_id_from_player(puuid, row, "teamId"),
-            axis=1,
-        ).to_list(),
-        columns=["matchId", "teamId"],
+    with profiler.phase("fetch"):
+        list_matchs = find_matches_by_puuid(puuid, timestamp_statistic)
+
+    return create_rewind_from_matchs(
+        puuid, list_matchs, execution_mode, max_workers, timings, profiler
     )
 
-    challenges = get_challenges_per_mode(puuid, normalized_matchs_data_frame)
 
-    dict_kda = get_player_kda_per_mode(puuid, normalized_matchs_data_frame)
-    dict_side = game_by_side_per_mode(puuid, normalized_matchs_data_frame)
-    dict_multi_kills = get_multi_kills_per_mode(puuid, normalized_matchs_data_frame)
-    dict_first_blood = get_first_blood_amount_per_mode(
-        puuid, normalized_matchs_data_frame
-    )
+def create_rewind_from_matchs(
+    puuid: str,
+    list_matchs: list[dict],
+    execution_mode: str = REWIND_EXECUTION_MODE,
+    max_workers: int = REWIND_MAX_WORKERS,
+    timings: dict = None,
+    profiler: Profiler = None,
+) -> dict:
+    """
+    Gera a rewind do jogador a partir de documentos de partidas já carregados.
 
-    itens_statistics = get_itens_statistics(puuid, normalized_matchs_data_frame)
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - list_matchs (list): Lista de documentos das partidas, no formato retornado
+      por 'find_matches_by_puuid'.
+    - execution_mode (str): O modo de execução das seções.
+    - max_workers (int): A quantidade máxima de threads ou processos.
+    - timings (dict, opcional): Dicionário preenchido com o tempo de execução
+      de cada seção.
+    - profiler (Profiler, opcional): Coletor dos tempos de cada fase, com as
+      seções registradas como 'section.<nome>'.
 
-    team_statistics = get_infos_by_team(normalized_matchs_data_frame, df_team_played)
+    Retorna:
+    - dict: O dicionário da rewind.
+    """
+    profiler = profiler or Profiler()
+    profiler.count("matchs", len(list_matchs))
 
-    other_totals = get_other_total(puuid, normalized_matchs_data_frame)
-    other_means = get_other_mean(puuid, normalized_matchs_data_frame)
+    inputs = get_rewind_section_inputs(puuid, list_matchs, profiler)
 
-    other_values = merge_other_values(other_totals, other_means)
+    if timings is None:
+        timings = {}
+    with profiler.phase("sections"):
+        sections = run_rewind_sections(inputs, execution_mode, max_workers, timings)
+    profiler.record_many(timings, "section.")
 
-    other_max = get_other_max(puuid, normalized_matchs_data_frame)
+    with profiler.phase("serialize"):
+        return serialize_rewind_sections(sections)
 
-    infos = general_infos(normalized_matchs_data_frame)
 
-    other_infos_players = get_infos_other_players_frequency(
-        puuid, normalized_matchs_data_frame, df_team_played
-    )
-    dict_player_role_win_info = get_player_info_per_role(
-        puuid, normalized_matchs_data_frame
-    )
+def serialize_rewind_sections(sections: dict) -> dict:
+    """
+    Monta o dicionário serializável da rewind a partir dos resultados de
+    'run_rewind_sections'.
 
-    most_played_champ = get_infos_player_champion_per_mode(
-        puuid, normalized_matchs_data_frame
-    )
+    Parâmetros:
+    - sections (dict): O resultado de cada seção da rewind.
 
-    dict_top_5_team_bans = get_top_5_banned_champ_in_team(
-        puuid, normalized_matchs_data_frame
-    )
+    Retorna:
+    - dict: O dicionário da rewind.
+    """
+    other_stats = sections["other_stats"]
 
-    dict_build_most_win_rate_with_champ = get_most_commom_build_with_win_champ(
-        puuid, normalized_matchs_data_frame, most_played_champ
-    )
+    other_totals = get_other_total(other_stats)
+    other_means = get_other_mean(other_stats)
 
-    player_cosmetics = (
-        normalized_matchs_data_frame[
-            normalized_matchs_data_frame["info.gameEndTimestamp"]
-            == normalized_matchs_data_frame["info.gameEndTimestamp"].max()
-        ]
-        .apply(lambda row: get_level_icon(puuid, row), axis=1)
-        .iloc[0]
-    )
+    other_values = merge_other_values(other_totals, other_means)
+
+    other_max = get_other_max(other_stats)
 
     result_dict = {
-        "kda_infos": transpose_dict(dict_kda),
-        "side_infos": transpose_dict(dict_side),
-        "multi_kills_infos": transpose_dict(dict_multi_kills),
-        "first_blood_infos": dict_first_blood,
-        "general_infos": infos,
-        "itens_statistics": itens_statistics,
-        "team_statistics": team_statistics,
-        "challenges": challenges,
+        "kda_infos": transpose_dict(sections["kda_infos"]),
+        "side_infos": transpose_dict(sections["side_infos"]),
+        "multi_kills_infos": transpose_dict(sections["multi_kills_infos"]),
+        "first_blood_infos": sections["first_blood_infos"],
+        "general_infos": sections["general_infos"],
+        "itens_statistics": sections["itens_statistics"],
+        "team_statistics": sections["team_statistics"],
+        "challenges": sections["challenges"],
         "other_values": other_values,
         "other_maxs": other_max,
-        "other_infos_players": other_infos_players,
-        "player_role_win_info": format_float_number(dict_player_role_win_info),
-        "most_played_champ": most_played_champ,
-        "top_5_team_bans": dict_top_5_team_bans,
-        "build_most_win_rate_with_champ": dict_build_most_win_rate_with_champ,
-        "player_cosmetics": player_cosmetics,
+        "other_infos_players": sections["other_infos_players"],
+        "player_role_win_info": sections["player_role_win_info"],
+        "most_played_champ": sections["most_played_champ"],
+        "top_5_team_bans": sections["top_5_team_bans"],
+        "build_most_win_rate_with_champ": sections["build_most_win_rate_with_champ"],
+        "player_cosmetics": sections["player_cosmetics"],
     }
 
-    return convert_to_serializable(result_dict)
+    return to_serializable(result_dict, rounding=rewind_rounding)
+
+
+def create_rewind_cached(puuid: str, timestamp_statistic: int = None) -> dict:
+    """
+    Retorna a rewind do jogador a partir do cache, gerando-a com 'create_rewind'
+    apenas quando o conjunto de partidas do jogador mudou ou a rewind expirou.
+
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - timestamp_statistic (int, opcional): Carimbo de tempo inicial das partidas
+      consideradas na rewind.
+
+    Retorna:
+    - dict: O dicionário da rewind.
+    """
+    fingerprint = find_matches_fingerprint_by_puuid(puuid, timestamp_statistic)
+
+    rewind = rewind_cache.get(puuid, timestamp_statistic, fingerprint)
+    if rewind is None:
+        rewind = create_rewind(puuid, timestamp_statistic)
+        rewind_cache.set(puuid, timestamp_statistic, fingerprint, rewind)
+
+    return rewind
@@ -0,0 +1,163 @@
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import contextmanager
+
+REWIND_PROFILE = os.environ.get("REWIND_PROFILE", "")
+REWIND_PROFILE_TOP = int(os.environ.get("REWIND_PROFILE_TOP", 15))
+
+
+class Profiler:
+    def __init__(
+        self,
+        cprofile: bool = False,
+        memory: bool = False,
+        hooks: list[Callable[[str, float], None]] = None,
+        top: int = REWIND_PROFILE_TOP,
+    ) -> None:
+        """
+        Inicializa um coletor de tempos e contadores por fase.
+
+        Args:
+            cprofile (bool): Ativa a captura com o cProfile entre 'start' e \
+            'stop'.
+            memory (bool): Ativa a captura do pico de memória e das maiores \
+            alocações com o tracemalloc entre 'start' e 'stop'.
+            hooks (list, opcional): Funções chamadas com o nome e a duração \
+            (em segundos) de cada fase ao seu término (e.g., para exportar \
+            métricas).
+            top (int): Quantidade de funções e alocações mantidas no resumo.
+        """
+        self.cprofile = cprofile
+        self.memory = memory
+        self.hooks = hooks or []
+        self.top = top
+        self.phases = {}
+        self.counters = {}
+        self._profile = None
+        self._profile_stats = None
+        self._memory_stats = None
+
+    @classmethod
+    def from_flags(cls, flags: str = REWIND_PROFILE, **kwargs) -> "Profiler":
+        """
+        Cria um Profiler a partir de flags separadas por vírgula ('cprofile',
+        'tracemalloc'), como na variável de ambiente REWIND_PROFILE.
+        """
+        flags = {flag.strip() for flag in flags.split(",")}
+        return cls(
+            cprofile="cprofile" in flags, memory="tracemalloc" in flags, **kwargs
+        )
+
+    def add_hook(self, hook: Callable[[str, float], None]) -> None:
+        self.hooks.append(hook)
+
+    def record(self, name: str, elapsed: float) -> None:
+        """
+        Acumula a duração de uma fase e notifica os hooks.
+
+        Args:
+            name (str): O nome da fase.
+            elapsed (float): A duração da fase em segundos.
+        """
+        self.phases[name] = self.phases.get(name, 0) + elapsed
+        for hook in self.hooks:
+            hook(name, elapsed)
+
+    def record_many(self, timings: dict, prefix: str = "") -> None:
+        for name, elapsed in timings.items():
+            self.record(f"{prefix}{name}", elapsed)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Mede a duração do bloco como uma fase, acumulando as execuções repetidas
+        da mesma fase (e.g., um lote de partidas por execução).
+        """
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def start(self) -> None:
+        if self.memory:
+            tracemalloc.start()
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+            stats = pstats.Stats(self._profile).stats.items()
+            slowest = sorted(stats, key=lambda item: item[1][3], reverse=True)
+            self._profile_stats = [
+                {
+                    "function": f"{filename}:{line}({function})",
+                    "calls": calls,
+                    "total_time": round(total_time, 4),
+                    "cumulative_time": round(cumulative_time, 4),
+                }
+                for (filename, line, function), (
+                    _,
+                    calls,
+                    total_time,
+                    cumulative_time,
+                    _,
+                ) in slowest[: self.top]
+            ]
+            self._profile = None
+
+        if tracemalloc.is_tracing() and self.memory:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self._memory_stats = {
+                "peak_memory": peak_memory,
+                "top_allocations": [
+                    {
+                        "line": str(stat.traceback),
+                        "size": stat.size,
+                        "count": stat.count,
+                    }
+                    for stat in snapshot.statistics("lineno")[: self.top]
+                ],
+            }
+
+    @contextmanager
+    def capture(self):
+        """
+        Ativa as capturas configuradas (cProfile e tracemalloc) durante o bloco.
+        """
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def summary(self) -> dict:
+        """
+        Monta um resumo compacto e serializável em JSON das fases, contadores e
+        capturas, com os tempos em milissegundos.
+
+        Returns:
+            dict: O resumo do Profiler.
+        """
+        summary = {
+            "phases_ms": {
+                name: round(elapsed * 1000, 2) for name, elapsed in self.phases.items()
+            },
+            "counters": dict(self.counters),
+        }
+        if self._profile_stats is not None:
+            summary["cprofile"] = self._profile_stats
+        if self._memory_stats is not None:
+            summary["tracemalloc"] = self._memory_stats
+        return summary
@@ -1,5 +1,118 @@
+import asyncio
+import os
 import time
+import uuid
 from collections import deque
+from threading import Lock
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+REDIS_HOST = os.environ.get("CELERY_HOST", "localhost")
+REDIS_PORT = os.environ.get("CELERY_PORT", 6379)
+RATE_LIMIT_REDIS_URL = os.environ.get(
+    "RATE_LIMIT_REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/2"
+)
+
+RATE_LIMIT_PREFIX = "rate_limit"
+
+# Reserva atomicamente o próximo horário permitido por todas as janelas de todos
+# os buckets informados (e.g., o bucket da aplicação e o do método na região).
+# Cada bucket é um sorted set com os horários reservados como score, e o
+# horário usado é o relógio do Redis, comum a todos os workers.
+#
+# KEYS: pares (bucket, chave da pausa do bucket).
+# ARGV: o membro único da reserva seguido, para cada bucket, da quantidade de
+# janelas e dos pares (limite, intervalo em segundos) de cada janela.
+RESERVE_SCRIPT = """
+local now_parts = redis.call("TIME")
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local request_time = now
+local max_intervals = {}
+local index = 2
+
+for i = 1, #KEYS, 2 do
+    local key = KEYS[i]
+    local windows = tonumber(ARGV[index])
+    local max_interval = 0
+    index = index + 1
+    for _ = 1, windows do
+        local limit = tonumber(ARGV[index])
+        local interval = tonumber(ARGV[index + 1])
+        index = index + 2
+        local entry = redis.call("ZREVRANGE", key, limit - 1, limit - 1, "WITHSCORES")
+        if entry[2] then
+            request_time = math.max(request_time, tonumber(entry[2]) + interval)
+        end
+        max_interval = math.max(max_interval, interval)
+    end
+    max_intervals[i] = max_interval
+
+    local paused_until = redis.call("GET", KEYS[i + 1])
+    if paused_until then
+        request_time = math.max(request_time, tonumber(paused_until))
+    end
+end
+
+for i = 1, #KEYS, 2 do
+    local key = KEYS[i]
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", now - max_intervals[i])
+    redis.call("ZADD", key, request_time, ARGV[1])
+    redis.call(
+        "PEXPIRE", key, math.ceil((request_time - now + max_intervals[i]) * 1000)
+    )
+end
+
+return tostring(request_time - now)
+"""
+
+# Sincroniza os buckets com as contagens informadas pela Riot, completando com
+# reservas no horário atual as requisições que não foram registradas (e.g.,
+# feitas por outra aplicação com a mesma chave), e registra o 'Retry-After'.
+#
+# KEYS: pares (bucket, chave da pausa do bucket).
+# ARGV: o prefixo dos membros seguido, para cada bucket, da pausa (em segundos,
+# 0 para nenhuma), da quantidade de janelas e dos pares (contagem, intervalo em
+# segundos) de cada janela.
+SYNC_SCRIPT = """
+local now_parts = redis.call("TIME")
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local index = 2
+
+for i = 1, #KEYS, 2 do
+    local key = KEYS[i]
+    local pause = tonumber(ARGV[index])
+    local windows = tonumber(ARGV[index + 1])
+    local max_interval = 0
+    index = index + 2
+    for _ = 1, windows do
+        local count = tonumber(ARGV[index])
+        local interval = tonumber(ARGV[index + 1])
+        index = index + 2
+        local missing = count - redis.call("ZCOUNT", key, "(" .. (now - interval), "+inf")
+        for n = 1, missing do
+            redis.call("ZADD", key, now, ARGV[1] .. ":" .. i .. ":" .. interval .. ":" .. n)
+        end
+        max_interval = math.max(max_interval, interval)
+    end
+
+    local ttl = math.ceil(max_interval * 1000)
+    if ttl > 0 and redis.call("PTTL", key) < ttl then
+        redis.call("PEXPIRE", key, ttl)
+    end
+
+    if pause > 0 then
+        local paused_until = tonumber(redis.call("GET", KEYS[i + 1]) or 0)
+        if now + pause > paused_until then
+            redis.call(
+                "SET", KEYS[i + 1], tostring(now + pause), "PX", math.ceil(pause * 1000)
+            )
+        end
+    end
+end
+
+return 1
+"""
 
 
 class RateLimiter:
@@ -21,27 +134,245 @@ class RateLimiter:
             upper_interval (int): Intervalo de tempo mínimo entre requisições \
             (em segundos) dentro do limite superior.
         """
-        self.lower_limit = lower_limit
-        self.upper_limit = upper_limit
-        self.lower_interval = lower_interval
-        self.upper_interval = upper_interval
-        self.timestamps = deque(maxlen=upper_limit)
+        self.limits = [(lower_limit, lower_interval), (upper_limit, upper_interval)]
+        self.timestamps = deque(maxlen=max(lower_limit, upper_limit))
+        self.paused_until = 0
+        self._lock = Lock()
+
+    @classmethod
+    def from_limits(cls, limits: list[tuple[int, int]]) -> "RateLimiter":
+        """
+        Cria um RateLimiter a partir de uma lista de pares (limite, intervalo em
+        segundos), com qualquer quantidade de janelas.
+        """
+        limit, interval = limits[0]
+        rate_limiter = cls(limit, limit, interval, interval)
+        rate_limiter._set_limits(limits)
+        return rate_limiter
+
+    def _set_limits(self, limits: list[tuple[int, int]]) -> None:
+        self.limits = list(limits)
+        self.timestamps = deque(
+            self.timestamps, maxlen=max(limit for limit, _ in self.limits)
+        )
 
-    def make_request(self):
+    def reserve(self, region: str = None, method: str = None) -> float:
+        """
+        Reserva o próximo horário permitido por todos os limites para uma
+        requisição, sem pausar a execução.
+
+        Args:
+            region (str, opcional): Ignorado, todas as requisições do processo \
+            compartilham o mesmo bucket. Mantido para ter a mesma interface do \
+            'RedisRateLimiter'.
+            method (str, opcional): Ignorado, como 'region'.
+
+        Returns:
+            float: O tempo (em segundos) que deve ser aguardado antes de fazer \
+            a requisição.
+        """
+        with self._lock:
+            current_time = time.time()
+            request_time = max(current_time, self.paused_until)
+
+            for limit, interval in self.limits:
+                if len(self.timestamps) >= limit:
+                    request_time = max(request_time, self.timestamps[-limit] + interval)
+
+            self.timestamps.append(request_time)
+
+        return request_time - current_time
+
+    def update_limits(
+        self, region: str = None, method: str = None, rate_limits: dict = None
+    ) -> None:
+        """
+        Ajusta o limitador com os limites e as contagens informados pela Riot.
+
+        Como todas as requisições compartilham o mesmo bucket, apenas os limites
+        da aplicação são adotados, e o 'Retry-After' pausa todas as requisições.
+
+        Args:
+            region (str, opcional): Ignorado, como em 'reserve'.
+            method (str, opcional): Ignorado, como em 'reserve'.
+            rate_limits (dict): Os limites extraídos dos cabeçalhos da resposta.
+        """
+        if not rate_limits:
+            return
+
+        with self._lock:
+            current_time = time.time()
+
+            if rate_limits.get("app_limits"):
+                self._set_limits(rate_limits["app_limits"])
+
+            missing = 0
+            for count, interval in rate_limits.get("app_counts") or []:
+                sent = sum(
+                    timestamp > current_time - interval for timestamp in self.timestamps
+                )
+                missing = max(missing, count - sent)
+
+            if missing > 0:
+                self.timestamps = deque(
+                    sorted([*self.timestamps, *[current_time] * missing]),
+                    maxlen=self.timestamps.maxlen,
+                )
+
+            if rate_limits.get("retry_after"):
+                self.paused_until = max(
+                    self.paused_until, current_time + rate_limits["retry_after"]
+                )
+
+    def make_request(self, region: str = None, method: str = None):
         """
         Calcula o tempo entre as ultima requisição do respectivo limite e o tempo atual.
         E pausa a execução caso o tempo seja maior que o intervalo definido.
         """
-        current_time = time.time()
+        time.sleep(self.reserve(region, method))
 
-        if len(self.timestamps) >= self.lower_limit:
-            time_passed_lower = current_time - self.timestamps[-self.lower_limit]
-            if time_passed_lower < self.lower_interval:
-                time.sleep(self.lower_interval - time_passed_lower)
+    async def make_request_async(self, region: str = None, method: str = None):
+        """
+        Versão assíncrona de 'make_request', que aguarda o horário reservado sem
+        bloquear o event loop.
+        """
+        await asyncio.sleep(self.reserve(region, method))
+
+
+class RedisRateLimiter:
+    def __init__(
+        self,
+        app_limits: list[tuple[int, int]],
+        method_limits: dict[str, list[tuple[int, int]]] = None,
+        redis_url: str = RATE_LIMIT_REDIS_URL,
+        prefix: str = RATE_LIMIT_PREFIX,
+    ) -> None:
+        """
+        Inicializa um limitador de taxa distribuído, compartilhado por todos os
+        processos e workers que usam o mesmo Redis.
+
+        Cada requisição reserva um horário no bucket da aplicação na região e,
+        quando o método possui limites próprios, no bucket do método na região,
+        com a mesma semântica de múltiplas janelas do 'RateLimiter'.
+
+        Caso o Redis esteja indisponível, as reservas passam a ser feitas em um
+        'RateLimiter' local com os limites da aplicação.
+
+        Args:
+            app_limits (list): Pares (limite, intervalo em segundos) do limite \
+            da aplicação, e.g., [(20, 1), (100, 120)].
+            method_limits (dict, opcional): Pares (limite, intervalo em \
+            segundos) de cada método, e.g., {"match": [(2000, 10)]}.
+            redis_url (str): URL de conexão com o Redis.
+            prefix (str): Prefixo das chaves dos buckets no Redis.
+        """
+        self.app_limits = app_limits
+        self.method_limits = method_limits or {}
+        self.prefix = prefix
+        self._redis = Redis.from_url(redis_url)
+        self._reserve_script = self._redis.register_script(RESERVE_SCRIPT)
+        self._sync_script = self._redis.register_script(SYNC_SCRIPT)
+        self._fallback = RateLimiter.from_limits(app_limits)
+
+    def _get_buckets(self, region: str, method: str) -> list[tuple[str, list]]:
+        region = region or "default"
+        buckets = [(f"{self.prefix}:{region}:app", self.app_limits)]
+        if method in self.method_limits:
+            buckets.append(
+                (f"{self.prefix}:{region}:{method}", self.method_limits[method])
+            )
+        return buckets
+
+    def reserve(self, region: str = None, method: str = None) -> float:
+        """
+        Reserva atomicamente no Redis o próximo horário permitido pelos limites
+        da aplicação e do método na região, sem pausar a execução.
+
+        Args:
+            region (str): A região da requisição.
+            method (str, opcional): O método da API chamado.
+
+        Returns:
+            float: O tempo (em segundos) que deve ser aguardado antes de fazer \
+            a requisição.
+        """
+        buckets = self._get_buckets(region, method)
 
-        if len(self.timestamps) >= self.upper_limit:
-            time_passed_upper = current_time - self.timestamps[-self.upper_limit]
-            if time_passed_upper < self.upper_interval:
-                time.sleep(self.upper_interval - time_passed_upper)
+        keys = []
+        args = [uuid.uuid4().hex]
+        for key, limits in buckets:
+            keys.extend([key, f"{key}:pause"])
+            args.append(len(limits))
+            for limit, interval in limits:
+                args.extend([limit, interval])
 
-        self.timestamps.append(current_time)
+        try:
+            delay = self._reserve_script(keys=keys, args=args)
+        except RedisError:
+            return self._fallback.reserve()
+
+        return max(float(delay), 0)
+
+    def update_limits(
+        self, region: str = None, method: str = None, rate_limits: dict = None
+    ) -> None:
+        """
+        Ajusta o limitador com os limites, as contagens e o 'Retry-After'
+        informados pela Riot na resposta de uma requisição.
+
+        Os limites passam a valer para as próximas reservas do processo, as
+        contagens completam os buckets no Redis com as requisições que não
+        foram registradas, e o 'Retry-After' pausa o bucket do tipo de limite
+        excedido ('application' ou 'method') em todos os workers.
+
+        Args:
+            region (str): A região usada na reserva da requisição.
+            method (str, opcional): O método usado na reserva da requisição.
+            rate_limits (dict): Os limites extraídos dos cabeçalhos da resposta.
+        """
+        if not rate_limits:
+            return
+
+        if rate_limits.get("app_limits"):
+            self.app_limits = rate_limits["app_limits"]
+            self._fallback._set_limits(self.app_limits)
+
+        if method and rate_limits.get("method_limits"):
+            self.method_limits[method] = rate_limits["method_limits"]
+
+        retry_after = rate_limits.get("retry_after") or 0
+        pause_method = rate_limits.get("limit_type") in ("method", "service")
+
+        keys = []
+        args = [uuid.uuid4().hex]
+        for index, (key, _) in enumerate(self._get_buckets(region, method)):
+            is_method_bucket = index > 0
+            counts = (
+                rate_limits.get("method_counts" if is_method_bucket else "app_counts")
+                or []
+            )
+            keys.extend([key, f"{key}:pause"])
+            args.extend(
+                [retry_after if is_method_bucket == pause_method else 0, len(counts)]
+            )
+            for count, interval in counts:
+                args.extend([count, interval])
+
+        try:
+            self._sync_script(keys=keys, args=args)
+        except RedisError:
+            self._fallback.update_limits(region, method, rate_limits)
+
+    def make_request(self, region: str = None, method: str = None):
+        """
+        Pausa a execução até o horário reservado para a requisição.
+        """
+        time.sleep(self.reserve(region, method))
+
+    async def make_request_async(self, region: str = None, method: str = None):
+        """
+        Versão assíncrona de 'make_request'. A reserva é feita em uma thread
+        para não bloquear o event loop durante a chamada ao Redis.
+        """
+        delay = await asyncio.to_thread(self.reserve, region, method)
+        await asyncio.sleep(delay)
@@ -0,0 +1,603 @@
+import os
+from collections import Counter
+from collections.abc import Iterable
+from itertools import islice
+
+import pandas
+from mongo import count_matches_by_puuid, iter_matches_by_puuid
+from serialization import to_serializable
+
+from .functions_statistics import (
+    add_total_in_dict,
+    extract_match_frames,
+    extract_teams_frame,
+    get_gold_wasted,
+    get_max_consecutive_days,
+    get_team_played_index,
+    itens_keys,
+    merge_other_values,
+    normalize_matchs,
+    player_challenges_keys,
+    player_infos_keys,
+    player_max_infos_keys,
+    rewind_rounding,
+    team_objectives_key,
+    transpose_dict,
+)
+from .profiling import Profiler
+
+kda_keys = ["kills", "deaths", "assists"]
+
+multi_kills_keys = ["doubleKills", "tripleKills", "quadraKills", "pentaKills"]
+
+state_sum_keys = list(
+    dict.fromkeys([*kda_keys, *multi_kills_keys, "firstBloodKill", *player_infos_keys])
+)
+
+MILLISECONDS_PER_DAY = 24 * 60 * 60 * 1000
+
+REWIND_BATCH_SIZE = int(os.environ.get("REWIND_BATCH_SIZE", 200))
+
+
+def merge_counters(dict_a: dict, dict_b: dict) -> dict:
+    """
+    Soma recursivamente dois dicionários de contadores, mantendo a ordem das
+    chaves do primeiro dicionário seguida das chaves novas do segundo.
+
+    Parâmetros:
+    - dict_a (dict): O primeiro dicionário.
+    - dict_b (dict): O segundo dicionário.
+
+    Retorna:
+    - dict: Um novo dicionário com a soma dos valores de cada chave.
+    """
+    merged = dict(dict_a)
+    for key, value in dict_b.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, dict):
+            merged[key] = merge_counters(merged[key], value)
+        else:
+            merged[key] = merged[key] + value
+    return merged
+
+
+def merge_maxs(dict_a: dict, dict_b: dict) -> dict:
+    """
+    Combina recursivamente dois dicionários mantendo o maior valor de cada chave.
+
+    Parâmetros:
+    - dict_a (dict): O primeiro dicionário.
+    - dict_b (dict): O segundo dicionário.
+
+    Retorna:
+    - dict: Um novo dicionário com o maior valor de cada chave.
+    """
+    merged = dict(dict_a)
+    for key, value in dict_b.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, dict):
+            merged[key] = merge_maxs(merged[key], value)
+        else:
+            merged[key] = max(merged[key], value)
+    return merged
+
+
+def get_most_common_key(counter: dict):
+    """
+    Obtém a chave com maior contagem, desempatando pela primeira chave inserida.
+
+    Parâmetros:
+    - counter (dict): Um dicionário de contadores.
+
+    Retorna:
+    - A chave com maior contagem.
+    """
+    return max(counter, key=counter.get)
+
+
+def series_to_counter(series: pandas.Series) -> dict:
+    return {str(key): int(value) for key, value in series.items()}
+
+
+def get_build_key(itens: list) -> str:
+    return ",".join(str(item) for item in sorted({item for item in itens if item}))
+
+
+def get_build_from_key(build_key: str) -> list:
+    return [int(item) for item in build_key.split(",") if item]
+
+
+def build_rewind_state(puuid: str, list_matchs: list[dict]) -> dict:
+    """
+    Monta o estado parcial da rewind de um jogador a partir de um conjunto de
+    partidas.
+
+    O estado guarda apenas agregados que podem ser combinados com
+    'merge_rewind_states' (somas, contagens, máximos, contadores por modo de jogo,
+    contadores de itens, bans e jogadores e as informações por dia), permitindo
+    atualizar a rewind apenas com as partidas novas.
+
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - list_matchs (list): Lista de documentos das partidas retornados por
+      'find_matches_by_puuid'.
+
+    Retorna:
+    - dict: O estado da rewind serializável para o MongoDB.
+    """
+    df_matchs = normalize_matchs(list_matchs)
+    df, df_participants = extract_match_frames(puuid, df_matchs, with_participants=True)
+    df_teams = extract_teams_frame(df_matchs)
+
+    duration_seconds = df["gameDuration"].where(
+        pandas.notnull(df["gameEndTimestamp"]), df["gameDuration"] / 1000
+    )
+    game_creation_ms = df["gameCreation"].astype("int64") // 10**6
+    grouped = df.groupby(by="gameMode")
+
+    itens = df.set_index("gameMode")[itens_keys].stack().reset_index(level=1, drop=True)
+    itens = itens[itens.fillna(0).astype(bool)]
+
+    df_win = df[df["win"].fillna(False).astype(bool)]
+    builds = pandas.Series(
+        [get_build_key(row) for row in df_win[itens_keys].to_numpy().tolist()],
+        index=df_win.index,
+        dtype=object,
+    )
+
+    modes = {}
+    for game_mode, df_mode in grouped:
+        df_mode_win = df_win[df_win["gameMode"] == game_mode]
+        modes[game_mode] = {
+            "matchs": len(df_mode),
+            "duration_seconds": float(duration_seconds[df_mode.index].sum()),
+            "sums": {
+                key: int(value) for key, value in df_mode[state_sum_keys].sum().items()
+            },
+            "challenges": {
+                key: int(df_mode[f"challenges.{key}"].sum())
+                for key in player_challenges_keys
+            },
+            "sides": series_to_counter(df_mode["teamId"].value_counts(sort=False)),
+            "itens": series_to_counter(
+                itens[itens.index == game_mode].value_counts(sort=False)
+            ),
+            "champions": series_to_counter(
+                df_mode["championId"].value_counts(sort=False)
+            ),
+            "builds": {
+                str(champion_id): series_to_counter(
+                    builds[df_champion.index].value_counts(sort=False)
+                )
+                for champion_id, df_champion in df_mode_win.groupby("championId")
+            },
+        }
+
+    df_roles = df.loc[df["teamPosition"] != "", ["win", "teamPosition"]]
+    roles = {
+        role: {"matchs": int(df_role["win"].count()), "wins": int(df_role["win"].sum())}
+        for role, df_role in df_roles.groupby("teamPosition")
+    }
+
+    team_played_index = get_team_played_index(df)
+    df_player_teams = df_teams[
+        df_teams["teamId"] == df_teams["matchId"].map(team_played_index)
+    ]
+
+    dates = df["gameCreation"].dt.date.astype(str)
+    days = {
+        date: {
+            "matchs": len(game_creation),
+            "first": int(game_creation.min()),
+            "last": int(game_creation.max()),
+        }
+        for date, game_creation in game_creation_ms.groupby(dates)
+    }
+
+    cosmetics = None
+    if df["gameEndTimestamp"].notnull().any():
+        last_match = df.loc[df["gameEndTimestamp"].idxmax()]
+        cosmetics = {
+            "gameEndTimestamp": int(last_match["gameEndTimestamp"].value // 10**6),
+            "profileIcon": int(last_match["profileIcon"]),
+            "summonerLevel": int(last_match["summonerLevel"]),
+        }
+
+    return {
+        "match_count": len(df),
+        "last_game_creation": int(game_creation_ms.max()),
+        "counters": {
+            "modes": modes,
+            "roles": roles,
+            "team_objectives": {
+                key: int(df_player_teams[key].sum()) for key in team_objectives_key
+            },
+            "co_players": dict(
+                Counter(df_participants.loc[df_participants["puuid"] != puuid, "puuid"])
+            ),
+            "bans": {
+                str(key): value
+                for key, value in Counter(
+                    ban for bans in df["bans"] for ban in bans
+                ).items()
+            },
+        },
+        "maxs": {
+            game_mode: {
+                key: int(value)
+                for key, value in df_mode[player_max_infos_keys].max().items()
+            }
+            for game_mode, df_mode in grouped
+        },
+        "days": days,
+        "cosmetics": cosmetics,
+    }
+
+
+def merge_rewind_states(state: dict, delta: dict) -> dict:
+    """
+    Combina o estado da rewind com o estado parcial das partidas novas.
+
+    Parâmetros:
+    - state (dict): O estado atual da rewind.
+    - delta (dict): O estado parcial gerado por 'build_rewind_state' para as
+      partidas que ainda não fazem parte de 'state'.
+
+    Retorna:
+    - dict: O estado da rewind atualizado.
+    """
+    days = dict(state["days"])
+    for date, day in delta["days"].items():
+        if date not in days:
+            days[date] = day
+            continue
+        days[date] = {
+            "matchs": days[date]["matchs"] + day["matchs"],
+            "first": min(days[date]["first"], day["first"]),
+            "last": max(days[date]["last"], day["last"]),
+        }
+
+    cosmetics = state["cosmetics"]
+    if delta["cosmetics"] and (
+        cosmetics is None
+        or delta["cosmetics"]["gameEndTimestamp"] > cosmetics["gameEndTimestamp"]
+    ):
+        cosmetics = delta["cosmetics"]
+
+    return {
+        "match_count": state["match_count"] + delta["match_count"],
+        "last_game_creation": max(
+            state["last_game_creation"], delta["last_game_creation"]
+        ),
+        "counters": merge_counters(state["counters"], delta["counters"]),
+        "maxs": merge_maxs(state["maxs"], delta["maxs"]),
+        "days": dict(sorted(days.items())),
+        "cosmetics": cosmetics,
+    }
+
+
+def get_general_infos_from_state(state: dict) -> dict:
+    modes = state["counters"]["modes"]
+    days = state["days"]
+    sorted_dates = sorted(days)
+
+    days_without_playing = [
+        (days[next_date]["first"] - days[date]["last"]) // MILLISECONDS_PER_DAY
+        for date, next_date in zip(sorted_dates, sorted_dates[1:])
+    ]
+    if any(day["matchs"] > 1 for day in days.values()):
+        days_without_playing.append(0)
+    max_days_without_playing = max(days_without_playing, default=None)
+    max_days_without_playing = (
+        int(max_days_without_playing)
+        if max_days_without_playing
+        else max_days_without_playing
+    )
+
+    return {
+        "hours_played": round(
+            sum(mode["duration_seconds"] for mode in modes.values()) / 60 / 60, 2
+        ),
+        "played_per_game_mode": {
+            game_mode: modes[game_mode]["matchs"]
+            for game_mode in sorted(
+                modes, key=lambda game_mode: modes[game_mode]["matchs"], reverse=True
+            )
+        },
+        "max_matchs_in_one_day": max(day["matchs"] for day in days.values()),
+        "max_consecutive_days": get_max_consecutive_days(
+            pandas.to_datetime(sorted_dates).date
+        ),
+        "max_days_without_playing": max_days_without_playing,
+    }
+
+
+def materialize_rewind(state: dict, profiler: Profiler = None) -> dict:
+    """
+    Gera o dicionário da rewind, no mesmo formato de 'create_rewind', a partir
+    do estado da rewind.
+
+    Parâmetros:
+    - state (dict): O estado da rewind.
+    - profiler (Profiler, opcional): Coletor dos tempos de cada seção,
+      registradas como 'section.<nome>', como em 'create_rewind'.
+
+    Retorna:
+    - dict: O dicionário da rewind.
+    """
+    profiler = profiler or Profiler()
+
+    counters = state["counters"]
+    modes = {
+        game_mode: counters["modes"][game_mode]
+        for game_mode in sorted(counters["modes"])
+    }
+
+    def sum_per_mode(keys: list[str]) -> dict:
+        return add_total_in_dict(
+            {
+                key: {game_mode: mode["sums"][key] for game_mode, mode in modes.items()}
+                for key in keys
+            }
+        )
+
+    result_dict = {}
+
+    with profiler.phase("section.kda_infos"):
+        result_dict["kda_infos"] = transpose_dict(sum_per_mode(kda_keys))
+
+    with profiler.phase("section.side_infos"):
+        team_ids = sorted(
+            {int(team_id) for mode in modes.values() for team_id in mode["sides"]}
+        )
+        dict_side = add_total_in_dict(
+            {
+                team_id: {
+                    game_mode: mode["sides"].get(str(team_id), 0)
+                    for game_mode, mode in modes.items()
+                }
+                for team_id in team_ids
+            }
+        )
+        result_dict["side_infos"] = transpose_dict(dict_side)
+
+    with profiler.phase("section.multi_kills_infos"):
+        result_dict["multi_kills_infos"] = transpose_dict(
+            sum_per_mode(multi_kills_keys)
+        )
+
+    with profiler.phase("section.first_blood_infos"):
+        result_dict["first_blood_infos"] = sum_per_mode(["firstBloodKill"])
+
+    with profiler.phase("section.general_infos"):
+        result_dict["general_infos"] = get_general_infos_from_state(state)
+
+    with profiler.phase("section.itens_statistics"):
+        itens_per_mode = {
+            game_mode: mode["itens"]
+            for game_mode, mode in modes.items()
+            if mode["itens"]
+        }
+        itens_statistics = {
+            game_mode: int(get_most_common_key(itens))
+            for game_mode, itens in itens_per_mode.items()
+        }
+        if itens_per_mode:
+            total_itens = {}
+            for itens in itens_per_mode.values():
+                total_itens = merge_counters(total_itens, itens)
+            itens_statistics["TOTAL"] = int(get_most_common_key(total_itens))
+        result_dict["itens_statistics"] = itens_statistics
+
+    with profiler.phase("section.team_statistics"):
+        result_dict["team_statistics"] = dict(counters["team_objectives"])
+
+    with profiler.phase("section.challenges"):
+        result_dict["challenges"] = {
+            key: {
+                game_mode: mode["challenges"][key] for game_mode, mode in modes.items()
+            }
+            for key in player_challenges_keys
+        }
+
+    with profiler.phase("section.other_stats"):
+        other_totals = sum_per_mode(player_infos_keys)
+        other_totals["goldWasted"] = get_gold_wasted(
+            other_totals["goldEarned"], other_totals["goldSpent"]
+        )
+        other_means = add_total_in_dict(
+            {
+                key: {
+                    game_mode: mode["sums"][key] / mode["matchs"]
+                    for game_mode, mode in modes.items()
+                }
+                for key in player_infos_keys
+            }
+        )
+        other_means["goldWasted"] = get_gold_wasted(
+            other_means["goldEarned"], other_means["goldSpent"]
+        )
+        other_means = to_serializable(other_means, digits=2)
+
+        result_dict["other_values"] = merge_other_values(other_totals, other_means)
+        result_dict["other_maxs"] = add_total_in_dict(
+            {
+                key: {game_mode: state["maxs"][game_mode][key] for game_mode in modes}
+                for key in player_max_infos_keys
+            }
+        )
+
+    with profiler.phase("section.other_infos_players"):
+        result_dict["other_infos_players"] = {
+            "most_commoms_player": dict(Counter(counters["co_players"]).most_common(5)),
+        }
+
+    with profiler.phase("section.player_role_win_info"):
+        roles = counters["roles"]
+        result_dict["player_role_win_info"] = {
+            "amount_matchs": {role: roles[role]["matchs"] for role in sorted(roles)},
+            "win_rate": {
+                role: roles[role]["wins"] / roles[role]["matchs"] * 100
+                for role in sorted(roles)
+            },
+        }
+
+    with profiler.phase("section.most_played_champ"):
+        most_played_champ = {
+            game_mode: min(
+                (-amount, int(champion_id))
+                for champion_id, amount in mode["champions"].items()
+            )[1]
+            for game_mode, mode in modes.items()
+        }
+        result_dict["most_played_champ"] = most_played_champ
+
+    with profiler.phase("section.top_5_team_bans"):
+        result_dict["top_5_team_bans"] = dict(Counter(counters["bans"]).most_common(5))
+
+    with profiler.phase("section.build_most_win_rate_with_champ"):
+        dict_build_most_win_rate_with_champ = {}
+        for game_mode, mode in modes.items():
+            builds = mode["builds"].get(str(most_played_champ[game_mode]))
+            if builds:
+                dict_build_most_win_rate_with_champ[game_mode] = min(
+                    (-amount, get_build_from_key(build))
+                    for build, amount in builds.items()
+                )[1]
+        result_dict["build_most_win_rate_with_champ"] = (
+            dict_build_most_win_rate_with_champ
+        )
+
+    with profiler.phase("section.player_cosmetics"):
+        result_dict["player_cosmetics"] = state["cosmetics"] and {
+            "profileIcon": state["cosmetics"]["profileIcon"],
+            "summonerLevel": state["cosmetics"]["summonerLevel"],
+        }
+
+    return to_serializable(result_dict, rounding=rewind_rounding)
+
+
+def fold_rewind_state(
+    puuid: str,
+    matchs: Iterable[dict],
+    batch_size: int = REWIND_BATCH_SIZE,
+    rewind_state: dict = None,
+    profiler: Profiler = None,
+) -> dict:
+    """
+    Consome as partidas em lotes de tamanho fixo, combinando o estado parcial de
+    cada lote no estado da rewind. Apenas um lote de partidas fica em memória por
+    vez, de forma que o pico de memória não depende da quantidade de partidas.
+
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - matchs (Iterable): Iterável com os documentos das partidas (e.g., o cursor
+      retornado por 'iter_matches_by_puuid').
+    - batch_size (int): Quantidade de partidas processadas por lote.
+    - rewind_state (dict, opcional): O estado inicial da rewind.
+    - profiler (Profiler, opcional): Coletor dos tempos das fases 'fetch',
+      'build_state' e 'merge_state', acumulados entre os lotes.
+
+    Retorna:
+    - dict: O estado da rewind com todas as partidas ou None caso não exista
+      estado inicial nem partidas.
+    """
+    profiler = profiler or Profiler()
+
+    iterator = iter(matchs)
+    while True:
+        with profiler.phase("fetch"):
+            batch = list(islice(iterator, batch_size))
+        if not batch:
+            return rewind_state
+        profiler.count("batches")
+        profiler.count("matchs", len(batch))
+
+        with profiler.phase("build_state"):
+            delta = build_rewind_state(puuid, batch)
+        if rewind_state is None:
+            rewind_state = delta
+        else:
+            with profiler.phase("merge_state"):
+                rewind_state = merge_rewind_states(rewind_state, delta)
+
+
+def create_rewind_streaming(
+    puuid: str,
+    timestamp_statistic: int = None,
+    batch_size: int = REWIND_BATCH_SIZE,
+    profiler: Profiler = None,
+) -> dict:
+    """
+    Gera a rewind do jogador, no mesmo formato de 'create_rewind', consumindo o
+    cursor das partidas em lotes de 'batch_size' partidas.
+
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - timestamp_statistic (int, opcional): Carimbo de tempo inicial das partidas
+      consideradas na rewind.
+    - batch_size (int): Quantidade de partidas processadas por lote.
+    - profiler (Profiler, opcional): Coletor dos tempos de cada fase.
+
+    Retorna:
+    - dict: O dicionário da rewind.
+    """
+    profiler = profiler or Profiler()
+
+    cursor = iter_matches_by_puuid(puuid, timestamp_statistic, batch_size)
+    rewind_state = fold_rewind_state(puuid, cursor, batch_size, profiler=profiler)
+    with profiler.phase("materialize"):
+        return materialize_rewind(rewind_state, profiler)
+
+
+def update_rewind_state(
+    puuid: str,
+    rewind_state: dict = None,
+    timestamp_statistic: int = None,
+    batch_size: int = REWIND_BATCH_SIZE,
+    profiler: Profiler = None,
+) -> tuple[dict, dict]:
+    """
+    Atualiza o estado da rewind de um jogador buscando apenas as partidas criadas
+    depois da última partida do estado e gera a rewind atualizada.
+
+    Caso não exista estado, ou caso a quantidade de partidas do jogador no banco
+    não seja a esperada (e.g., uma partida antiga buscada depois), o estado é
+    recalculado com todas as partidas. As partidas são sempre consumidas em lotes
+    de 'batch_size' partidas.
+
+    Parâmetros:
+    - puuid (str): O identificador único (PUUID) do jogador de League of Legends.
+    - rewind_state (dict, opcional): O estado salvo junto à rewind do jogador.
+    - timestamp_statistic (int, opcional): Carimbo de tempo inicial das partidas
+      consideradas na rewind.
+    - batch_size (int): Quantidade de partidas processadas por lote.
+    - profiler (Profiler, opcional): Coletor dos tempos de cada fase.
+
+    Retorna:
+    - tuple: Uma tupla contendo o dicionário da rewind e o estado atualizado.
+    """
+    profiler = profiler or Profiler()
+
+    if rewind_state is not None:
+        cursor = iter_matches_by_puuid(
+            puuid,
+            max(timestamp_statistic or 0, rewind_state["last_game_creation"]),
+            batch_size,
+        )
+        updated_state = fold_rewind_state(
+            puuid, cursor, batch_size, rewind_state, profiler
+        )
+        with profiler.phase("count"):
+            match_count = count_matches_by_puuid(puuid, timestamp_statistic)
+        if match_count == updated_state["match_count"]:
+            with profiler.phase("materialize"):
+                return materialize_rewind(updated_state, profiler), updated_state
+        profiler.count("full_refold")
+
+    cursor = iter_matches_by_puuid(puuid, timestamp_statistic, batch_size)
+    rewind_state = fold_rewind_state(puuid, cursor, batch_size, profiler=profiler)
+    with profiler.phase("materialize"):
+        return materialize_rewind(rewind_state, profiler), rewind_state
@@ -0,0 +1,9 @@
+#!/bin/sh
+
+
+until cd /app/app
+do
+    echo "Waiting for server volume..."
+done
+
+celery -A tasks.celery_app beat --loglevel=info
\ No newline at end of file